@@ -0,0 +1,72 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        requests = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / requests if requests else 0.0
+
+
+class TTLCache(Generic[T]):
+    """
+    In-memory cache with per-entry TTL and single-flight loading:
+    concurrent misses of the same key wait for one load instead of each running it.
+    Entries loaded while an invalidation happened are returned but not stored.
+    """
+
+    def __init__(self, ttl: float):
+        self._ttl = ttl
+        self._entries: dict[Hashable, tuple[float, T]] = {}
+        self._inflight: dict[Hashable, asyncio.Task[T]] = {}
+        self._generation = 0
+        self.stats = CacheStats()
+
+    async def get(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.stats.hits += 1
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.stats.misses += 1
+            # The generation is taken now: the task may only start after an invalidation.
+            inflight = asyncio.create_task(self._load(key, load, self._generation))
+            # Retrieve the result so a failed load whose callers all went away isn't logged as unhandled.
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._inflight[key] = inflight
+        else:
+            self.stats.coalesced += 1
+        # A cancelled caller must not cancel the load other callers are waiting for.
+        return await asyncio.shield(inflight)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[T]], generation: int) -> T:
+        try:
+            value = await load()
+        finally:
+            self._inflight.pop(key, None)
+        if generation == self._generation and self._ttl > 0:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop `key` or, without a key, every entry. Loads in flight are not stored."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+        self._generation += 1
+        self.stats.invalidations += 1
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,19 +11,35 @@ class Settings(BaseSettings):
         extra="ignore",
     )
 
-    db_host: str = Field(...)
+    db_host: str | None = Field(default=None)
     db_port: int = Field(default=5432)
-    db_user: str = Field(...)
-    db_password: str = Field(...)
-    db_name: str = Field(...)
+    db_user: str | None = Field(default=None)
+    db_password: str | None = Field(default=None)
+    db_name: str | None = Field(default=None)
+    db_primary_dsn: str | None = Field(default=None)
+    db_replica_dsns: list[str] = Field(default_factory=list)
+    db_read_routing: Literal["round_robin", "least_loaded"] = Field(default="least_loaded")
     db_pool_min_size: int = Field(default=5, ge=1, le=50)
     db_pool_max_size: int = Field(default=20, ge=1, le=100)
     db_timeout: float = Field(default=30.0)
     db_command_timeout: float = Field(default=60.0)
+    db_acquire_timeout: float = Field(default=10.0, gt=0)
+    db_statement_cache_size: int = Field(default=100, ge=0)
+    db_statement_cache_lifetime: float = Field(default=300.0, ge=0)
+    db_version_cache_ttl: float = Field(default=300.0, ge=0)
+    health_check_interval: float = Field(default=5.0, gt=0)
+    health_check_timeout: float = Field(default=2.0, gt=0)
+    health_check_max_age: float = Field(default=15.0, gt=0)
 
     app_host: str = Field(default="0.0.0.0")
     app_port: int = Field(default=8000)
 
+    @model_validator(mode='after')
+    def validate_primary(self) -> 'Settings':
+        if self.db_primary_dsn is None and None in (self.db_host, self.db_user, self.db_password, self.db_name):
+            raise ValueError("Either db_primary_dsn or db_host, db_user, db_password and db_name must be set")
+        return self
+
     @model_validator(mode='after')
     def validate_pool_sizes(self) -> 'Settings':
         if self.db_pool_min_size > self.db_pool_max_size:
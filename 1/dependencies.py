@@ -1,14 +1,49 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
 import asyncpg
 from fastapi import HTTPException, Request
 
+from health import HealthProber
+from metrics import PoolMetrics
+from queries import QueryRegistry
+from routing import PoolRouter
 
-async def get_pg_connection(request: Request) -> AsyncGenerator[asyncpg.Connection, None]:
-    pool: asyncpg.Pool = request.app.state.pool
+
+@asynccontextmanager
+async def _pg_connection(request: Request, readonly: bool) -> AsyncIterator[asyncpg.Connection]:
+    pools: PoolRouter = request.app.state.pools
 
     try:
-        async with pool.acquire() as connection:
+        async with pools.acquire(readonly=readonly) as connection:
             yield connection
     except Exception:
         raise HTTPException(status_code=500, detail="Database connection error")
+
+
+async def get_pg_connection(request: Request) -> AsyncGenerator[asyncpg.Connection, None]:
+    """Read-write connection to the primary."""
+    async with _pg_connection(request, readonly=False) as connection:
+        yield connection
+
+
+async def get_pg_readonly_connection(request: Request) -> AsyncGenerator[asyncpg.Connection, None]:
+    """Connection to a healthy replica, or to the primary when none is available."""
+    async with _pg_connection(request, readonly=True) as connection:
+        yield connection
+
+
+def get_pool_router(request: Request) -> PoolRouter:
+    return request.app.state.pools
+
+
+def get_queries(request: Request) -> QueryRegistry:
+    return request.app.state.queries
+
+
+def get_health_prober(request: Request) -> HealthProber:
+    return request.app.state.health_prober
+
+
+def get_pool_metrics(request: Request) -> PoolMetrics:
+    return request.app.state.pool_metrics
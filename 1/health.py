@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HealthState:
+    healthy: bool = False
+    checked_at: float | None = None
+    latency: float | None = None
+    error: str | None = None
+    consecutive_failures: int = 0
+    pool_size: int = 0
+    pool_idle: int = 0
+    pool_max_size: int = 0
+
+    @property
+    def pool_saturation(self) -> float:
+        """Share of the maximum pool size currently checked out."""
+        in_use = self.pool_size - self.pool_idle
+        return in_use / self.pool_max_size if self.pool_max_size else 0.0
+
+
+class HealthProber:
+    """
+    Probes the database with SELECT 1 every `interval` seconds in the background and keeps the outcome,
+    so health endpoints answer from memory instead of taking a pool connection per request.
+    Probes run on a dedicated connection opened with `connect`, outside `pool`: a saturated pool is reported
+    through the pool gauges, not as an unreachable database. Concurrent `probe` calls share one check.
+    State older than `max_age` seconds counts as unhealthy (the prober itself is stuck).
+    `on_recover` is called when a probe succeeds after failed ones, e.g. once the server is back from a restart.
+    """
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        max_age: float = 15.0,
+        on_recover: Callable[[], None] | None = None,
+    ):
+        self._pool = pool
+        self._connect = connect
+        self._interval = interval
+        self._timeout = timeout
+        self._max_age = max_age
+        self._on_recover = on_recover
+        self._connection: asyncpg.Connection | None = None
+        self._probing: asyncio.Task[HealthState] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.state = HealthState()
+
+    @property
+    def healthy(self) -> bool:
+        state = self.state
+        return (
+            state.healthy
+            and state.checked_at is not None
+            and time.monotonic() - state.checked_at <= self._max_age
+        )
+
+    async def probe(self) -> HealthState:
+        """Run one check now and record it, or wait for the one already running."""
+        if self._probing is None:
+            self._probing = asyncio.create_task(self._probe())
+            self._probing.add_done_callback(self._probe_done)
+        # A cancelled caller (e.g. a disconnected client) must not cancel the check others wait for.
+        return await asyncio.shield(self._probing)
+
+    async def _probe(self) -> HealthState:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self._timeout):
+                if self._connection is None or self._connection.is_closed():
+                    self._connection = await self._connect()
+                await self._connection.fetchval("SELECT 1")
+        except Exception as e:
+            await self._disconnect()
+            state = HealthState(
+                healthy=False,
+                error=repr(e),
+                consecutive_failures=self.state.consecutive_failures + 1,
+            )
+            if state.consecutive_failures == 1:
+                logger.warning(f"Database health check failed: {e!r}")
+        else:
+            state = HealthState(healthy=True, latency=time.monotonic() - started)
+            if self.state.consecutive_failures:
+                logger.info("Database health check recovered")
+                if self._on_recover is not None:
+                    self._on_recover()
+
+        state.checked_at = time.monotonic()
+        state.pool_size = self._pool.get_size()
+        state.pool_idle = self._pool.get_idle_size()
+        state.pool_max_size = self._pool.get_max_size()
+        self.state = state
+        return state
+
+    def _probe_done(self, _: asyncio.Task[HealthState]) -> None:
+        self._probing = None
+
+    async def _disconnect(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            # Don't wait on a connection that may be what just timed out.
+            connection.terminate()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._probing is not None:
+            await asyncio.wait([self._probing])
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self._interval)
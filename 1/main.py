@@ -1,11 +1,16 @@
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
 import asyncpg
 import uvicorn
 from fastapi import FastAPI
 
 from config import Settings
+from health import HealthProber
+from metrics import PoolMetrics
+from queries import DB_VERSION, QueryRegistry
+from routing import DatabaseNode, PoolRouter, create_replica_pool
 from routes import router
 
 
@@ -13,23 +18,68 @@ from routes import router
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     settings = Settings() # type: ignore
     app.state.settings = settings
+    pool_metrics = PoolMetrics()
+    app.state.pool_metrics = pool_metrics
 
-    pool = await asyncpg.create_pool(
-        host=settings.db_host,
-        port=settings.db_port,
-        user=settings.db_user,
-        password=settings.db_password,
-        database=settings.db_name,
+    queries = QueryRegistry(lambda readonly: app.state.pools.acquire(readonly=readonly))
+    queries.register(DB_VERSION, "SELECT version()", cache_ttl=settings.db_version_cache_ttl, readonly=True)
+    app.state.queries = queries
+
+    async def init_connection(connection: asyncpg.Connection) -> None:
+        connection.add_query_logger(pool_metrics.observe_query)
+
+    pool_options = dict(
         min_size=settings.db_pool_min_size,
         max_size=settings.db_pool_max_size,
         timeout=settings.db_timeout,
         command_timeout=settings.db_command_timeout,
+        statement_cache_size=settings.db_statement_cache_size,
+        max_cached_statement_lifetime=settings.db_statement_cache_lifetime,
+        init=init_connection,
+    )
+    if settings.db_primary_dsn is not None:
+        primary_target: dict[str, Any] = dict(dsn=settings.db_primary_dsn)
+    else:
+        primary_target = dict(
+            host=settings.db_host,
+            port=settings.db_port,
+            user=settings.db_user,
+            password=settings.db_password,
+            database=settings.db_name,
+        )
+    primary_pool = await asyncpg.create_pool(**primary_target, **pool_options)
+    replicas = {f"replica{i}": dsn for i, dsn in enumerate(settings.db_replica_dsns, start=1)}
+    replica_pools = await asyncio.gather(
+        *(create_replica_pool(dsn, name, **pool_options) for name, dsn in replicas.items())
+    )
+
+    def node(name: str, pool: asyncpg.Pool, target: dict[str, Any]) -> DatabaseNode:
+        # Health probes get their own connection, a pool busy serving requests must not fail them.
+        prober = HealthProber(
+            pool,
+            lambda: asyncpg.connect(**target, timeout=settings.health_check_timeout),
+            interval=settings.health_check_interval,
+            timeout=settings.health_check_timeout,
+            max_age=settings.health_check_max_age,
+            # A node coming back may be an upgraded server, and DB_VERSION is read from any node.
+            on_recover=lambda: queries.invalidate(DB_VERSION),
+        )
+        return DatabaseNode(name, pool, prober)
+
+    pools = PoolRouter(
+        node("primary", primary_pool, primary_target),
+        [node(name, pool, dict(dsn=dsn)) for (name, dsn), pool in zip(replicas.items(), replica_pools)],
+        pool_metrics,
+        routing=settings.db_read_routing,
+        acquire_timeout=settings.db_acquire_timeout,
     )
-    app.state.pool = pool
+    pools.start()
+    app.state.pools = pools
+    app.state.health_prober = pools.primary.prober
 
     yield
 
-    await app.state.pool.close()
+    await pools.close()
 
 
 def create_app() -> FastAPI:
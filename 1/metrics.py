@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Final
+
+import asyncpg
+
+from cache import CacheStats
+from health import HealthState
+
+DEFAULT_BUCKETS: Final[tuple[float, ...]] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                self._counts[i] += 1
+
+    def render(self, name: str, labels: dict[str, str] | None = None) -> list[str]:
+        labels = labels or {}
+        lines = [
+            f"{name}_bucket{_labels({**labels, 'le': str(bound)})} {count}"
+            for bound, count in zip(self._buckets, self._counts)
+        ]
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+class PoolMetrics:
+    """
+    Pool acquire wait times and timeouts by database node, plus query latencies reported by asyncpg
+    query loggers (register `observe_query` on each connection from the pool `init` hook).
+    """
+
+    def __init__(self) -> None:
+        self.acquire_wait: defaultdict[str, Histogram] = defaultdict(Histogram)
+        self.acquire_timeouts: defaultdict[str, int] = defaultdict(int)
+        self.queries: defaultdict[tuple[str, str], Histogram] = defaultdict(Histogram)
+
+    @asynccontextmanager
+    async def acquire(
+        self,
+        pool: asyncpg.Pool,
+        node: str,
+        timeout: float | None = None,
+    ) -> AsyncIterator[asyncpg.Connection]:
+        started = time.perf_counter()
+        try:
+            connection = await pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.acquire_timeouts[node] += 1
+            raise
+        self.acquire_wait[node].observe(time.perf_counter() - started)
+        try:
+            yield connection
+        finally:
+            await pool.release(connection)
+
+    def observe_query(self, record: asyncpg.connection.LoggedQuery) -> None:
+        words = record.query.split(None, 1)
+        operation = words[0].lower() if words and words[0].isalpha() else "other"
+        status = "error" if record.exception is not None else "ok"
+        self.queries[(operation, status)].observe(record.elapsed)
+
+
+def render_metrics(
+    pools: dict[str, asyncpg.Pool],
+    pool_metrics: PoolMetrics,
+    cache_stats: dict[str, CacheStats] | None = None,
+    health: dict[str, HealthState] | None = None,
+) -> str:
+    """Prometheus text exposition format, pool gauges and health labelled by database node."""
+    gauges = {
+        "db_pool_size": ("Open connections in the pool.", lambda pool: pool.get_size()),
+        "db_pool_max_size": ("Maximum connections in the pool.", lambda pool: pool.get_max_size()),
+        "db_pool_idle_connections": ("Open connections not checked out.", lambda pool: pool.get_idle_size()),
+        "db_pool_in_use_connections": ("Connections checked out.", lambda pool: pool.get_size() - pool.get_idle_size()),
+    }
+    lines: list[str] = []
+    for name, (description, value) in gauges.items():
+        lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+        lines += [f"{name}{_labels({'node': node})} {value(pool)}" for node, pool in pools.items()]
+    lines += [
+        "# HELP db_pool_acquire_wait_seconds Time spent waiting for a pool connection.",
+        "# TYPE db_pool_acquire_wait_seconds histogram",
+    ]
+    for node in pools:
+        lines.extend(pool_metrics.acquire_wait[node].render("db_pool_acquire_wait_seconds", {"node": node}))
+    lines += [
+        "# HELP db_pool_acquire_timeouts_total Pool acquires that timed out.",
+        "# TYPE db_pool_acquire_timeouts_total counter",
+        *(
+            f"db_pool_acquire_timeouts_total{_labels({'node': node})} {pool_metrics.acquire_timeouts[node]}"
+            for node in pools
+        ),
+        "# HELP db_query_duration_seconds Query latency by SQL operation and outcome.",
+        "# TYPE db_query_duration_seconds histogram",
+    ]
+    for (operation, status), histogram in sorted(pool_metrics.queries.items()):
+        lines.extend(histogram.render("db_query_duration_seconds", {"operation": operation, "status": status}))
+
+    if cache_stats:
+        lines += [
+            "# HELP db_query_cache_requests_total Statement result cache lookups by result.",
+            "# TYPE db_query_cache_requests_total counter",
+        ]
+        for statement, stats in sorted(cache_stats.items()):
+            lines += [
+                f"db_query_cache_requests_total{_labels({'statement': statement, 'result': result})} {count}"
+                for result, count in (("hit", stats.hits), ("miss", stats.misses), ("coalesced", stats.coalesced))
+            ]
+        lines += [
+            "# HELP db_query_cache_invalidations_total Statement result cache invalidations.",
+            "# TYPE db_query_cache_invalidations_total counter",
+            *(
+                f"db_query_cache_invalidations_total{_labels({'statement': statement})} {stats.invalidations}"
+                for statement, stats in sorted(cache_stats.items())
+            ),
+        ]
+    if health:
+        lines += [
+            "# HELP db_health_up Whether the last background health probe succeeded.",
+            "# TYPE db_health_up gauge",
+            *(f"db_health_up{_labels({'node': node})} {int(state.healthy)}" for node, state in health.items()),
+            "# HELP db_health_latency_seconds Latency of the last successful health probe.",
+            "# TYPE db_health_latency_seconds gauge",
+            *(
+                f"db_health_latency_seconds{_labels({'node': node})} {state.latency}"
+                for node, state in health.items()
+                if state.latency is not None
+            ),
+        ]
+    return "\n".join(lines) + "\n"
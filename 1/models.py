@@ -8,3 +8,8 @@ class DBVersionResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     database: str
+    latency_ms: float | None = None
+    checked_seconds_ago: float | None = None
+    pool_size: int | None = None
+    pool_idle: int | None = None
+    pool_saturation: float | None = None
@@ -0,0 +1,104 @@
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from typing import Any, Final
+
+import asyncpg
+
+from cache import CacheStats, TTLCache
+
+logger = logging.getLogger(__name__)
+
+DB_VERSION: Final[str] = "db_version"
+
+# Takes whether the statement is read-only, which lets reads go to a replica.
+Acquire = Callable[[bool], AbstractAsyncContextManager[asyncpg.Connection]]
+
+
+@dataclass(frozen=True)
+class Statement:
+    name: str
+    sql: str
+    cache_ttl: float = 0.0
+    readonly: bool = False
+
+
+class QueryRegistry:
+    """
+    Named statements executed through the per-connection statement cache of asyncpg (`statement_cache_size`):
+    each is prepared on its first execution on a connection and reused across pool checkouts, so later
+    executions skip parse and plan. A statement that fails to prepare only fails its own executions.
+    Statements registered with a `cache_ttl` also keep their results in memory per argument tuple;
+    a hit doesn't take a pool connection at all.
+    """
+
+    def __init__(self, acquire: Acquire):
+        self._acquire = acquire
+        self._statements: dict[str, Statement] = {}
+        self._caches: dict[str, TTLCache[list[asyncpg.Record]]] = {}
+
+    def register(self, name: str, sql: str, cache_ttl: float = 0.0, readonly: bool = False) -> Statement:
+        if name in self._statements:
+            raise ValueError(f"Statement {name!r} is already registered")
+        statement = Statement(name, sql, cache_ttl, readonly)
+        self._statements[name] = statement
+        if cache_ttl > 0:
+            self._caches[name] = TTLCache(ttl=cache_ttl)
+        return statement
+
+    async def fetch(
+        self,
+        name: str,
+        *args: Any,
+        connection: asyncpg.Connection | None = None,
+    ) -> list[asyncpg.Record]:
+        """
+        Rows of statement `name` for `args` (hashable when the statement is cached).
+        Passing `connection`, e.g. inside a transaction, runs on it and bypasses the result cache.
+        """
+        if connection is not None:
+            return await self._execute(connection, name, args)
+        cache = self._caches.get(name)
+        if cache is None:
+            return await self._fetch(name, args)
+        return await cache.get(args, lambda: self._fetch(name, args))
+
+    async def fetchrow(
+        self,
+        name: str,
+        *args: Any,
+        connection: asyncpg.Connection | None = None,
+    ) -> asyncpg.Record | None:
+        rows = await self.fetch(name, *args, connection=connection)
+        return rows[0] if rows else None
+
+    async def fetchval(self, name: str, *args: Any, connection: asyncpg.Connection | None = None) -> Any:
+        row = await self.fetchrow(name, *args, connection=connection)
+        return row[0] if row is not None else None
+
+    def invalidate(self, name: str | None = None, *args: Any) -> None:
+        """Drop cached results of `name` (only those for `args` when given) or, without a name, of every statement."""
+        if name is None:
+            for cache in self._caches.values():
+                cache.invalidate()
+            return
+        cache = self._caches.get(name)
+        if cache is not None:
+            cache.invalidate(args if args else None)
+
+    def cache_stats(self) -> dict[str, CacheStats]:
+        return {name: cache.stats for name, cache in self._caches.items()}
+
+    async def _fetch(self, name: str, args: tuple[Any, ...]) -> list[asyncpg.Record]:
+        async with self._acquire(self._statements[name].readonly) as connection:
+            return await self._execute(connection, name, args)
+
+    async def _execute(self, connection: asyncpg.Connection, name: str, args: tuple[Any, ...]) -> list[asyncpg.Record]:
+        # asyncpg prepares a statement again when the schema changed under its plan (InvalidCachedStatementError),
+        # but only outside a transaction: inside one the error has already aborted it and is raised.
+        try:
+            return await connection.fetch(self._statements[name].sql, *args)
+        except asyncpg.PostgresError as e:
+            logger.error(f"Statement {name!r} failed: {e!r}")
+            raise
@@ -1,33 +1,72 @@
+import asyncio
+import time
 from typing import Annotated, cast
 
 import asyncpg
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
 
-from dependencies import get_pg_connection
+from dependencies import get_health_prober, get_pool_metrics, get_pool_router, get_queries
+from health import HealthProber
+from metrics import PoolMetrics, render_metrics
 from models import DBVersionResponse, HealthResponse
+from queries import DB_VERSION, QueryRegistry
+from routing import PoolRouter
 
 router = APIRouter(prefix="/api")
 
 
 @router.get("/health", response_model=HealthResponse)
-async def health_check(request: Request) -> HealthResponse:
-    try:
-        pool: asyncpg.Pool = request.app.state.pool
-        async with pool.acquire() as conn:
-            await conn.fetchval("SELECT 1")
-        return HealthResponse(status="healthy", database="connected")
-    except Exception:
+async def health_check(
+    prober: Annotated[HealthProber, Depends(get_health_prober)],
+    deep: bool = False,
+) -> HealthResponse:
+    """
+    Answers from the background prober state, `deep=true` runs a fresh check against the database
+    (or joins the one already running, so a burst of deep checks sends a single SELECT 1).
+    """
+    if deep:
+        await prober.probe()
+    if not prober.healthy:
         raise HTTPException(status_code=503, detail="Service unavailable")
 
+    state = prober.state
+    return HealthResponse(
+        status="healthy",
+        database="connected",
+        latency_ms=state.latency * 1000 if state.latency is not None else None,
+        checked_seconds_ago=time.monotonic() - state.checked_at if state.checked_at is not None else None,
+        pool_size=state.pool_size,
+        pool_idle=state.pool_idle,
+        pool_saturation=state.pool_saturation,
+    )
+
 
 @router.get("/db_version", response_model=DBVersionResponse)
-async def get_db_version(
-    conn: Annotated[asyncpg.Connection, Depends(get_pg_connection)]
-) -> DBVersionResponse:
+async def get_db_version(queries: Annotated[QueryRegistry, Depends(get_queries)]) -> DBVersionResponse:
     try:
-        version = await conn.fetchval("SELECT version()")
-        return DBVersionResponse(version=cast(str, version))
+        version = cast(str, await queries.fetchval(DB_VERSION))
+        return DBVersionResponse(version=version)
     except asyncpg.PostgresError:
         raise HTTPException(status_code=500, detail="Database query error")
+    except (OSError, asyncio.TimeoutError, asyncpg.InterfaceError):
+        raise HTTPException(status_code=500, detail="Database connection error")
     except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(
+    pools: Annotated[PoolRouter, Depends(get_pool_router)],
+    pool_metrics: Annotated[PoolMetrics, Depends(get_pool_metrics)],
+    queries: Annotated[QueryRegistry, Depends(get_queries)],
+) -> PlainTextResponse:
+    return PlainTextResponse(
+        render_metrics(
+            {node.name: node.pool for node in pools.nodes},
+            pool_metrics,
+            queries.cache_stats(),
+            {node.name: node.prober.state for node in pools.nodes},
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+import logging
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Final, Literal
+
+import asyncpg
+
+from health import HealthProber
+from metrics import PoolMetrics
+
+logger = logging.getLogger(__name__)
+
+ReadRouting = Literal["round_robin", "least_loaded"]
+
+READ_ONLY_SESSION: Final[str] = "SET SESSION default_transaction_read_only = on"
+
+# Raised while taking a connection from a node that is down or restarting; reads move on to the next node.
+_FAILOVER_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.InterfaceError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.CannotConnectNowError,
+)
+
+
+@dataclass
+class DatabaseNode:
+    name: str
+    pool: asyncpg.Pool
+    prober: HealthProber
+
+    @property
+    def load(self) -> float:
+        """Share of the maximum pool size currently checked out."""
+        max_size = self.pool.get_max_size()
+        return (self.pool.get_size() - self.pool.get_idle_size()) / max_size if max_size else 0.0
+
+
+class PoolRouter:
+    """
+    Sends read-write connections to the primary and spreads read-only ones over the replicas that their
+    health probers consider healthy, round-robin or to the least loaded pool. A replica that fails to hand
+    out a connection is skipped for the next one; the primary serves reads when no replica can.
+    Read-only connections refuse writes wherever they come from: replica pools are opened read-only
+    (see `create_replica_pool`), a primary connection serving a read is switched to read-only until
+    its release (the pool's RESET ALL switches it back).
+    """
+
+    def __init__(
+        self,
+        primary: DatabaseNode,
+        replicas: list[DatabaseNode],
+        pool_metrics: PoolMetrics,
+        routing: ReadRouting = "least_loaded",
+        acquire_timeout: float | None = None,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self._pool_metrics = pool_metrics
+        self._routing = routing
+        self._acquire_timeout = acquire_timeout
+        self._turn = itertools.count()
+
+    @property
+    def nodes(self) -> list[DatabaseNode]:
+        return [self.primary, *self.replicas]
+
+    def read_nodes(self) -> list[DatabaseNode]:
+        """Nodes to try for a read, in order."""
+        healthy = [node for node in self.replicas if node.prober.healthy]
+        if healthy and self._routing == "round_robin":
+            start = next(self._turn) % len(healthy)
+            healthy = healthy[start:] + healthy[:start]
+        else:
+            healthy.sort(key=lambda node: node.load)
+        return [*healthy, self.primary]
+
+    @asynccontextmanager
+    async def acquire(self, readonly: bool = False) -> AsyncIterator[asyncpg.Connection]:
+        nodes = self.read_nodes() if readonly else [self.primary]
+        for node in nodes:
+            async with AsyncExitStack() as stack:
+                try:
+                    connection = await stack.enter_async_context(
+                        self._pool_metrics.acquire(node.pool, node.name, timeout=self._acquire_timeout)
+                    )
+                except _FAILOVER_ERRORS as e:
+                    if node is nodes[-1]:
+                        raise
+                    logger.warning(f"Database node {node.name} unavailable, trying the next one: {e!r}")
+                    continue
+                if readonly and node is self.primary:
+                    await connection.execute(READ_ONLY_SESSION)
+                yield connection
+                return
+
+    def start(self) -> None:
+        for node in self.nodes:
+            node.prober.start()
+
+    async def close(self) -> None:
+        for node in self.nodes:
+            await node.prober.stop()
+        await asyncio.gather(*(node.pool.close() for node in self.nodes))
+
+
+async def create_replica_pool(dsn: str, name: str, **options: Any) -> asyncpg.Pool:
+    """
+    Pool of read-only connections (default_transaction_read_only) to a replica. A replica that is down
+    at startup gets a pool without initial connections instead of failing the app; its prober brings it
+    into rotation once it answers.
+    """
+    server_settings = {**(options.pop("server_settings", None) or {}), "default_transaction_read_only": "on"}
+    pool = asyncpg.create_pool(dsn, server_settings=server_settings, **options)
+    try:
+        return await pool
+    except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+        logger.warning(f"Database node {name} unavailable at startup: {e!r}")
+        # Connections opened before the failure would otherwise stay open.
+        await pool.close()
+        return await asyncpg.create_pool(dsn, server_settings=server_settings, **{**options, "min_size": 0})
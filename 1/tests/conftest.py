@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+from metrics import PoolMetrics
+from routing import DatabaseNode
+
+
+class FakeConnection:
+    def __init__(self, node: str):
+        self.node = node
+        self.executed: list[str] = []
+
+    async def execute(self, query: str) -> None:
+        self.executed.append(query)
+
+
+class FakePool:
+    """The part of asyncpg.Pool the router and metrics use, handing out connections tagged with the node name."""
+
+    def __init__(self, node: str, max_size: int = 10, error: Exception | None = None):
+        self.node = node
+        self.error = error
+        self.max_size = max_size
+        self.in_use = 0
+
+    async def acquire(self, timeout: float | None = None) -> FakeConnection:
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        self.in_use += 1
+        return FakeConnection(self.node)
+
+    async def release(self, connection: FakeConnection) -> None:
+        self.in_use -= 1
+
+    def get_size(self) -> int:
+        return self.in_use
+
+    def get_idle_size(self) -> int:
+        return 0
+
+    def get_max_size(self) -> int:
+        return self.max_size
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeProber:
+    def __init__(self, healthy: bool = True):
+        self.healthy = healthy
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+def make_node(name: str, healthy: bool = True, **pool_options: Any) -> DatabaseNode:
+    return DatabaseNode(name, FakePool(name, **pool_options), FakeProber(healthy))
+
+
+@pytest.fixture
+def pool_metrics() -> PoolMetrics:
+    return PoolMetrics()
+
+
+@pytest.fixture(scope="session")
+def postgres_dsn(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    """DSN of a throwaway local PostgreSQL server."""
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("postgres")), cleanup_mode="stop")
+    try:
+        yield server.get_uri()
+    finally:
+        server.cleanup()
@@ -0,0 +1,76 @@
+import asyncio
+
+from cache import TTLCache
+
+
+class SlowLoad:
+    """Load function that blocks until released and counts its calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await self.release.wait()
+        return self.calls
+
+
+class TestTTLCache:
+    async def test_coalesced_misses_share_one_load(self) -> None:
+        """Test that concurrent misses of the same key wait for a single load."""
+        # Arrange
+        cache: TTLCache[int] = TTLCache(ttl=60)
+        load = SlowLoad()
+
+        # Act
+        waiters = [asyncio.create_task(cache.get("key", load)) for _ in range(5)]
+        await asyncio.sleep(0)
+        load.release.set()
+        results = await asyncio.gather(*waiters)
+
+        # Assert
+        assert results == [1] * 5
+        assert load.calls == 1
+        assert (cache.stats.misses, cache.stats.coalesced) == (1, 4)
+        assert await cache.get("key", load) == 1
+        assert cache.stats.hits == 1
+
+    async def test_invalidation_during_load_is_not_stored(self) -> None:
+        """Test that a value loaded while the cache was invalidated is returned but not cached."""
+        # Arrange
+        cache: TTLCache[int] = TTLCache(ttl=60)
+        load = SlowLoad()
+        waiter = asyncio.create_task(cache.get("key", load))
+        await asyncio.sleep(0)
+
+        # Act
+        cache.invalidate("key")
+        load.release.set()
+        stale = await waiter
+        fresh = await cache.get("key", load)
+
+        # Assert
+        assert (stale, fresh) == (1, 2)
+        assert load.calls == 2
+
+    async def test_cancelled_waiter_does_not_cancel_load(self) -> None:
+        """Test that a caller going away leaves the shared load running for the others."""
+        # Arrange
+        cache: TTLCache[int] = TTLCache(ttl=60)
+        load = SlowLoad()
+        cancelled = asyncio.create_task(cache.get("key", load))
+        waiter = asyncio.create_task(cache.get("key", load))
+        await asyncio.sleep(0)
+
+        # Act
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        load.release.set()
+        result = await waiter
+
+        # Assert
+        assert cancelled.cancelled()
+        assert result == 1
+        assert await cache.get("key", load) == 1
+        assert load.calls == 1
@@ -0,0 +1,106 @@
+import asyncio
+
+from health import HealthProber
+from tests.conftest import FakePool
+
+
+class ProbeConnection:
+    def __init__(self, release: asyncio.Event, error: Exception | None = None):
+        self.release = release
+        self.error = error
+        self.queries = 0
+        self.closed = False
+
+    async def fetchval(self, query: str) -> int:
+        self.queries += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return 1
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    def terminate(self) -> None:
+        self.closed = True
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class ProbeConnections:
+    """`connect` of the prober, handing out ProbeConnections that fail with the queued errors first."""
+
+    def __init__(self, *errors: Exception):
+        self.release = asyncio.Event()
+        self.release.set()
+        self.errors = list(errors)
+        self.opened: list[ProbeConnection] = []
+
+    async def __call__(self) -> ProbeConnection:
+        connection = ProbeConnection(self.release, self.errors.pop(0) if self.errors else None)
+        self.opened.append(connection)
+        return connection
+
+
+class TestHealthProber:
+    async def test_saturated_pool_is_healthy(self) -> None:
+        """Test that a pool with every connection checked out doesn't fail the probe."""
+        # Arrange
+        pool = FakePool("primary", max_size=2)
+        pool.in_use = 2
+        prober = HealthProber(pool, ProbeConnections(), timeout=0.1)
+
+        # Act
+        state = await prober.probe()
+
+        # Assert
+        assert prober.healthy
+        assert state.pool_saturation == 1.0
+
+    async def test_concurrent_probes_share_one_check(self) -> None:
+        """Test that deep checks arriving together run a single SELECT 1."""
+        # Arrange
+        connections = ProbeConnections()
+        connections.release.clear()
+        prober = HealthProber(FakePool("primary"), connections)
+
+        # Act
+        probes = [asyncio.create_task(prober.probe()) for _ in range(3)]
+        await asyncio.sleep(0)
+        connections.release.set()
+        states = await asyncio.gather(*probes)
+
+        # Assert
+        assert len(connections.opened) == 1
+        assert connections.opened[0].queries == 1
+        assert all(state is states[0] for state in states)
+
+    async def test_failed_probe_reconnects(self) -> None:
+        """Test that the probe connection is dropped after a failure and reopened by the next probe."""
+        # Arrange
+        connections = ProbeConnections(OSError("connection reset"))
+        prober = HealthProber(FakePool("primary"), connections)
+
+        # Act
+        failed = await prober.probe()
+        recovered = await prober.probe()
+
+        # Assert
+        assert (failed.healthy, failed.consecutive_failures) == (False, 1)
+        assert recovered.healthy
+        assert [connection.closed for connection in connections.opened] == [True, False]
+
+    async def test_recovery_calls_on_recover(self) -> None:
+        """Test that on_recover runs once when a probe succeeds after a failure, not on every healthy probe."""
+        # Arrange
+        recoveries = []
+        connections = ProbeConnections(OSError("connection reset"))
+        prober = HealthProber(FakePool("primary"), connections, on_recover=lambda: recoveries.append(True))
+
+        # Act
+        for _ in range(3):
+            await prober.probe()
+
+        # Assert
+        assert recoveries == [True]
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+import metrics
+from metrics import Histogram, PoolMetrics, render_metrics
+from tests.conftest import FakePool
+
+
+class TestHistogram:
+    def test_buckets_are_cumulative(self) -> None:
+        """Test that every bucket counts the observations up to its bound, +Inf and _count all of them."""
+        # Arrange
+        histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+
+        # Act
+        for value in (0.005, 0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        # Assert
+        assert histogram.render("latency", {"node": "primary"}) == [
+            'latency_bucket{node="primary",le="0.01"} 1',
+            'latency_bucket{node="primary",le="0.1"} 2',
+            'latency_bucket{node="primary",le="1.0"} 3',
+            'latency_bucket{node="primary",le="+Inf"} 4',
+            'latency_sum{node="primary"} 5.555',
+            'latency_count{node="primary"} 4',
+        ]
+
+
+class TestRenderMetrics:
+    async def test_acquire_wait_and_timeouts(self, pool_metrics: PoolMetrics, monkeypatch: Any) -> None:
+        """Test the exposition of a pool with one acquire that waited 30ms and one that timed out."""
+        # Arrange
+        clock = iter([10.0, 10.03, 20.0])
+        monkeypatch.setattr(metrics.time, "perf_counter", lambda: next(clock))
+        pool = FakePool("primary", max_size=4)
+        async with pool_metrics.acquire(pool, "primary"):
+            pass
+        pool.error = asyncio.TimeoutError()
+        with pytest.raises(asyncio.TimeoutError):
+            async with pool_metrics.acquire(pool, "primary", timeout=1.0):
+                pass
+
+        # Act
+        text = render_metrics({"primary": pool}, pool_metrics)
+
+        # Assert
+        lines = text.splitlines()
+        buckets = [line for line in lines if line.startswith("db_pool_acquire_wait_seconds_bucket")]
+        assert buckets[:4] == [
+            'db_pool_acquire_wait_seconds_bucket{node="primary",le="0.001"} 0',
+            'db_pool_acquire_wait_seconds_bucket{node="primary",le="0.005"} 0',
+            'db_pool_acquire_wait_seconds_bucket{node="primary",le="0.01"} 0',
+            'db_pool_acquire_wait_seconds_bucket{node="primary",le="0.025"} 0',
+        ]
+        assert all(line.endswith(" 1") for line in buckets[4:])
+        assert buckets[-1] == 'db_pool_acquire_wait_seconds_bucket{node="primary",le="+Inf"} 1'
+        assert 'db_pool_acquire_wait_seconds_count{node="primary"} 1' in lines
+        assert 'db_pool_acquire_timeouts_total{node="primary"} 1' in lines
+        assert 'db_pool_max_size{node="primary"} 4' in lines
+
+    async def test_text_format(self, pool_metrics: PoolMetrics) -> None:
+        """Test that every metric family is announced by HELP and TYPE and the output ends with a newline."""
+        # Act
+        text = render_metrics({"primary": FakePool("primary")}, pool_metrics)
+
+        # Assert
+        assert text.endswith("\n")
+        families: dict[str, str] = {}
+        for line in text.splitlines():
+            if line.startswith("# TYPE "):
+                _, _, name, kind = line.split()
+                families[name] = kind
+            elif not line.startswith("# HELP "):
+                name = line.split("{")[0].split()[0]
+                family = name.removesuffix("_bucket").removesuffix("_sum").removesuffix("_count")
+                assert family in families or name in families, line
+                assert float(line.rsplit(" ", 1)[1]) >= 0
+        assert families["db_pool_acquire_wait_seconds"] == "histogram"
+        assert families["db_pool_acquire_timeouts_total"] == "counter"
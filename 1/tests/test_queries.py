@@ -0,0 +1,80 @@
+from collections.abc import AsyncIterator
+
+import asyncpg
+import pytest
+
+from queries import QueryRegistry
+
+
+@pytest.fixture
+async def pool(postgres_dsn: str) -> AsyncIterator[asyncpg.Pool]:
+    pool = await asyncpg.create_pool(postgres_dsn, min_size=1, max_size=1)
+    await pool.execute("DROP TABLE IF EXISTS items; CREATE TABLE items (id int); INSERT INTO items VALUES (1)")
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+@pytest.fixture
+def queries(pool: asyncpg.Pool) -> QueryRegistry:
+    return QueryRegistry(lambda readonly: pool.acquire())
+
+
+class TestQueryRegistry:
+    async def test_statement_reused_across_checkouts(self, pool: asyncpg.Pool, queries: QueryRegistry) -> None:
+        """Test that a statement is prepared once per connection, not once per pool checkout."""
+        # Arrange
+        queries.register("items", "SELECT id FROM items")
+
+        # Act
+        results = [await queries.fetchval("items") for _ in range(3)]
+
+        # Assert
+        assert results == [1, 1, 1]
+        assert await pool.fetchval(
+            "SELECT count(*) FROM pg_prepared_statements WHERE statement = 'SELECT id FROM items'"
+        ) == 1
+
+    async def test_failing_statement_only_fails_itself(self, queries: QueryRegistry) -> None:
+        """Test that a statement that can't be prepared leaves the connection usable for the others."""
+        # Arrange
+        queries.register("items", "SELECT id FROM items")
+        queries.register("missing", "SELECT id FROM missing_table")
+
+        # Act
+        with pytest.raises(asyncpg.exceptions.UndefinedTableError):
+            await queries.fetchval("missing")
+        result = await queries.fetchval("items")
+
+        # Assert
+        assert result == 1
+
+    async def test_schema_change_is_reprepared(self, pool: asyncpg.Pool, queries: QueryRegistry) -> None:
+        """Test that a statement whose result type changed is prepared again outside a transaction."""
+        # Arrange
+        queries.register("items", "SELECT * FROM items")
+        await queries.fetch("items")
+        await pool.execute("ALTER TABLE items ALTER COLUMN id TYPE bigint")
+
+        # Act
+        result = await queries.fetchval("items")
+
+        # Assert
+        assert result == 1
+
+    async def test_schema_change_in_transaction_is_raised(self, pool: asyncpg.Pool, queries: QueryRegistry) -> None:
+        """Test that the stale plan error is raised inside a transaction, which it has already aborted."""
+        # Arrange
+        queries.register("items", "SELECT * FROM items")
+        await queries.fetch("items")
+        await pool.execute("ALTER TABLE items ALTER COLUMN id TYPE bigint")
+
+        async with pool.acquire() as connection:
+            # Act
+            with pytest.raises(asyncpg.exceptions.InvalidCachedStatementError):
+                async with connection.transaction():
+                    await queries.fetch("items", connection=connection)
+
+            # Assert
+            assert await queries.fetchval("items", connection=connection) == 1
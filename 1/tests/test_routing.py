@@ -0,0 +1,168 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+import asyncpg
+import pytest
+
+import routing
+from metrics import PoolMetrics, render_metrics
+from routing import READ_ONLY_SESSION, DatabaseNode, PoolRouter, create_replica_pool
+from tests.conftest import FakeProber, make_node
+
+
+async def read_node(router: PoolRouter) -> str:
+    async with router.acquire(readonly=True) as connection:
+        return connection.node
+
+
+class TestPoolRouter:
+    async def test_round_robin_over_healthy_replicas(self, pool_metrics: PoolMetrics) -> None:
+        """Test that reads rotate over the healthy replicas and skip unhealthy ones."""
+        # Arrange
+        replicas = [make_node("replica1"), make_node("replica2", healthy=False), make_node("replica3")]
+        router = PoolRouter(make_node("primary"), replicas, pool_metrics, routing="round_robin")
+
+        # Act
+        nodes = [await read_node(router) for _ in range(4)]
+
+        # Assert
+        assert nodes == ["replica1", "replica3", "replica1", "replica3"]
+
+    async def test_writes_go_to_primary(self, pool_metrics: PoolMetrics) -> None:
+        """Test that read-write connections always come from the primary."""
+        router = PoolRouter(make_node("primary"), [make_node("replica1")], pool_metrics)
+
+        async with router.acquire() as connection:
+            assert connection.node == "primary"
+
+    async def test_failover_order(self, pool_metrics: PoolMetrics) -> None:
+        """Test that a replica failing to hand out a connection falls through to the next one, then the primary."""
+        # Arrange
+        down = OSError("connection refused")
+        replicas = [make_node("replica1", error=down), make_node("replica2")]
+        router = PoolRouter(make_node("primary"), replicas, pool_metrics, routing="round_robin")
+        all_down = PoolRouter(
+            make_node("primary"),
+            [make_node("replica1", error=down), make_node("replica2", error=asyncio.TimeoutError())],
+            pool_metrics,
+        )
+
+        # Act
+        nodes = [await read_node(router) for _ in range(2)]
+        fallback = await read_node(all_down)
+
+        # Assert
+        assert nodes == ["replica2", "replica2"]
+        assert fallback == "primary"
+
+    async def test_primary_failure_is_raised(self, pool_metrics: PoolMetrics) -> None:
+        """Test that the last node's error reaches the caller once every node failed."""
+        router = PoolRouter(make_node("primary", error=OSError("down")), [], pool_metrics)
+
+        with pytest.raises(OSError):
+            await read_node(router)
+
+    async def test_primary_reads_are_read_only(self, pool_metrics: PoolMetrics) -> None:
+        """Test that a primary connection serving a read is switched to read-only, one serving a write is not."""
+        # Arrange
+        router = PoolRouter(make_node("primary"), [make_node("replica1", healthy=False)], pool_metrics)
+
+        # Act
+        async with router.acquire(readonly=True) as read:
+            pass
+        async with router.acquire() as write:
+            pass
+
+        # Assert
+        assert read.executed == [READ_ONLY_SESSION]
+        assert write.executed == []
+
+    async def test_acquire_wait_by_node(self, pool_metrics: PoolMetrics) -> None:
+        """Test that acquire wait times are labelled with the node that handed out the connection."""
+        # Arrange
+        router = PoolRouter(make_node("primary"), [make_node("replica1")], pool_metrics)
+
+        # Act
+        await read_node(router)
+        metrics = render_metrics({node.name: node.pool for node in router.nodes}, pool_metrics)
+
+        # Assert
+        assert 'db_pool_acquire_wait_seconds_count{node="replica1"} 1' in metrics
+        assert 'db_pool_acquire_wait_seconds_count{node="primary"} 0' in metrics
+        assert 'db_pool_acquire_timeouts_total{node="replica1"} 0' in metrics
+
+
+class FailingPool:
+    """Awaitable like the result of asyncpg.create_pool, failing after opening some connections."""
+
+    def __init__(self) -> None:
+        self.closed = False
+
+    def __await__(self) -> Any:
+        raise OSError("connection refused")
+        yield
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class TestCreateReplicaPool:
+    async def test_failed_pool_is_closed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a replica down at startup has its failed pool closed before the fallback one is opened."""
+        # Arrange
+        created: list[dict[str, Any]] = []
+        failing = FailingPool()
+
+        def create_pool(dsn: str, **options: Any) -> Any:
+            created.append(options)
+            return failing if len(created) == 1 else asyncio.sleep(0, result="fallback")
+
+        monkeypatch.setattr(routing.asyncpg, "create_pool", create_pool)
+
+        # Act
+        pool = await create_replica_pool("postgresql://replica", "replica1", min_size=5)
+
+        # Assert
+        assert pool == "fallback"
+        assert failing.closed
+        assert [options["min_size"] for options in created] == [5, 0]
+        assert all(options["server_settings"]["default_transaction_read_only"] == "on" for options in created)
+
+
+@pytest.fixture
+async def primary_pool(postgres_dsn: str) -> AsyncIterator[asyncpg.Pool]:
+    pool = await asyncpg.create_pool(postgres_dsn, min_size=1, max_size=1)
+    await pool.execute("DROP TABLE IF EXISTS writes; CREATE TABLE writes (id int)")
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+class TestReadOnlyConnections:
+    async def test_replica_pool_refuses_writes(self, postgres_dsn: str, primary_pool: asyncpg.Pool) -> None:
+        """Test that connections of a replica pool are read-only."""
+        pool = await create_replica_pool(postgres_dsn, "replica1", min_size=1, max_size=1)
+        try:
+            with pytest.raises(asyncpg.exceptions.ReadOnlySQLTransactionError):
+                await pool.execute("INSERT INTO writes VALUES (1)")
+        finally:
+            await pool.close()
+
+    async def test_primary_read_refuses_writes_until_released(
+        self, pool_metrics: PoolMetrics, primary_pool: asyncpg.Pool
+    ) -> None:
+        """Test that a read served by the primary can't write and the connection writes again once released."""
+        # Arrange
+        router = PoolRouter(DatabaseNode("primary", primary_pool, FakeProber()), [], pool_metrics)
+
+        # Act
+        async with router.acquire(readonly=True) as connection:
+            with pytest.raises(asyncpg.exceptions.ReadOnlySQLTransactionError):
+                await connection.execute("INSERT INTO writes VALUES (1)")
+        async with router.acquire() as connection:
+            await connection.execute("INSERT INTO writes VALUES (2)")
+
+        # Assert
+        assert await primary_pool.fetchval("SELECT array_agg(id) FROM writes") == [2]
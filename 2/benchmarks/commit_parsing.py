@@ -0,0 +1,95 @@
+"""
+Microbenchmark of commit parsing: pydantic models vs raw JSON fast path, json vs orjson decoding.
+
+Usage (from the task 2 directory):
+    python -m benchmarks.commit_parsing --commits 5000 --repeat 20
+"""
+
+import argparse
+import json
+import timeit
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from main import commit_author_name
+from models import GitHubCommit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_commits(count: int, authors: int) -> list[dict[str, Any]]:
+    today = datetime.now(timezone.utc).isoformat()
+    return [
+        {
+            "sha": f"{i:040x}",
+            "node_id": f"C_{i}",
+            "url": f"https://api.github.com/repos/owner/repo/commits/{i:040x}",
+            "html_url": f"https://github.com/owner/repo/commit/{i:040x}",
+            "commit": {
+                "author": {"name": f"Author {i % authors}", "email": f"author{i % authors}@example.com", "date": today},
+                "committer": {"name": "GitHub", "email": "noreply@github.com", "date": today},
+                "message": f"Commit message {i}\n\nLonger description of the change.",
+                "comment_count": 0,
+            },
+            "parents": [{"sha": f"{i - 1:040x}"}],
+        }
+        for i in range(count)
+    ]
+
+
+def count_with_models(commits: list[dict[str, Any]]) -> dict[str, int]:
+    author_commits: defaultdict[str, int] = defaultdict(int)
+    for commit in (GitHubCommit(**commit) for commit in commits):
+        if commit.commit.author and commit.commit.author.name:
+            author_commits[commit.commit.author.name] += 1
+    return author_commits
+
+
+def count_fast(commits: list[dict[str, Any]]) -> dict[str, int]:
+    author_commits: defaultdict[str, int] = defaultdict(int)
+    for commit in commits:
+        author_name = commit_author_name(commit)
+        if author_name:
+            author_commits[author_name] += 1
+    return author_commits
+
+
+def report(name: str, func: Callable[[], Any], repeat: int, items: int) -> float:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{name:<32} {best * 1000:>10.2f} ms {items / best:>14,.0f} commits/s")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--authors", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    commits = make_commits(args.commits, args.authors)
+    payload = json.dumps(commits).encode()
+    assert count_with_models(commits) == count_fast(commits)
+
+    print(f"{args.commits} commits, {len(payload) / 1024:.0f} KiB of JSON, best of {args.repeat}\n")
+
+    print("Counting authors from decoded JSON")
+    models = report("pydantic GitHubCommit", lambda: count_with_models(commits), args.repeat, args.commits)
+    fast = report("fast path", lambda: count_fast(commits), args.repeat, args.commits)
+    print(f"speedup: {models / fast:.1f}x\n")
+
+    print("Decoding response bytes")
+    stdlib = report("json.loads", lambda: json.loads(payload), args.repeat, args.commits)
+    if orjson is not None:
+        fast_decode = report("orjson.loads", lambda: orjson.loads(payload), args.repeat, args.commits)
+        print(f"speedup: {stdlib / fast_decode:.1f}x")
+    else:
+        print("orjson is not installed, skipping")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,4 +14,14 @@ class Settings(BaseSettings):
     github_token: str = Field(...)
     max_concurrent_requests: int = Field(default=10, ge=1, le=100)
     requests_per_second: int = Field(default=5, ge=1, le=100)
-    top_repositories_limit: int = Field(default=100, ge=1, le=100)
+    top_repositories_limit: int = Field(default=100, ge=1, le=10000)
+    commits_backend: Literal["rest", "graphql"] = Field(default="rest")
+    graphql_batch_size: int = Field(default=20, ge=1, le=100)
+    validate_commits: bool = Field(default=False)
+    retry_max_attempts: int = Field(default=3, ge=1, le=10)
+    retry_backoff_base: float = Field(default=0.5, gt=0)
+    retry_backoff_max: float = Field(default=30.0, gt=0)
+    retry_jitter: float = Field(default=0.5, ge=0, le=1)
+    retry_statuses: list[int] = Field(default=[429, 500, 502, 503, 504])
+    response_cache_path: str | None = Field(default=None)
+    response_cache_max_entries: int = Field(default=10000, ge=1)
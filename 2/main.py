@@ -1,18 +1,30 @@
 import asyncio
 import logging
+import math
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Final
+from datetime import date, datetime, timedelta, timezone
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Final
 from urllib.parse import parse_qs, urlparse
 
-from aiohttp import ClientSession
-from aiolimiter import AsyncLimiter
+from aiohttp import ClientResponseError, ClientSession
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from cache import ResponseCache
 from models import GitHubCommit, GitHubRepository
+from rate_limiter import RATE_LIMITED_STATUSES, AdaptiveRateLimiter, github_resource
+from retry import RetryPolicy, RetryStats
 
 GITHUB_API_BASE_URL: Final[str] = "https://api.github.com"
 MAX_REPOS_PER_REQUEST: Final[int] = 100
+SEARCH_RESULTS_LIMIT: Final[int] = 1000
+MIN_REPOSITORY_STARS: Final[int] = 2
+GITHUB_LAUNCH_DATE: Final[date] = date(2007, 10, 1)
 
 
 @dataclass
@@ -33,13 +45,26 @@ class Repository:
     authors_commits_num_today: list[RepositoryAuthorCommitsNum]
 
 
+def commit_author_name(commit: dict[str, Any]) -> str | None:
+    """Fast path for `GitHubCommit(**commit).commit.author.name` without model construction."""
+    author = (commit.get("commit") or {}).get("author") or {}
+    return author.get("name")
+
+
 class GithubReposScrapper:
     def __init__(
         self,
         access_token: str,
         max_concurrent_requests: int = 10,
         requests_per_second: int = 5,
+        cache: ResponseCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        validate_commits: bool = False,
     ):
+        """
+        Commits are read straight from the decoded JSON, `validate_commits` builds
+        GitHubCommit models for every commit instead (slower, fails on malformed payloads).
+        """
         self._session = ClientSession(
             headers={
                 "Accept": "application/vnd.github.v3+json",
@@ -47,14 +72,89 @@ class GithubReposScrapper:
             }
         )
         self._semaphore = asyncio.Semaphore(max_concurrent_requests)
-        self._rate_limiter = AsyncLimiter(max_rate=requests_per_second, time_period=1.0)
+        self._rate_limiter = AdaptiveRateLimiter(max_rate=requests_per_second)
+        self._cache = cache
+        self._retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self._validate_commits = validate_commits
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> tuple[Any, dict[str, str]]:
+        """Send a request, retrying transient failures according to the retry policy."""
+        attempt = 1
+        while True:
+            try:
+                result = await self._send_request(endpoint, method, params, json)
+            except Exception as e:
+                delay = self._retry_policy.retry_delay(e, attempt)
+                if delay is None:
+                    if attempt > 1:
+                        self.retry_stats.exhausted += 1
+                    raise
+
+                self.retry_stats.record_retry(e)
+                logging.warning(f"Retrying {method} {endpoint} in {delay:.1f}s (attempt {attempt}): {e!r}")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            if attempt > 1:
+                self.retry_stats.recovered += 1
+            return result
 
-    async def _make_request(self, endpoint: str, method: str = "GET", params: dict[str, Any] | None = None) -> tuple[Any, dict[str, str]]:
+    async def _send_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> tuple[Any, dict[str, str]]:
+        cached = None
+        request_headers = {}
+        if self._cache is not None and method == "GET":
+            cached = self._cache.get(endpoint, params)
+            if cached is not None:
+                request_headers = cached.conditional_headers()
+
+        resource = github_resource(endpoint)
         async with self._semaphore:
-            await self._rate_limiter.acquire()
-            async with self._session.request(method, f"{GITHUB_API_BASE_URL}/{endpoint}", params=params) as response:
+            await self._rate_limiter.acquire(resource)
+            async with self._session.request(
+                method, f"{GITHUB_API_BASE_URL}/{endpoint}", params=params, json=json, headers=request_headers
+            ) as response:
+                message = await response.text() if response.status in RATE_LIMITED_STATUSES else ""
+                self._rate_limiter.update(response.status, response.headers, resource, message)
+
+                if cached is not None and response.status == HTTPStatus.NOT_MODIFIED:
+                    self._cache.record_hit()
+                    return cached.data, {**cached.headers, **dict(response.headers)}
+
+                if response.status in RATE_LIMITED_STATUSES:
+                    # The body tells a secondary rate limit from a permission error, the retry policy needs it.
+                    raise ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=message,
+                        headers=response.headers,
+                    )
                 response.raise_for_status()
-                return await response.json(), dict(response.headers)
+                data, headers = json_loads(await response.read()), dict(response.headers)
+
+        if self._cache is not None and method == "GET":
+            self._cache.record_miss()
+            self._cache.put(endpoint, params, data, headers)
+        return data, headers
+
+    @property
+    def current_rate(self) -> float:
+        """Requests per second the rate limiter currently allows."""
+        return self._rate_limiter.rate
 
     def _parse_link_header(self, link_header: str) -> dict[str, str]:
         """
@@ -95,7 +195,12 @@ class GithubReposScrapper:
             return data
         return []
 
-    async def _fetch_paginated(self, endpoint: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    async def _fetch_paginated(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Fetch paginated results from GitHub API concurrently.
         First page is fetched to discover total pages, then remaining pages are fetched in parallel.
@@ -105,17 +210,7 @@ class GithubReposScrapper:
         data, headers = await self._make_request(endpoint, params=current_params)
         all_items = self._extract_items(data)
 
-        link_header = headers.get("Link", "")
-        links = self._parse_link_header(link_header)
-
-        last_url = links.get("last")
-        if not last_url:
-            return all_items
-
-        parsed = urlparse(last_url)
-        query_params = parse_qs(parsed.query)
-        last_page = int(query_params.get("page", ["1"])[0])
-
+        last_page = self._get_last_page(headers, max_pages)
         if last_page > 1:
             tasks = []
             for page_num in range(2, last_page + 1):
@@ -129,70 +224,219 @@ class GithubReposScrapper:
 
         return all_items
 
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Streaming variant of _fetch_paginated: yields each page as soon as it arrives (completion order).
+        Pages are not retained after being yielded, so callers can fold them without holding the whole result.
+        """
+        current_params = params or {}
+
+        data, headers = await self._make_request(endpoint, params=current_params)
+        yield self._extract_items(data)
+
+        pending: set[asyncio.Task[tuple[Any, dict[str, str]]]] = set()
+        for page_num in range(2, self._get_last_page(headers, max_pages) + 1):
+            task = asyncio.create_task(self._make_request(endpoint, params={**current_params, "page": page_num}))
+            task.add_done_callback(pending.discard)
+            pending.add(task)
+
+        try:
+            for next_page in asyncio.as_completed(pending):
+                data, _ = await next_page
+                yield self._extract_items(data)
+        finally:
+            unfinished = list(pending)
+            for task in unfinished:
+                task.cancel()
+            # Wait for the cancellations so no task outlives the generator and failures are retrieved.
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def _get_last_page(self, headers: dict[str, str], max_pages: int | None = None) -> int:
+        links = self._parse_link_header(headers.get("Link", ""))
+
+        last_url = links.get("last")
+        if not last_url:
+            return 1
+
+        parsed = urlparse(last_url)
+        query_params = parse_qs(parsed.query)
+        last_page = int(query_params.get("page", ["1"])[0])
+        if max_pages is not None:
+            last_page = min(last_page, max_pages)
+        return last_page
+
     async def _get_top_repositories(self, limit: int = 100) -> list[GitHubRepository]:
         """
         GitHub REST API: https://docs.github.com/en/rest/search/search?apiVersion=2022-11-28#search-repositories
+        Search returns at most 1000 results per query, larger limits are split into star ranges.
         """
+        if limit > SEARCH_RESULTS_LIMIT:
+            return await self._get_top_repositories_partitioned(limit)
+
+        repos = await self._search_repositories("stars:>1", limit)
+        return [GitHubRepository(**repo) for repo in repos]
+
+    async def _search_repositories(self, query: str, limit: int = SEARCH_RESULTS_LIMIT) -> list[dict[str, Any]]:
         per_page = min(limit, MAX_REPOS_PER_REQUEST)
+        repos = await self._fetch_paginated(
+            endpoint="search/repositories",
+            params={"q": query, "sort": "stars", "order": "desc", "per_page": per_page},
+            max_pages=math.ceil(min(limit, SEARCH_RESULTS_LIMIT) / per_page),
+        )
+        return repos[:limit]
+
+    async def _probe_repositories(self, query: str) -> tuple[int, list[dict[str, Any]]]:
+        """Return total_count for a search query together with its top repository."""
         data, _ = await self._make_request(
             endpoint="search/repositories",
-            params={"q": "stars:>1", "sort": "stars", "order": "desc", "per_page": per_page},
+            params={"q": query, "sort": "stars", "order": "desc", "per_page": 1},
         )
-        repos = data.get("items", [])
-        return [GitHubRepository(**repo) for repo in repos]
+        return data.get("total_count", 0), data.get("items", [])
 
-    async def _get_repository_commits(self, owner: str, repo: str) -> list[GitHubCommit]:
+    async def _split_star_range(self, low: int, high: int) -> list[str]:
+        """
+        Split `stars:low..high` into search queries matching at most 1000 repositories each, highest stars first.
+        Ranges are halved geometrically since stars are heavy-tailed, both halves are explored concurrently.
+        A single star count matching more than 1000 repositories is split further by creation date.
+        """
+        query = f"stars:{low}..{high}"
+        count, _ = await self._probe_repositories(query)
+        if count == 0:
+            return []
+        if count <= SEARCH_RESULTS_LIMIT:
+            return [query]
+        if low == high:
+            return await self._split_created_range(query, GITHUB_LAUNCH_DATE, datetime.now(timezone.utc).date())
+
+        mid = min(max(math.isqrt(low * high), low), high - 1)
+        upper, lower = await asyncio.gather(
+            self._split_star_range(mid + 1, high),
+            self._split_star_range(low, mid),
+        )
+        return upper + lower
+
+    async def _split_created_range(self, stars_query: str, start: date, end: date) -> list[str]:
+        """Split `stars_query` by `created:start..end` into queries matching at most 1000 repositories each."""
+        query = f"{stars_query} created:{start.isoformat()}..{end.isoformat()}"
+        count, _ = await self._probe_repositories(query)
+        if count == 0:
+            return []
+        if count <= SEARCH_RESULTS_LIMIT:
+            return [query]
+        if start == end:
+            logging.warning(f"{count} repositories match {query!r}, only the first {SEARCH_RESULTS_LIMIT} are fetched")
+            return [query]
+
+        mid = start + (end - start) // 2
+        newer, older = await asyncio.gather(
+            self._split_created_range(stars_query, mid + timedelta(days=1), end),
+            self._split_created_range(stars_query, start, mid),
+        )
+        return newer + older
+
+    async def _find_min_stars(self, limit: int, max_stars: int) -> int:
+        """Find the highest star threshold that still matches at least `limit` repositories."""
+        thresholds = []
+        threshold = max_stars
+        while threshold > MIN_REPOSITORY_STARS:
+            threshold = max(threshold // 2, MIN_REPOSITORY_STARS)
+            thresholds.append(threshold)
+
+        counts = await asyncio.gather(*(self._probe_repositories(f"stars:>={t}") for t in thresholds))
+        for threshold, (count, _) in zip(thresholds, counts):
+            if count >= limit:
+                return threshold
+        return MIN_REPOSITORY_STARS
+
+    async def _get_top_repositories_partitioned(self, limit: int) -> list[GitHubRepository]:
+        _, top = await self._probe_repositories(f"stars:>={MIN_REPOSITORY_STARS}")
+        if not top:
+            return []
+
+        max_stars = top[0].get("stargazers_count", MIN_REPOSITORY_STARS)
+        min_stars = await self._find_min_stars(limit, max_stars)
+        queries = await self._split_star_range(min_stars, max_stars)
+
+        slices = await asyncio.gather(*(self._search_repositories(query) for query in queries))
+        repos = [repo for slice_repos in slices for repo in slice_repos]
+        return [GitHubRepository(**repo) for repo in repos[:limit]]
+
+    def _commits_since(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(days=1)
+
+    def _commits_request(self, owner: str, repo: str) -> tuple[str, dict[str, Any]]:
         """
         GitHub REST API: https://docs.github.com/en/rest/commits/commits?apiVersion=2022-11-28#list-commits
         """
-        since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
-        all_commits = await self._fetch_paginated(  # number of commits may exceed github fetch limit (100)
-            endpoint=f"repos/{owner}/{repo}/commits",
-            params={"since": since, "per_page": 100},
+        since = self._commits_since().isoformat()
+        return f"repos/{owner}/{repo}/commits", {"since": since, "per_page": 100}
+
+    async def _get_authors_commits(self, repo_data: GitHubRepository) -> dict[str, int]:
+        owner = repo_data.owner.login
+        repo_name = repo_data.name
+
+        author_commits: defaultdict[str, int] = defaultdict(int)
+        endpoint, params = self._commits_request(owner, repo_name)
+        try:
+            async for page in self._iter_pages(endpoint, params):
+                for author_name in self._page_author_names(page):
+                    if author_name:
+                        author_commits[author_name] += 1
+        except Exception as e:
+            logging.error(f"Failed to fetch commits for {owner}/{repo_name}: {e}")
+            author_commits.clear()
+
+        return author_commits
+
+    def _page_author_names(self, page: list[dict[str, Any]]) -> list[str | None]:
+        if not self._validate_commits:
+            return [commit_author_name(commit) for commit in page]
+
+        commits = [GitHubCommit(**commit) for commit in page]
+        return [commit.commit.author.name if commit.commit.author else None for commit in commits]
+
+    def _build_repository(
+        self,
+        repo_data: GitHubRepository,
+        position: int,
+        author_commits: dict[str, int],
+    ) -> Repository:
+        authors_commits_num_today = [
+            RepositoryAuthorCommitsNum(author=author, commits_num=count)
+            for author, count in author_commits.items()
+        ]
+
+        return Repository(
+            name=repo_data.name,
+            owner=repo_data.owner.login,
+            position=position,
+            stars=repo_data.stargazers_count,
+            watchers=repo_data.watchers_count,
+            forks=repo_data.forks_count,
+            language=repo_data.language or "Unknown",
+            authors_commits_num_today=authors_commits_num_today,
         )
-        return [GitHubCommit(**commit) for commit in all_commits]
+
+    async def _process_repository(self, repo_data: GitHubRepository, position: int) -> Repository:
+        author_commits = await self._get_authors_commits(repo_data)
+        return self._build_repository(repo_data, position, author_commits)
 
     async def get_repositories(self, limit: int = 100) -> list[Repository]:
         top_repos = await self._get_top_repositories(limit)
 
-        async def process_repository(repo_data: GitHubRepository, position: int) -> Repository:
-            owner = repo_data.owner.login
-            repo_name = repo_data.name
-
-            try:
-                commits = await self._get_repository_commits(owner, repo_name)
-            except Exception as e:
-                logging.error(f"Failed to fetch commits for {owner}/{repo_name}: {e}")
-                commits = []
-
-            author_commits: defaultdict[str, int] = defaultdict(int)
-            for commit in commits:
-                if commit.commit.author and commit.commit.author.name:
-                    author_name = commit.commit.author.name
-                    author_commits[author_name] += 1
-
-            authors_commits_num_today = [
-                RepositoryAuthorCommitsNum(author=author, commits_num=count)
-                for author, count in author_commits.items()
-            ]
-
-            return Repository(
-                name=repo_name,
-                owner=owner,
-                position=position,
-                stars=repo_data.stargazers_count,
-                watchers=repo_data.watchers_count,
-                forks=repo_data.forks_count,
-                language=repo_data.language or "Unknown",
-                authors_commits_num_today=authors_commits_num_today,
-            )
-
         tasks = [
-            process_repository(repo, position + 1)
+            self._process_repository(repo, position + 1)
             for position, repo in enumerate(top_repos)
         ]
         repositories = await asyncio.gather(*tasks)
         return list(repositories)
 
     async def close(self):
+        if self._cache is not None:
+            self._cache.save()
         await self._session.close()
@@ -1,17 +1,46 @@
 import asyncio
 
+from cache import ResponseCache
 from config import Settings
+from github_graphql import GithubGraphQLReposScrapper
 from main import GithubReposScrapper
+from retry import RetryPolicy
 
 
 async def main():
     settings = Settings()
-    scrapper = GithubReposScrapper(
-        access_token=settings.github_token,
-        max_concurrent_requests=settings.max_concurrent_requests,
-        requests_per_second=settings.requests_per_second,
+    cache = None
+    if settings.response_cache_path:
+        cache = ResponseCache(settings.response_cache_path, max_entries=settings.response_cache_max_entries)
+
+    retry_policy = RetryPolicy(
+        max_attempts=settings.retry_max_attempts,
+        backoff_base=settings.retry_backoff_base,
+        backoff_max=settings.retry_backoff_max,
+        jitter=settings.retry_jitter,
+        retryable_statuses=frozenset(settings.retry_statuses),
     )
 
+    if settings.commits_backend == "graphql":
+        scrapper = GithubGraphQLReposScrapper(
+            access_token=settings.github_token,
+            max_concurrent_requests=settings.max_concurrent_requests,
+            requests_per_second=settings.requests_per_second,
+            batch_size=settings.graphql_batch_size,
+            cache=cache,
+            retry_policy=retry_policy,
+            validate_commits=settings.validate_commits,
+        )
+    else:
+        scrapper = GithubReposScrapper(
+            access_token=settings.github_token,
+            max_concurrent_requests=settings.max_concurrent_requests,
+            requests_per_second=settings.requests_per_second,
+            cache=cache,
+            retry_policy=retry_policy,
+            validate_commits=settings.validate_commits,
+        )
+
     try:
         repositories = await scrapper.get_repositories(limit=settings.top_repositories_limit)
 
@@ -23,6 +52,14 @@ async def main():
                 print(f"     - {author_commit.author}: {author_commit.commits_num} commits")
     finally:
         await scrapper.close()
+        retry_stats = scrapper.retry_stats
+        print(
+            f"\nRetries: {retry_stats.retries} ({dict(retry_stats.reasons)}), "
+            f"{retry_stats.recovered} recovered, {retry_stats.exhausted} exhausted"
+        )
+        if cache:
+            stats = cache.stats
+            print(f"\nResponse cache: {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions")
 
 
 if __name__ == "__main__":
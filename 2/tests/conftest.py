@@ -1,7 +1,12 @@
+import re
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from typing import Any
 
 import pytest
+from aioresponses import aioresponses
+
+from models import GitHubRepository
 
 
 @pytest.fixture
@@ -331,3 +336,32 @@ def mock_commits_data() -> dict[str, list[dict[str, Any]]]:
             },
         ],
     }
+
+
+@pytest.fixture
+def mock_commit_pages(mock_repositories_data: list[dict[str, Any]]) -> Iterator[GitHubRepository]:
+    """
+    Mocked commits of the first repository served as three pages (100, 100 and 51 commits)
+    alternately authored by "Author 0" and "Author 1".
+    """
+    repo = GitHubRepository(**mock_repositories_data[0])
+    commits_url = rf"https://api\.github\.com/repos/{repo.owner.login}/{repo.name}/commits\?"
+    today = datetime.now(timezone.utc).isoformat()
+
+    def page(start: int, end: int) -> list[dict[str, Any]]:
+        return [
+            {"sha": f"sha{i}", "commit": {"author": {"name": f"Author {i % 2}", "date": today}}}
+            for i in range(start, end)
+        ]
+
+    with aioresponses() as m:
+        m.get(
+            re.compile(commits_url + ".*"),
+            payload=page(0, 100),
+            headers={
+                "Link": f'<https://api.github.com/repos/{repo.owner.login}/{repo.name}/commits?page=3>; rel="last"'
+            },
+        )
+        m.get(re.compile(commits_url + ".*page=2.*"), payload=page(100, 200))
+        m.get(re.compile(commits_url + ".*page=3.*"), payload=page(200, 251))
+        yield repo
@@ -0,0 +1,103 @@
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aioresponses import aioresponses
+
+from cache import ResponseCache
+from main import GithubReposScrapper
+
+
+class TestResponseCache:
+    def test_lru_eviction(self) -> None:
+        """Test that least recently used entries are evicted when the cache is full."""
+        # Arrange
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", None, data=1, headers={"ETag": '"a"'})
+        cache.put("b", None, data=2, headers={"ETag": '"b"'})
+
+        # Act
+        cache.get("a")
+        cache.put("c", None, data=3, headers={"ETag": '"c"'})
+
+        # Assert
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats.evictions == 1
+
+    def test_responses_without_validators_not_cached(self) -> None:
+        """Test that responses without ETag or Last-Modified are not stored."""
+        # Arrange
+        cache = ResponseCache()
+
+        # Act
+        cache.put("a", {"page": 1}, data=[1], headers={})
+
+        # Assert
+        assert cache.get("a", {"page": 1}) is None
+
+    def test_key_independent_of_params_order(self) -> None:
+        """Test that cache keys do not depend on params order."""
+        assert ResponseCache.make_key("e", {"a": 1, "b": 2}) == ResponseCache.make_key("e", {"b": 2, "a": 1})
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        """Test that entries survive save and load."""
+        # Arrange
+        path = tmp_path / "cache.json"
+        cache = ResponseCache(path)
+        cache.put("a", {"page": 2}, data=[{"sha": "x"}], headers={"ETag": '"a"', "Link": "<url>"})
+
+        # Act
+        cache.save()
+        restored = ResponseCache(path)
+
+        # Assert
+        entry = restored.get("a", {"page": 2})
+        assert entry is not None
+        assert entry.data == [{"sha": "x"}]
+        assert entry.conditional_headers() == {"If-None-Match": '"a"'}
+
+
+class TestConditionalRequests:
+    @pytest.mark.asyncio
+    async def test_not_modified_served_from_cache(
+        self,
+        mock_github_token: str,
+        mock_repositories_data: list[dict[str, Any]],
+    ) -> None:
+        """Test that a 304 response returns the cached body and counts as a hit."""
+        # Arrange
+        cache = ResponseCache()
+        sent_headers: list[dict[str, str]] = []
+        params = {"q": "stars:>1"}
+
+        def record_headers(url: Any, **kwargs: Any) -> None:
+            sent_headers.append(kwargs.get("headers") or {})
+
+        with aioresponses() as m:
+            url = re.compile(r"https://api\.github\.com/search/repositories\?.*")
+            m.get(url, payload={"items": mock_repositories_data}, headers={"ETag": '"v1"'}, callback=record_headers)
+            m.get(url, status=304, callback=record_headers)
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                max_concurrent_requests=5,
+                requests_per_second=10,
+                cache=cache,
+            )
+
+            try:
+                # Act
+                first, _ = await scrapper._make_request("search/repositories", params=params)
+                second, _ = await scrapper._make_request("search/repositories", params=params)
+
+                # Assert
+                assert second == first
+                assert "If-None-Match" not in sent_headers[0]
+                assert sent_headers[1]["If-None-Match"] == '"v1"'
+                assert cache.stats.hits == 1
+                assert cache.stats.misses == 1
+            finally:
+                await scrapper.close()
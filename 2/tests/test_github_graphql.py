@@ -0,0 +1,170 @@
+import re
+from typing import Any
+
+import pytest
+from aioresponses import CallbackResult, aioresponses
+
+from github_graphql import GithubGraphQLReposScrapper
+from main import GithubReposScrapper, Repository
+
+
+def fake_graphql_server(commits_by_repo: dict[str, list[dict[str, Any]]], queries: list[dict[str, Any]]) -> Any:
+    """Answer aliased `repository` history queries from REST-shaped commit fixtures."""
+
+    def callback(url: Any, **kwargs: Any) -> CallbackResult:
+        body = kwargs["json"]
+        queries.append(body)
+        variables = body["variables"]
+        first = variables["first"]
+
+        data: dict[str, Any] = {}
+        for alias in re.findall(r"(r\d+): repository", body["query"]):
+            i = alias[1:]
+            repo_key = f"{variables[f'owner{i}']}/{variables[f'name{i}']}"
+            if repo_key not in commits_by_repo:
+                data[alias] = None
+                continue
+
+            commits = commits_by_repo[repo_key]
+            offset = int(variables[f"cursor{i}"] or 0)
+            page = commits[offset : offset + first]
+            data[alias] = {
+                "defaultBranchRef": {
+                    "target": {
+                        "history": {
+                            "pageInfo": {
+                                "hasNextPage": offset + first < len(commits),
+                                "endCursor": str(offset + first),
+                            },
+                            "nodes": [{"author": commit["commit"]["author"]} for commit in page],
+                        }
+                    }
+                }
+            }
+        return CallbackResult(payload={"data": data})
+
+    return callback
+
+
+def authors_by_repo(repositories: list[Repository]) -> dict[str, dict[str, int]]:
+    return {
+        f"{repo.owner}/{repo.name}": {item.author: item.commits_num for item in repo.authors_commits_num_today}
+        for repo in repositories
+    }
+
+
+class TestGraphQLBackend:
+    @pytest.mark.asyncio
+    async def test_parity_with_rest(
+        self,
+        mock_github_token: str,
+        mock_repositories_data: list[dict[str, Any]],
+        mock_commits_data: dict[str, list[dict[str, Any]]],
+    ) -> None:
+        """Test that the GraphQL backend produces the same repositories as the REST backend in fewer requests."""
+        # Arrange
+        limit = 5
+        queries: list[dict[str, Any]] = []
+
+        with aioresponses() as m:
+            m.get(
+                re.compile(r"https://api\.github\.com/search/repositories\?.*"),
+                payload={"items": mock_repositories_data[:limit]},
+                repeat=True,
+            )
+            for repo in mock_repositories_data[:limit]:
+                owner = repo["owner"]["login"]
+                name = repo["name"]
+                m.get(
+                    re.compile(rf"https://api\.github\.com/repos/{owner}/{name}/commits\?.*"),
+                    payload=mock_commits_data.get(f"{owner}/{name}", []),
+                )
+            m.post(
+                "https://api.github.com/graphql",
+                callback=fake_graphql_server(mock_commits_data, queries),
+                repeat=True,
+            )
+
+            rest_scrapper = GithubReposScrapper(mock_github_token, max_concurrent_requests=5, requests_per_second=100)
+            graphql_scrapper = GithubGraphQLReposScrapper(
+                mock_github_token,
+                max_concurrent_requests=5,
+                requests_per_second=100,
+                batch_size=3,
+            )
+
+            try:
+                # Act
+                rest_repositories = await rest_scrapper.get_repositories(limit=limit)
+                graphql_repositories = await graphql_scrapper.get_repositories(limit=limit)
+
+                # Assert
+                assert [repo.position for repo in graphql_repositories] == [repo.position for repo in rest_repositories]
+                assert authors_by_repo(graphql_repositories) == authors_by_repo(rest_repositories)
+                assert sorted(query["query"].count(": repository(") for query in queries) == [2, 3]
+            finally:
+                await rest_scrapper.close()
+                await graphql_scrapper.close()
+
+    @pytest.mark.asyncio
+    async def test_history_pagination(
+        self,
+        mock_github_token: str,
+        mock_repositories_data: list[dict[str, Any]],
+    ) -> None:
+        """Test that repositories with more than one history page are followed by cursor."""
+        # Arrange
+        repo = mock_repositories_data[0]
+        repo_key = f"{repo['owner']['login']}/{repo['name']}"
+        commits = [
+            {"sha": f"sha{i}", "commit": {"author": {"name": f"Author {i % 3}", "date": "2025-01-01T00:00:00Z"}}}
+            for i in range(250)
+        ]
+        queries: list[dict[str, Any]] = []
+
+        with aioresponses() as m:
+            m.get(re.compile(r"https://api\.github\.com/search/repositories\?.*"), payload={"items": [repo]})
+            m.post(
+                "https://api.github.com/graphql",
+                callback=fake_graphql_server({repo_key: commits}, queries),
+                repeat=True,
+            )
+
+            scrapper = GithubGraphQLReposScrapper(mock_github_token, requests_per_second=100)
+
+            try:
+                # Act
+                repositories = await scrapper.get_repositories(limit=1)
+
+                # Assert
+                assert authors_by_repo(repositories) == {repo_key: {"Author 0": 84, "Author 1": 83, "Author 2": 83}}
+                assert [query["variables"]["cursor0"] for query in queries] == [None, "100", "200"]
+            finally:
+                await scrapper.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_repository_has_no_commits(
+        self,
+        mock_github_token: str,
+        mock_repositories_data: list[dict[str, Any]],
+    ) -> None:
+        """Test that a repository resolved to null is recorded without commits."""
+        # Arrange
+        with aioresponses() as m:
+            m.get(
+                re.compile(r"https://api\.github\.com/search/repositories\?.*"),
+                payload={"items": mock_repositories_data[:1]},
+            )
+            m.post("https://api.github.com/graphql", callback=fake_graphql_server({}, []))
+
+            scrapper = GithubGraphQLReposScrapper(mock_github_token, requests_per_second=100)
+
+            try:
+                # Act
+                repositories = await scrapper.get_repositories(limit=1)
+
+                # Assert
+                assert len(repositories) == 1
+                assert repositories[0].authors_commits_num_today == []
+            finally:
+                await scrapper.close()
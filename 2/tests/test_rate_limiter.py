@@ -0,0 +1,161 @@
+import re
+import time
+
+import pytest
+from aioresponses import aioresponses
+
+from main import GithubReposScrapper
+from rate_limiter import AdaptiveRateLimiter
+
+
+class TestAdaptiveRateLimiter:
+    @pytest.mark.asyncio
+    async def test_rate_spends_remaining_budget_until_reset(self) -> None:
+        """Test that the rate is derived from remaining requests and reset time."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=100)
+        reset_at = time.time() + 100
+
+        # Act
+        limiter.update(200, {"X-RateLimit-Remaining": "500", "X-RateLimit-Reset": str(reset_at)})
+
+        # Assert
+        assert limiter.rate == pytest.approx(5, rel=0.05)
+        assert limiter.remaining == 500
+        assert limiter.blocked_for == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_capped_by_max_rate(self) -> None:
+        """Test that a large budget never exceeds the configured maximum rate."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10)
+
+        # Act
+        limiter.update(200, {"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": str(time.time() + 10)})
+
+        # Assert
+        assert limiter.rate == 10
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_blocks_until_reset(self) -> None:
+        """Test that requests are paused until reset when no requests remain."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10)
+
+        # Act
+        limiter.update(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 30)})
+
+        # Assert
+        assert limiter.blocked_for == pytest.approx(30, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_respected(self) -> None:
+        """Test that Retry-After pauses requests for the given number of seconds."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10)
+
+        # Act
+        limiter.update(429, {"Retry-After": "7"})
+
+        # Assert
+        assert limiter.blocked_for == pytest.approx(7, abs=0.5)
+
+    @pytest.mark.asyncio
+    async def test_secondary_limit_backoff_grows_and_resets(self) -> None:
+        """Test exponential backoff on secondary rate limits and its reset after success."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10, secondary_backoff=0.01, max_backoff=0.03)
+
+        message = '{"message": "You have exceeded a secondary rate limit."}'
+
+        # Act & Assert
+        limiter.update(403, {}, message=message)
+        assert limiter._backoff == 0.01
+        limiter.update(429, {})
+        assert limiter._backoff == 0.02
+        limiter.update(403, {}, message=message)
+        assert limiter._backoff == 0.03
+
+        limiter.update(200, {})
+        assert limiter._backoff == 0
+
+    @pytest.mark.asyncio
+    async def test_forbidden_without_rate_limit_evidence_does_not_block(self) -> None:
+        """Test that a permission 403 neither backs off nor pauses requests."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10)
+
+        # Act
+        limiter.update(
+            403,
+            {"X-RateLimit-Remaining": "4000", "X-RateLimit-Reset": str(time.time() + 60)},
+            message='{"message": "Resource not accessible by integration"}',
+        )
+
+        # Assert
+        assert limiter._backoff == 0
+        assert limiter.blocked_for == 0
+
+    @pytest.mark.asyncio
+    async def test_exhausted_resource_does_not_block_other_resources(self) -> None:
+        """Test that budgets are kept per X-RateLimit-Resource."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=10)
+        reset_at = str(time.time() + 30)
+
+        # Act
+        limiter.update(
+            403,
+            {"X-RateLimit-Resource": "search", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset_at},
+            resource="search",
+        )
+        limiter.update(
+            200, {"X-RateLimit-Resource": "core", "X-RateLimit-Remaining": "50", "X-RateLimit-Reset": reset_at}
+        )
+
+        # Assert
+        assert limiter.blocked_for_resource("search") == pytest.approx(30, abs=1)
+        assert limiter.blocked_for_resource("core") == 0
+        assert limiter.budget("search").remaining == 0
+        assert limiter.remaining == 50
+        assert limiter._backoff == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_backoff(self) -> None:
+        """Test that acquire does not return before the backoff expires."""
+        # Arrange
+        limiter = AdaptiveRateLimiter(max_rate=100)
+        limiter.update(429, {"Retry-After": "0.2"})
+
+        # Act
+        start = time.monotonic()
+        await limiter.acquire()
+
+        # Assert
+        assert time.monotonic() - start >= 0.15
+
+    @pytest.mark.asyncio
+    async def test_scrapper_rate_follows_response_headers(self, mock_github_token: str) -> None:
+        """Test that the scrapper feeds response headers to its rate limiter."""
+        # Arrange
+        with aioresponses() as m:
+            m.get(
+                re.compile(r"https://api\.github\.com/repos/owner/repo/commits\?.*"),
+                payload=[],
+                headers={"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": str(time.time() + 50)},
+            )
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                max_concurrent_requests=5,
+                requests_per_second=50,
+            )
+
+            try:
+                # Act
+                await scrapper._make_request("repos/owner/repo/commits", params={"per_page": 100})
+
+                # Assert
+                assert scrapper.current_rate == pytest.approx(2, rel=0.05)
+            finally:
+                await scrapper.close()
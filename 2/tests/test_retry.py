@@ -0,0 +1,183 @@
+import re
+from typing import Any
+
+import pytest
+from aiohttp import ClientConnectionError, ClientResponseError
+from aioresponses import aioresponses
+
+from main import GithubReposScrapper
+from rate_limiter import AdaptiveRateLimiter
+from retry import RetryPolicy
+
+FAST_RETRY_POLICY = RetryPolicy(max_attempts=3, backoff_base=0.01, backoff_max=0.05)
+SECONDARY_LIMIT_MESSAGE = '{"message": "You have exceeded a secondary rate limit."}'
+
+
+class TestRetryPolicy:
+    def test_backoff_grows_exponentially_with_jitter(self) -> None:
+        """Test that backoff doubles per attempt and stays within the jitter band."""
+        # Arrange
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=30.0, jitter=0.5)
+
+        # Act & Assert
+        for attempt, base in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 30.0)):
+            delay = policy.backoff(attempt)
+            assert base * 0.5 <= delay <= base
+
+    def test_retry_after_respected(self) -> None:
+        """Test that Retry-After overrides the computed backoff."""
+        # Arrange
+        policy = RetryPolicy()
+        error = ClientResponseError(None, (), status=429, headers={"Retry-After": "12"})  # type: ignore[arg-type]
+
+        # Act & Assert
+        assert policy.retry_delay(error, attempt=1) == 12
+
+    def test_non_retryable_errors(self) -> None:
+        """Test that client errors, unknown exceptions and exhausted attempts are not retried."""
+        # Arrange
+        policy = RetryPolicy(max_attempts=2)
+        not_found = ClientResponseError(None, (), status=404)  # type: ignore[arg-type]
+        forbidden = ClientResponseError(None, (), status=403, headers={"X-RateLimit-Remaining": "10"})  # type: ignore[arg-type]
+
+        # Act & Assert
+        assert policy.retry_delay(not_found, attempt=1) is None
+        assert policy.retry_delay(forbidden, attempt=1) is None
+        assert policy.retry_delay(ValueError(), attempt=1) is None
+        assert policy.retry_delay(ClientConnectionError(), attempt=1) is not None
+        assert policy.retry_delay(ClientConnectionError(), attempt=2) is None
+
+    def test_secondary_rate_limit_retried(self) -> None:
+        """Test that a 403 secondary rate limit without Retry-After is retried although budget remains."""
+        # Arrange
+        policy = RetryPolicy()
+        error = ClientResponseError(
+            None,  # type: ignore[arg-type]
+            (),
+            status=403,
+            message=SECONDARY_LIMIT_MESSAGE,
+            headers={"X-RateLimit-Remaining": "10"},  # type: ignore[arg-type]
+        )
+
+        # Act & Assert
+        assert policy.retry_delay(error, attempt=1) is not None
+
+
+class TestRetries:
+    @pytest.mark.asyncio
+    async def test_transient_error_recovered(self, mock_github_token: str) -> None:
+        """Test that a 502 followed by a success is retried and counted as recovered."""
+        # Arrange
+        url = re.compile(r"https://api\.github\.com/search/repositories\?.*")
+
+        with aioresponses() as m:
+            m.get(url, status=502)
+            m.get(url, exception=ClientConnectionError("Connection reset by peer"))
+            m.get(url, payload={"items": []})
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                requests_per_second=100,
+                retry_policy=FAST_RETRY_POLICY,
+            )
+
+            try:
+                # Act
+                data, _ = await scrapper._make_request("search/repositories", params={"q": "stars:>1"})
+
+                # Assert
+                assert data == {"items": []}
+                assert scrapper.retry_stats.retries == 2
+                assert scrapper.retry_stats.recovered == 1
+                assert scrapper.retry_stats.reasons == {"502": 1, "ClientConnectionError": 1}
+            finally:
+                await scrapper.close()
+
+    @pytest.mark.asyncio
+    async def test_attempts_exhausted(self, mock_github_token: str) -> None:
+        """Test that the last error is raised once all attempts failed."""
+        # Arrange
+        with aioresponses() as m:
+            m.get(re.compile(r"https://api\.github\.com/search/repositories\?.*"), status=503, repeat=True)
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                requests_per_second=100,
+                retry_policy=FAST_RETRY_POLICY,
+            )
+
+            try:
+                # Act & Assert
+                with pytest.raises(ClientResponseError):
+                    await scrapper._make_request("search/repositories", params={"q": "stars:>1"})
+                assert scrapper.retry_stats.retries == 2
+                assert scrapper.retry_stats.exhausted == 1
+            finally:
+                await scrapper.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_page_retried_without_losing_repository(self, mock_github_token: str) -> None:
+        """Test that one failing commits page is retried instead of dropping the repository's commits."""
+        # Arrange
+        owner = "testowner"
+        repo = "testrepo"
+        commits_url = rf"https://api\.github\.com/repos/{owner}/{repo}/commits\?"
+
+        def page(start: int, end: int) -> list[dict[str, Any]]:
+            return [
+                {"sha": f"sha{i}", "commit": {"author": {"name": "Author", "date": "2025-01-01T00:00:00Z"}}}
+                for i in range(start, end)
+            ]
+
+        with aioresponses() as m:
+            m.get(
+                re.compile(commits_url + r"(?!(.*&)?page=)"),
+                payload=page(0, 100),
+                headers={"Link": f'<https://api.github.com/repos/{owner}/{repo}/commits?page=2>; rel="last"'},
+            )
+            m.get(re.compile(commits_url + r"(.*&)?page=2"), status=502)
+            m.get(re.compile(commits_url + r"(.*&)?page=2"), payload=page(100, 150))
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                requests_per_second=100,
+                retry_policy=FAST_RETRY_POLICY,
+            )
+
+            try:
+                # Act
+                commits = await scrapper._fetch_paginated(*scrapper._commits_request(owner, repo))
+
+                # Assert
+                assert len(commits) == 150
+                assert scrapper.retry_stats.recovered == 1
+            finally:
+                await scrapper.close()
+
+    @pytest.mark.asyncio
+    async def test_secondary_rate_limit_recovered(self, mock_github_token: str) -> None:
+        """Test that a request the rate limiter backs off from as a secondary limit is also retried."""
+        # Arrange
+        url = re.compile(r"https://api\.github\.com/search/repositories\?.*")
+
+        with aioresponses() as m:
+            m.get(url, status=403, body=SECONDARY_LIMIT_MESSAGE, headers={"X-RateLimit-Remaining": "10"})
+            m.get(url, payload={"items": []})
+
+            scrapper = GithubReposScrapper(
+                access_token=mock_github_token,
+                requests_per_second=100,
+                retry_policy=FAST_RETRY_POLICY,
+            )
+            scrapper._rate_limiter = AdaptiveRateLimiter(max_rate=100, secondary_backoff=0.01, max_backoff=0.02)
+
+            try:
+                # Act
+                data, _ = await scrapper._make_request("search/repositories", params={"q": "stars:>1"})
+
+                # Assert
+                assert data == {"items": []}
+                assert scrapper.retry_stats.reasons == {"403": 1}
+                assert scrapper.retry_stats.recovered == 1
+            finally:
+                await scrapper.close()
@@ -0,0 +1,121 @@
+"""
+Benchmark of the repository commit queries at a configurable scale (repos x authors x days).
+
+Synthetic history is generated server-side into a separate database migrated to the latest schema,
+then every query runs --repeat times: raw ReplacingMergeTree reads with FINAL next to the
+ClickHouseStorage helpers over the materialized daily aggregate. Client latency percentiles are
+combined with duration, rows/bytes read and peak memory from system.query_log (runs are tagged
+with log_comment) into a JSON report meant to be diffed across schema or query changes.
+
+Usage (from the task 3 directory, with ClickHouse running):
+    python -m benchmarks.queries --days 365 --repos 1000 --authors 20 --repeat 20 --output bench.json
+"""
+
+import argparse
+import time
+from collections.abc import Awaitable, Callable
+from datetime import date, timedelta
+from typing import Any
+
+from aiochclient import ChClient
+from aiohttp import ClientSession
+
+from benchmarks import harness
+from benchmarks.harness import QUERY_LOG_COLUMNS, Report, benchmark_database, benchmark_query, new_report
+from benchmarks.table_layout import prepare
+from migrator import load_migrations
+from storage import CLIENT_SETTINGS, ClickHouseStorage
+
+BenchmarkQuery = Callable[[ChClient, ClickHouseStorage], Awaitable[Any]]
+
+
+def benchmark_queries(db: str, start: date, end: date) -> dict[str, BenchmarkQuery]:
+    month_start = end - timedelta(days=30)
+    repos = ["owner7/repo7"]
+    params = {"start": start, "end": end, "month_start": month_start, "repos": tuple(repos)}
+    return {
+        "daily_commits_final": lambda client, _: client.fetch(
+            "SELECT date, repo, sum(commits_num), uniqExact(author) "
+            f"FROM {db}.repositories_authors_commits FINAL "
+            "WHERE date >= {start} AND date <= {end} GROUP BY date, repo ORDER BY date, repo",
+            params=params,
+        ),
+        "daily_commits_aggregate": lambda _, storage: storage.get_daily_commits(start, end),
+        "repo_month_final": lambda client, _: client.fetch(
+            "SELECT date, sum(commits_num), uniqExact(author) "
+            f"FROM {db}.repositories_authors_commits FINAL "
+            "WHERE date >= {month_start} AND date <= {end} AND repo IN {repos} GROUP BY date ORDER BY date",
+            params=params,
+        ),
+        "repo_month_aggregate": lambda _, storage: storage.get_daily_commits(month_start, end, repos=repos),
+        "top_authors_final": lambda client, _: client.fetch(
+            "SELECT author, sum(commits_num) AS commits "
+            f"FROM {db}.repositories_authors_commits FINAL "
+            "WHERE date >= {month_start} AND date <= {end} GROUP BY author ORDER BY commits DESC LIMIT 10",
+            params=params,
+        ),
+        "top_authors_aggregate": lambda _, storage: storage.get_top_authors(month_start, end),
+        "checkpoints": lambda _, storage: storage.get_checkpoints(),
+    }
+
+
+async def run_query(query: BenchmarkQuery, client: ChClient, database: str) -> None:
+    await query(client, ClickHouseStorage(client, database=database))
+
+
+async def query_log_rows(client: ChClient, tag: str) -> list[Any]:
+    await client.execute("SYSTEM FLUSH LOGS")
+    return await client.fetch(
+        f"SELECT {QUERY_LOG_COLUMNS} FROM system.query_log WHERE type = 'QueryFinish' AND log_comment = {{tag}}",
+        params={"tag": tag},
+    )
+
+
+async def run(args: argparse.Namespace) -> Report:
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    scale = {
+        "repos": args.repos,
+        "authors": args.authors,
+        "days": args.days,
+        "author_commit_rows": args.repos * args.authors * args.days,
+    }
+    report = new_report(scale, args.repeat)
+
+    async with ClientSession() as session:
+        client = ChClient(session, url=args.url, user=args.user, password=args.password, **CLIENT_SETTINGS)
+        if not args.skip_load:
+            started = time.perf_counter()
+            await prepare(client, args.database, len(load_migrations()), args, start)
+            report["load_seconds"] = time.perf_counter() - started
+
+        def tagged_client(tag: str) -> ChClient:
+            return ChClient(
+                session, url=args.url, user=args.user, password=args.password, log_comment=tag, **CLIENT_SETTINGS
+            )
+
+        for name, query in benchmark_queries(args.database, start, end).items():
+            await benchmark_query(
+                report,
+                name,
+                lambda tag, query=query: run_query(query, tagged_client(tag), args.database),
+                lambda tag: query_log_rows(client, tag),
+            )
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8123")
+    parser.add_argument("--user", default="default")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", type=benchmark_database, default="bench_queries")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repos", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=20)
+    harness.main(parser, run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Table layout benchmark: on-disk size and query time of the ETL tables before and after
+migration 0003 (monthly partitions, LowCardinality, Delta/ZSTD codecs) on a synthetic year of history.
+Each layout gets its own database, filled server-side with the same generated data.
+
+Usage (from the task 3 directory, with ClickHouse running):
+    python -m benchmarks.table_layout --days 365 --repos 1000 --authors 20 --repeat 5
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from aiochclient import ChClient
+from aiohttp import ClientSession
+
+from benchmarks.harness import benchmark_database
+from migrator import MigrationRunner, load_migrations
+
+LANGUAGES = ("Python", "JavaScript", "TypeScript", "Go", "Rust", "Java", "C++", "Unknown")
+
+QUERIES = {
+    "repo commits, one month": (
+        "SELECT sum(commits_num) FROM {db}.repositories_authors_commits FINAL "
+        "WHERE date >= toDate('{month_start}') AND date < toDate('{month_start}') + 30 AND repo = 'owner7/repo7'"
+    ),
+    "daily totals, last 30 days": (
+        "SELECT date, sum(commits_num) FROM {db}.repositories_authors_commits FINAL "
+        "WHERE date >= toDate('{end}') - 30 GROUP BY date ORDER BY date"
+    ),
+    "top authors, one day": (
+        "SELECT author, sum(commits_num) AS commits FROM {db}.repositories_authors_commits FINAL "
+        "WHERE date = toDate('{end}') GROUP BY author ORDER BY commits DESC LIMIT 10"
+    ),
+    "positions history, one repo": (
+        "SELECT date, position FROM {db}.repositories_positions FINAL WHERE repo = 'owner7/repo7' ORDER BY date"
+    ),
+    "repositories per language": (
+        "SELECT language, count() FROM {db}.repositories FINAL GROUP BY language"
+    ),
+}
+
+
+def fill_queries(db: str, start: date, days: int, repos: int, authors: int) -> list[str]:
+    repo = "concat('owner', toString({i}), '/repo', toString({i}))"
+    author_repo = f"intDiv(number, {authors}) % {repos}"
+    languages = ", ".join(f"'{language}'" for language in LANGUAGES)
+    return [
+        f"INSERT INTO {db}.repositories_authors_commits "
+        f"SELECT toDate('{start}') + intDiv(number, {repos * authors}), {repo.format(i=author_repo)}, "
+        f"concat('author', toString({author_repo} * 7 % 3000 + number % {authors})), "
+        f"toInt32(1 + cityHash64(number) % 20) "
+        f"FROM numbers({days * repos * authors})",
+        f"INSERT INTO {db}.repositories_positions "
+        f"SELECT toDate('{start}') + intDiv(number, {repos}), {repo.format(i=f'number % {repos}')}, "
+        f"toUInt32(1 + (number + cityHash64(intDiv(number, {repos})) % 3) % {repos}) "
+        f"FROM numbers({days * repos})",
+        f"INSERT INTO {db}.repositories "
+        f"SELECT concat('repo', toString(number)), concat('owner', toString(number)), "
+        f"toInt32(cityHash64(number) % 100000), toInt32(cityHash64(number) % 100000), toInt32(number % 5000), "
+        f"[{languages}][1 + number % {len(LANGUAGES)}], now() "
+        f"FROM numbers({repos})",
+    ]
+
+
+async def prepare(client: ChClient, db: str, versions: int, args: argparse.Namespace, start: date) -> None:
+    await client.execute(f"DROP DATABASE IF EXISTS {db}")
+    await MigrationRunner(client, db, migrations=load_migrations()[:versions]).migrate()
+    for query in fill_queries(db, start, args.days, args.repos, args.authors):
+        await client.execute(query)
+    for table in ("repositories_authors_commits", "repositories_positions", "repositories"):
+        await client.execute(f"OPTIMIZE TABLE {db}.{table} FINAL")
+
+
+async def table_sizes(client: ChClient, db: str) -> dict[str, tuple[int, int]]:
+    rows = await client.fetch(
+        "SELECT table, sum(rows) AS rows, sum(bytes_on_disk) AS bytes FROM system.parts "
+        "WHERE database = {db} AND active GROUP BY table ORDER BY table",
+        params={"db": db},
+    )
+    return {row["table"]: (row["rows"], row["bytes"]) for row in rows}
+
+
+async def query_times(client: ChClient, db: str, repeat: int, start: date, end: date) -> dict[str, float]:
+    month_start = start + timedelta(days=(end - start).days // 2)
+    timings = {}
+    for name, query in QUERIES.items():
+        sql = query.format(db=db, month_start=month_start, end=end)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await client.fetch(sql)
+            samples.append(time.perf_counter() - started)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+async def run(args: argparse.Namespace) -> None:
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    layouts = {"before": 2, "after": 3}
+
+    async with ClientSession() as session:
+        client = ChClient(session, url=args.url, user=args.user, password=args.password)
+        sizes, timings = {}, {}
+        for layout, versions in layouts.items():
+            db = f"{args.database_prefix}_{layout}"
+            await prepare(client, db, versions, args, start)
+            sizes[layout] = await table_sizes(client, db)
+            timings[layout] = await query_times(client, db, args.repeat, start, end)
+
+        rows = args.days * args.repos * args.authors
+        print(f"{rows:,} author commit rows over {args.days} days, median of {args.repeat}\n")
+
+        print(f"{'table':<32} {'rows':>12} {'before MiB':>12} {'after MiB':>12} {'ratio':>8}")
+        for table, (table_rows, before) in sizes["before"].items():
+            if table == "schema_migrations":
+                continue
+            after = sizes["after"].get(table, (0, 0))[1]
+            ratio = before / after if after else float("nan")
+            print(f"{table:<32} {table_rows:>12,} {before / 2**20:>12.2f} {after / 2**20:>12.2f} {ratio:>7.1f}x")
+
+        print(f"\n{'query':<32} {'before ms':>12} {'after ms':>12} {'speedup':>8}")
+        for name in QUERIES:
+            before, after = timings["before"][name], timings["after"][name]
+            print(f"{name:<32} {before * 1000:>12.1f} {after * 1000:>12.1f} {before / after:>7.1f}x")
+
+        if not args.keep:
+            for layout in layouts:
+                await client.execute(f"DROP DATABASE IF EXISTS {args.database_prefix}_{layout}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8123")
+    parser.add_argument("--user", default="default")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database-prefix", type=benchmark_database, default="bench_layout")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repos", type=int, default=1000)
+    parser.add_argument("--authors", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark databases")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
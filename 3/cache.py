@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    data: Any
+    headers: dict[str, str]
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+
+
+class ResponseCache:
+    """
+    LRU cache of GitHub API responses used for conditional requests (ETag / Last-Modified).
+    Entries are keyed by endpoint + params and persisted to a JSON file between runs.
+    Only requests whose params repeat between runs benefit: search and other metadata pages, and
+    commit listings in incremental mode, where `since` is the stored checkpoint. Without checkpoints
+    `since` is now - 24h, which changes every run, so commit listings are never revalidated.
+    """
+
+    def __init__(self, path: str | Path | None = None, max_entries: int = 10000):
+        self._path = Path(path) if path else None
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self._path and self._path.exists():
+            self.load()
+
+    @staticmethod
+    def make_key(endpoint: str, params: dict[str, Any] | None = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return f"{endpoint}?{query}" if query else endpoint
+
+    def get(self, endpoint: str, params: dict[str, Any] | None = None) -> CachedResponse | None:
+        key = self.make_key(endpoint, params)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, endpoint: str, params: dict[str, Any] | None, data: Any, headers: dict[str, str]) -> None:
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        key = self.make_key(endpoint, params)
+        self._entries[key] = CachedResponse(data=data, headers=headers, etag=etag, last_modified=last_modified)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def record_hit(self) -> None:
+        self.hits += 1
+
+    def record_miss(self) -> None:
+        self.misses += 1
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self.hits, misses=self.misses, evictions=self.evictions, entries=len(self._entries))
+
+    def load(self) -> None:
+        if not self._path:
+            return
+
+        try:
+            raw = json.loads(self._path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable response cache {self._path}: {e}")
+            return
+
+        self._entries = OrderedDict((key, CachedResponse(**entry)) for key, entry in raw.items())
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        if not self._path:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(self._path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({key: asdict(entry) for key, entry in self._entries.items()}))
+        os.replace(tmp_path, self._path)
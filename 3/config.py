@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,6 +19,32 @@ class Settings(BaseSettings):
     github_token: str = Field(...)
     max_concurrent_requests: int = Field(default=20, ge=1, le=100)
     requests_per_second: int = Field(default=100, ge=1, le=5000)
-    top_repositories_limit: int = Field(default=100, ge=1, le=100)
+    top_repositories_limit: int = Field(default=100, ge=1, le=10000)
+    commits_backend: Literal["rest", "graphql"] = Field(default="rest")
+    graphql_batch_size: int = Field(default=20, ge=1, le=100)
+    validate_commits: bool = Field(default=False)
+    retry_max_attempts: int = Field(default=3, ge=1, le=10)
+    retry_backoff_base: float = Field(default=0.5, gt=0)
+    retry_backoff_max: float = Field(default=30.0, gt=0)
+    retry_jitter: float = Field(default=0.5, ge=0, le=1)
+    retry_statuses: list[int] = Field(default=[429, 500, 502, 503, 504])
+    response_cache_path: str | None = Field(default=None)
+    response_cache_max_entries: int = Field(default=10000, ge=1)
+
+    http_limit: int = Field(default=100, ge=0)
+    http_limit_per_host: int = Field(default=30, ge=0)
+    http_keepalive_timeout: float = Field(default=30.0, gt=0)
+    http_dns_cache_ttl: int = Field(default=300, ge=0)
+    http_total_timeout: float | None = Field(default=300.0, gt=0)
+    http_connect_timeout: float | None = Field(default=10.0, gt=0)
+    http_read_timeout: float | None = Field(default=60.0, gt=0)
+    clickhouse_read_timeout: float | None = Field(default=600.0, gt=0)
+    http_compression: bool = Field(default=True)
 
     batch_size: int = Field(default=100, ge=1, le=10000)
+    incremental_commits: bool = Field(default=False)
+    max_concurrent_inserts: int = Field(default=4, ge=1, le=64)
+    insert_format: Literal["values", "rowbinary"] = Field(default="values")
+    insert_mode: Literal["sync", "async", "buffer"] = Field(default="sync")
+    wait_for_async_insert: bool = Field(default=True)
+    retention_days: int | None = Field(default=None, ge=1)
@@ -0,0 +1,94 @@
+from aiohttp import BaseConnector, ClientSession, ClientTimeout, TCPConnector
+
+from config import Settings
+
+
+class ConnectionManager:
+    """
+    Owns one tuned TCPConnector shared by the GitHub scrapper and the ClickHouse client.
+    The connector keeps connections alive between requests, caches DNS lookups and limits
+    connections in total and per host. GitHub sessions use `timeout`, ClickHouse sessions
+    `clickhouse_timeout`: large inserts and heavy queries have no total budget, only a longer read timeout.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 30,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        timeout: ClientTimeout | None = None,
+        clickhouse_timeout: ClientTimeout | None = None,
+        compression: bool = True,
+    ):
+        self._connector = TCPConnector(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        self._timeout = timeout or ClientTimeout()
+        self._clickhouse_timeout = clickhouse_timeout or ClientTimeout(total=None)
+        self._compression = compression
+        self._sessions: list[ClientSession] = []
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ConnectionManager":
+        return cls(
+            limit=settings.http_limit,
+            limit_per_host=settings.http_limit_per_host,
+            keepalive_timeout=settings.http_keepalive_timeout,
+            dns_cache_ttl=settings.http_dns_cache_ttl,
+            timeout=ClientTimeout(
+                total=settings.http_total_timeout,
+                connect=settings.http_connect_timeout,
+                sock_read=settings.http_read_timeout,
+            ),
+            clickhouse_timeout=ClientTimeout(
+                total=None,
+                connect=settings.http_connect_timeout,
+                sock_read=settings.clickhouse_read_timeout,
+            ),
+            compression=settings.http_compression,
+        )
+
+    @property
+    def connector(self) -> BaseConnector:
+        return self._connector
+
+    @property
+    def timeout(self) -> ClientTimeout:
+        return self._timeout
+
+    @property
+    def clickhouse_timeout(self) -> ClientTimeout:
+        return self._clickhouse_timeout
+
+    @property
+    def compression(self) -> bool:
+        return self._compression
+
+    def default_headers(self) -> dict[str, str]:
+        """Headers every session sends, compression is negotiated through Accept-Encoding."""
+        return {} if self._compression else {"Accept-Encoding": "identity"}
+
+    def session(
+        self,
+        headers: dict[str, str] | None = None,
+        timeout: ClientTimeout | None = None,
+    ) -> ClientSession:
+        """New session on the shared connector (with `timeout` instead of the default), closed with the manager."""
+        session = ClientSession(
+            connector=self._connector,
+            connector_owner=False,
+            timeout=timeout or self._timeout,
+            headers={**self.default_headers(), **(headers or {})},
+        )
+        self._sessions.append(session)
+        return session
+
+    async def close(self) -> None:
+        for session in self._sessions:
+            await session.close()
+        await self._connector.close()
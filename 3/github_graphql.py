@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date
+from typing import Any, Final
+
+from scraper import AuthorsCommits, GitHubRepository, GithubReposScrapper, newer_checkpoint
+
+GRAPHQL_ENDPOINT: Final[str] = "graphql"
+HISTORY_PAGE_SIZE: Final[int] = 100
+
+HISTORY_FIELDS: Final[str] = """
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $first, since: $since%(i)d, after: $cursor%(i)d) {
+            pageInfo { hasNextPage endCursor }
+            nodes { oid committedDate author { name } }
+          }
+        }
+      }
+    }
+"""
+
+
+class GithubGraphQLReposScrapper(GithubReposScrapper):
+    """
+    GithubReposScrapper that counts commits through the GitHub GraphQL API.
+    Commit history requests of concurrently processed repositories are coalesced into one query
+    with an aliased `repository` field per repo, up to `batch_size` repositories per query.
+    GitHub GraphQL API: https://docs.github.com/en/graphql/reference/objects#commit
+    """
+
+    def __init__(
+        self,
+        access_token: str,
+        max_concurrent_requests: int = 10,
+        requests_per_second: int = 5,
+        batch_size: int = 20,
+        **kwargs: Any,
+    ):
+        # Enough repositories in flight to fill a batch per concurrent request.
+        kwargs.setdefault("repository_workers", max_concurrent_requests * batch_size)
+        super().__init__(access_token, max_concurrent_requests, requests_per_second, **kwargs)
+        self._batch_size = batch_size
+        self._pending: list[tuple[GitHubRepository, asyncio.Future[AuthorsCommits | None]]] = []
+        self._flush_scheduled = False
+        self._batch_tasks: set[asyncio.Task[None]] = set()
+
+    async def _get_authors_commits(self, repo_data: GitHubRepository) -> AuthorsCommits | None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[AuthorsCommits | None] = loop.create_future()
+        self._pending.append((repo_data, future))
+
+        if len(self._pending) >= self._batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        while self._pending:
+            batch, self._pending = self._pending[: self._batch_size], self._pending[self._batch_size :]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[GitHubRepository, asyncio.Future[AuthorsCommits | None]]]) -> None:
+        repos = [repo for repo, _ in batch]
+        results: list[AuthorsCommits | None]
+        try:
+            results = await self._get_batch_authors_commits(repos)
+        except Exception as e:
+            names = ", ".join(f"{repo.owner.login}/{repo.name}" for repo in repos)
+            logging.error(f"Failed to fetch commits for {names}: {e!r}")
+            # Skip the batch's repositories rather than overwrite their stored counts with empty ones.
+            results = [None] * len(repos)
+
+        for (_, future), author_commits in zip(batch, results):
+            if not future.done():
+                future.set_result(author_commits)
+
+    def _build_history_query(self, indexes: list[int]) -> str:
+        variables = ["$first: Int!"]
+        fields = []
+        for i in indexes:
+            variables.append(f"$owner{i}: String!, $name{i}: String!, $since{i}: GitTimestamp!, $cursor{i}: String")
+            fields.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{{HISTORY_FIELDS % {'i': i}}}}")
+        return f"query({', '.join(variables)}) {{\n" + "\n".join(fields) + "\n}"
+
+    async def _get_batch_authors_commits(self, repos: list[GitHubRepository]) -> list[AuthorsCommits]:
+        author_commits: list[defaultdict[tuple[date | None, str], int]] = [defaultdict(int) for _ in repos]
+        checkpoints = [self._get_checkpoint(repo) for repo in repos]
+        newest = list(checkpoints)
+        cursors: dict[int, str | None] = {i: None for i in range(len(repos))}
+
+        while cursors:
+            variables: dict[str, Any] = {"first": HISTORY_PAGE_SIZE}
+            for i, cursor in cursors.items():
+                variables[f"owner{i}"] = repos[i].owner.login
+                variables[f"name{i}"] = repos[i].name
+                variables[f"since{i}"] = self._commits_since(checkpoints[i]).isoformat()
+                variables[f"cursor{i}"] = cursor
+
+            response, _ = await self._make_request(
+                GRAPHQL_ENDPOINT,
+                method="POST",
+                json={"query": self._build_history_query(list(cursors)), "variables": variables},
+            )
+            for error in response.get("errors") or []:
+                logging.error(f"GraphQL error: {error.get('message')}")
+            data = response.get("data") or {}
+
+            next_cursors: dict[int, str | None] = {}
+            for i in cursors:
+                history = self._extract_history(data.get(f"r{i}"))
+                if history is None:
+                    continue
+
+                for node in history.get("nodes") or []:
+                    if checkpoints[i] is not None and checkpoints[i].covers(node.get("oid", "")):
+                        continue
+
+                    author_name = (node.get("author") or {}).get("name")
+                    if author_name:
+                        author_commits[i][self._commit_day(node.get("committedDate")), author_name] += 1
+
+                    if node.get("committedDate") and self._checkpoints is not None:
+                        newest[i] = newer_checkpoint(newest[i], node["committedDate"], node.get("oid", ""))
+
+                page_info = history.get("pageInfo") or {}
+                if page_info.get("hasNextPage"):
+                    next_cursors[i] = page_info.get("endCursor")
+            cursors = next_cursors
+
+        return list(zip(author_commits, newest))
+
+    def _extract_history(self, repository: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not repository:
+            return None
+        branch = repository.get("defaultBranchRef") or {}
+        target = branch.get("target") or {}
+        return target.get("history")
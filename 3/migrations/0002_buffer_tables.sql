@@ -0,0 +1,13 @@
+-- Buffer tables in front of the main tables for INSERT_MODE=buffer: many small inserts are
+-- collected in memory and flushed to the target table after 10-100 s, 10k-1M rows or 1-100 MB.
+CREATE TABLE IF NOT EXISTS {database}.repositories_buffer AS {database}.repositories
+    ENGINE = Buffer({database}, repositories, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_authors_commits_buffer AS {database}.repositories_authors_commits
+    ENGINE = Buffer({database}, repositories_authors_commits, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_positions_buffer AS {database}.repositories_positions
+    ENGINE = Buffer({database}, repositories_positions, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_commits_checkpoints_buffer AS {database}.repositories_commits_checkpoints
+    ENGINE = Buffer({database}, repositories_commits_checkpoints, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
@@ -0,0 +1,72 @@
+-- Monthly partitions by date, LowCardinality repo/language and Delta/ZSTD codecs.
+-- Partition keys can't be altered, so dated tables are rebuilt and swapped in with EXCHANGE TABLES.
+-- Buffer tables are recreated to keep their column types in line with the tables they flush into.
+-- Rows inserted between a table's copy and its EXCHANGE are lost: stop running ETL workers before applying.
+-- Each rebuild step is guarded on the table's partition key, so a run interrupted half way resumes:
+-- a partial copy is truncated and redone, a finished swap is not repeated.
+DROP TABLE IF EXISTS {database}.repositories_buffer;
+DROP TABLE IF EXISTS {database}.repositories_authors_commits_buffer;
+DROP TABLE IF EXISTS {database}.repositories_positions_buffer;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_authors_commits' AND partition_key = ''
+CREATE TABLE IF NOT EXISTS {database}.repositories_authors_commits_partitioned
+(
+    date        Date CODEC(Delta, ZSTD(1)),
+    repo        LowCardinality(String) CODEC(ZSTD(1)),
+    author      String CODEC(ZSTD(1)),
+    commits_num Int32 CODEC(T64, ZSTD(1))
+) ENGINE = ReplacingMergeTree
+      PARTITION BY toYYYYMM(date)
+      ORDER BY (date, repo, author)
+      SETTINGS ttl_only_drop_parts = 1;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_authors_commits' AND partition_key = ''
+TRUNCATE TABLE {database}.repositories_authors_commits_partitioned;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_authors_commits' AND partition_key = ''
+INSERT INTO {database}.repositories_authors_commits_partitioned
+SELECT date, repo, author, commits_num
+FROM {database}.repositories_authors_commits;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_authors_commits' AND partition_key = ''
+EXCHANGE TABLES {database}.repositories_authors_commits AND {database}.repositories_authors_commits_partitioned;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_authors_commits' AND partition_key != ''
+DROP TABLE IF EXISTS {database}.repositories_authors_commits_partitioned;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_positions' AND partition_key = ''
+CREATE TABLE IF NOT EXISTS {database}.repositories_positions_partitioned
+(
+    date     Date CODEC(Delta, ZSTD(1)),
+    repo     LowCardinality(String) CODEC(ZSTD(1)),
+    position UInt32 CODEC(T64, ZSTD(1))
+) ENGINE = ReplacingMergeTree
+      PARTITION BY toYYYYMM(date)
+      ORDER BY (date, repo)
+      SETTINGS ttl_only_drop_parts = 1;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_positions' AND partition_key = ''
+TRUNCATE TABLE {database}.repositories_positions_partitioned;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_positions' AND partition_key = ''
+INSERT INTO {database}.repositories_positions_partitioned
+SELECT date, repo, position
+FROM {database}.repositories_positions;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_positions' AND partition_key = ''
+EXCHANGE TABLES {database}.repositories_positions AND {database}.repositories_positions_partitioned;
+
+-- only if: SELECT count() FROM system.tables WHERE database = '{database}' AND name = 'repositories_positions' AND partition_key != ''
+DROP TABLE IF EXISTS {database}.repositories_positions_partitioned;
+
+ALTER TABLE {database}.repositories
+    MODIFY COLUMN language LowCardinality(String) CODEC(ZSTD(1));
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_buffer AS {database}.repositories
+    ENGINE = Buffer({database}, repositories, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_authors_commits_buffer AS {database}.repositories_authors_commits
+    ENGINE = Buffer({database}, repositories_authors_commits, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
+
+CREATE TABLE IF NOT EXISTS {database}.repositories_positions_buffer AS {database}.repositories_positions
+    ENGINE = Buffer({database}, repositories_positions, 16, 10, 100, 10000, 1000000, 1000000, 100000000);
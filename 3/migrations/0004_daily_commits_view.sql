@@ -0,0 +1,28 @@
+-- Daily per-repository author commit counts, aggregated on insert into repositories_authors_commits.
+-- Each (date, repo) keeps a maxMap of author -> (insert time, count): the latest insert of an author wins,
+-- like in the ReplacingMergeTree it is fed from, so an ETL rerun re-inserting the same counts doesn't
+-- double count and one that counts fewer commits (e.g. after a force push) replaces the higher count.
+-- Commits per repo, distinct authors and top authors are all derived from the map at read time.
+CREATE TABLE IF NOT EXISTS {database}.repositories_daily_commits
+(
+    date            Date CODEC(Delta, ZSTD(1)),
+    repo            LowCardinality(String),
+    authors_commits AggregateFunction(maxMap, Map(String, Tuple(DateTime64(6), Int32)))
+) ENGINE = AggregatingMergeTree
+      PARTITION BY toYYYYMM(date)
+      ORDER BY (date, repo)
+      SETTINGS ttl_only_drop_parts = 1;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS {database}.repositories_daily_commits_mv
+    TO {database}.repositories_daily_commits
+AS
+SELECT date, repo, maxMapState(map(author, (now64(6), commits_num))) AS authors_commits
+FROM {database}.repositories_authors_commits
+GROUP BY date, repo;
+
+-- Backfill the current counts at the epoch: rows inserted through the view meanwhile are newer and win,
+-- and a repeated backfill only adds entries equal to the ones already there.
+INSERT INTO {database}.repositories_daily_commits
+SELECT date, repo, maxMapState(map(author, (toDateTime64(0, 6), commits_num)))
+FROM {database}.repositories_authors_commits FINAL
+GROUP BY date, repo;
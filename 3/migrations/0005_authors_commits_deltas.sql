@@ -0,0 +1,54 @@
+-- Incremental runs store the commits they count as deltas instead of rewriting per-day totals,
+-- totals are summed at read time through repositories_authors_commits_totals. A delta is keyed by
+-- the checkpoint its run started from (`since`, the epoch without one) and versioned by the one it
+-- reached (`until`): a run retried from the same checkpoint replaces its earlier delta, never adds to it.
+-- Deltas get no Buffer table: incremental mode refuses buffered inserts (see ClickHouseStorage).
+CREATE TABLE IF NOT EXISTS {database}.repositories_authors_commits_deltas
+(
+    date        Date CODEC(Delta, ZSTD(1)),
+    repo        LowCardinality(String) CODEC(ZSTD(1)),
+    author      String CODEC(ZSTD(1)),
+    since       DateTime CODEC(Delta, ZSTD(1)),
+    until       DateTime CODEC(Delta, ZSTD(1)),
+    commits_num Int32 CODEC(T64, ZSTD(1))
+) ENGINE = ReplacingMergeTree(until)
+      PARTITION BY toYYYYMM(date)
+      ORDER BY (date, repo, author, since)
+      SETTINGS ttl_only_drop_parts = 1;
+
+CREATE VIEW IF NOT EXISTS {database}.repositories_authors_commits_totals AS
+SELECT date, repo, author, sum(commits_num) AS commits_num
+FROM {database}.repositories_authors_commits_deltas FINAL
+GROUP BY date, repo, author;
+
+-- Checkpoints keep every sha committed at `committed_at` and are versioned by it, so a slower
+-- worker finishing last can't move a checkpoint back behind deltas already stored from a newer one.
+-- Its buffer table is dropped for good: checkpoints are only written in incremental mode, which refuses
+-- buffered inserts, and nothing may be flushed into the table being rebuilt. The rebuild is guarded on the
+-- boundary_shas column like 0003 on partition keys; stop ETL workers before applying.
+DROP TABLE IF EXISTS {database}.repositories_commits_checkpoints_buffer;
+
+-- only if: SELECT count() = 0 FROM system.columns WHERE database = '{database}' AND table = 'repositories_commits_checkpoints' AND name = 'boundary_shas'
+CREATE TABLE IF NOT EXISTS {database}.repositories_commits_checkpoints_versioned
+(
+    repo          String,
+    committed_at  datetime,
+    sha           String,
+    updated       datetime,
+    boundary_shas Array(String)
+) ENGINE = ReplacingMergeTree(committed_at)
+      ORDER BY repo;
+
+-- only if: SELECT count() = 0 FROM system.columns WHERE database = '{database}' AND table = 'repositories_commits_checkpoints' AND name = 'boundary_shas'
+TRUNCATE TABLE {database}.repositories_commits_checkpoints_versioned;
+
+-- only if: SELECT count() = 0 FROM system.columns WHERE database = '{database}' AND table = 'repositories_commits_checkpoints' AND name = 'boundary_shas'
+INSERT INTO {database}.repositories_commits_checkpoints_versioned
+SELECT repo, committed_at, sha, updated, [sha]
+FROM {database}.repositories_commits_checkpoints FINAL;
+
+-- only if: SELECT count() = 0 FROM system.columns WHERE database = '{database}' AND table = 'repositories_commits_checkpoints' AND name = 'boundary_shas'
+EXCHANGE TABLES {database}.repositories_commits_checkpoints AND {database}.repositories_commits_checkpoints_versioned;
+
+-- only if: SELECT count() FROM system.columns WHERE database = '{database}' AND table = 'repositories_commits_checkpoints' AND name = 'boundary_shas'
+DROP TABLE IF EXISTS {database}.repositories_commits_checkpoints_versioned;
@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import re
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Final
+
+from aiochclient import ChClient, ChClientError
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR: Final[Path] = Path(__file__).parent / "migrations"
+MIGRATIONS_TABLE: Final[str] = "schema_migrations"
+LOCK_TABLE: Final[str] = "schema_migrations_lock"
+GUARD_PREFIX: Final[str] = "-- only if:"
+_MIGRATION_FILE: Final[re.Pattern[str]] = re.compile(r"^(\d+)_(\w+)\.sql$")
+_ERROR_CODE: Final[re.Pattern[str]] = re.compile(r"\bCode: (\d+)\b")
+# Server error codes meaning the migrations table isn't there yet: UNKNOWN_TABLE, UNKNOWN_DATABASE.
+_MISSING_TABLE_CODES: Final[frozenset[int]] = frozenset({60, 81})
+
+
+@dataclass
+class MigrationStatement:
+    sql: str
+    # Query returning a single value, the statement is skipped unless it is truthy.
+    guard: str | None = None
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    path: Path
+
+    def statements(self, database: str) -> list[MigrationStatement]:
+        """
+        SQL statements of the migration with `{database}` replaced, comments and blank lines dropped.
+        A `-- only if: <query>` comment guards the statement that follows it.
+        """
+        statements = []
+        current_statement = []
+        guard = None
+
+        for line in self.path.read_text().split("\n"):
+            line = line.strip()
+            if line.startswith(GUARD_PREFIX):
+                guard = line.removeprefix(GUARD_PREFIX).strip().rstrip(";").replace("{database}", database)
+                continue
+            if not line or line.startswith("--"):
+                continue
+
+            current_statement.append(line)
+
+            if line.endswith(";"):
+                statement = " ".join(current_statement).strip().rstrip(";")
+                statements.append(MigrationStatement(statement.replace("{database}", database), guard))
+                current_statement = []
+                guard = None
+
+        return statements
+
+
+def error_code(error: ChClientError) -> int | None:
+    """ClickHouse error code from the `Code: N.` prefix of a server error message."""
+    match = _ERROR_CODE.search(str(error))
+    return int(match.group(1)) if match else None
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Migrations named NNNN_name.sql, ordered by version."""
+    migrations = []
+    for path in directory.glob("*.sql"):
+        match = _MIGRATION_FILE.match(path.name)
+        if match:
+            migrations.append(Migration(version=int(match.group(1)), name=match.group(2), path=path))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+class MigrationRunner:
+    """
+    Applies pending migrations to `database` and records them in its schema_migrations table.
+    When every migration is already recorded startup costs a single SELECT.
+    Pending migrations are applied under a lock kept in schema_migrations_lock: each runner inserts
+    a claim and heartbeats it, the oldest live claim holds the lock and claims that stop heartbeating
+    for `stale_after` seconds are ignored. Statements must be safe to re-run after a crash,
+    either idempotent (IF NOT EXISTS) or guarded on the current schema with `-- only if:`.
+    The lock only serialises migrators: rebuilds that copy a table (INSERT ... SELECT, then EXCHANGE TABLES)
+    drop rows written to it during the copy, so workers still writing must be stopped first.
+    """
+
+    def __init__(
+        self,
+        client: ChClient,
+        database: str,
+        migrations: list[Migration] | None = None,
+        lock_timeout: float = 600.0,
+        heartbeat_interval: float = 5.0,
+        stale_after: float = 60.0,
+        poll_interval: float = 1.0,
+    ):
+        self._client = client
+        self._database = database
+        self._migrations = load_migrations() if migrations is None else migrations
+        self._lock_timeout = lock_timeout
+        self._heartbeat_interval = heartbeat_interval
+        self._stale_after = stale_after
+        self._poll_interval = poll_interval
+
+    async def applied_versions(self) -> set[int] | None:
+        """Versions recorded in the migrations table, None if the table does not exist yet."""
+        try:
+            rows = await self._client.fetch(f"SELECT version FROM {self._database}.{MIGRATIONS_TABLE}")
+        except ChClientError as e:
+            if error_code(e) in _MISSING_TABLE_CODES:
+                return None
+            raise
+        return {row["version"] for row in rows}
+
+    async def migrate(self) -> list[Migration]:
+        """Apply pending migrations in version order, returns the applied ones."""
+        applied = await self.applied_versions()
+        if applied is not None and not self._pending(applied):
+            logger.info(f"Database '{self._database}' schema is up to date")
+            return []
+
+        await self._create_migrations_table()
+        async with self._lock():
+            # Another runner may have applied them while this one waited for the lock.
+            pending = self._pending(await self.applied_versions() or set())
+            for migration in pending:
+                await self._apply(migration)
+        if not pending:
+            logger.info(f"Database '{self._database}' schema is up to date")
+        return pending
+
+    def _pending(self, applied: set[int]) -> list[Migration]:
+        return [migration for migration in self._migrations if migration.version not in applied]
+
+    async def _apply(self, migration: Migration) -> None:
+        for statement in migration.statements(self._database):
+            if statement.guard is not None and not await self._client.fetchval(statement.guard):
+                logger.info(f"Skipping already applied step of migration {migration.version:04d}: {statement.sql}")
+                continue
+            await self._client.execute(statement.sql)
+        await self._client.execute(
+            f"INSERT INTO {self._database}.{MIGRATIONS_TABLE} VALUES",
+            (migration.version, migration.name, datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)),
+        )
+        logger.info(f"Applied migration {migration.version:04d}_{migration.name} to '{self._database}'")
+
+    @asynccontextmanager
+    async def _lock(self) -> AsyncIterator[None]:
+        owner = uuid.uuid4().hex
+        await self._heartbeat(owner)
+        heartbeats = asyncio.create_task(self._keep_alive(owner))
+        try:
+            await self._wait_for_lock(owner)
+            yield
+        finally:
+            heartbeats.cancel()
+            with suppress(asyncio.CancelledError):
+                await heartbeats
+            await self._heartbeat(owner, released=True)
+
+    async def _heartbeat(self, owner: str, released: bool = False) -> None:
+        await self._client.execute(
+            f"INSERT INTO {self._database}.{LOCK_TABLE} (owner, released) VALUES", (owner, int(released))
+        )
+
+    async def _keep_alive(self, owner: str) -> None:
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            await self._heartbeat(owner)
+
+    async def _wait_for_lock(self, owner: str) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._lock_timeout
+        stale_ms = int(self._stale_after * 1000)
+        while True:
+            holder = await self._client.fetchval(
+                f"SELECT owner FROM {self._database}.{LOCK_TABLE} GROUP BY owner "
+                f"HAVING max(released) = 0 AND max(heartbeat) > now64(3) - toIntervalMillisecond({stale_ms}) "
+                "ORDER BY min(heartbeat), owner LIMIT 1"
+            )
+            if holder == owner:
+                return
+            if loop.time() >= deadline:
+                raise TimeoutError(f"Migrations of '{self._database}' still locked by {holder}")
+            logger.info(f"Waiting for migrations of '{self._database}' locked by {holder}")
+            await asyncio.sleep(self._poll_interval)
+
+    async def _create_migrations_table(self) -> None:
+        await self._client.execute(f"CREATE DATABASE IF NOT EXISTS {self._database}")
+        await self._client.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._database}.{MIGRATIONS_TABLE} "
+            "(version UInt32, name String, applied_at DateTime) "
+            "ENGINE = ReplacingMergeTree(applied_at) ORDER BY version"
+        )
+        await self._client.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._database}.{LOCK_TABLE} "
+            "(owner String, heartbeat DateTime64(3) DEFAULT now64(3), released UInt8 DEFAULT 0) "
+            "ENGINE = MergeTree ORDER BY (owner, heartbeat) TTL toDateTime(heartbeat) + INTERVAL 1 DAY"
+        )
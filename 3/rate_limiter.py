@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Final
+
+RATE_LIMITED_STATUSES: Final[frozenset[int]] = frozenset({HTTPStatus.FORBIDDEN, HTTPStatus.TOO_MANY_REQUESTS})
+DEFAULT_RESOURCE: Final[str] = "core"
+
+
+def header_as_float(headers: Mapping[str, str], name: str) -> float | None:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def github_resource(endpoint: str) -> str:
+    """Rate limit resource (X-RateLimit-Resource) that GitHub charges a request to `endpoint` against."""
+    if endpoint == "graphql":
+        return "graphql"
+    if endpoint.startswith("search/"):
+        return "search"
+    return DEFAULT_RESOURCE
+
+
+def is_secondary_rate_limit(status: int, message: str) -> bool:
+    """429s, and 403s whose body says so, are secondary rate limits; other 403s are permission errors."""
+    if status == HTTPStatus.TOO_MANY_REQUESTS:
+        return True
+    return status == HTTPStatus.FORBIDDEN and "secondary rate limit" in message.lower()
+
+
+@dataclass
+class ResourceBudget:
+    """Primary rate limit state of one resource (core, search, graphql...)."""
+
+    rate: float
+    remaining: int | None = None
+    reset_at: float | None = None
+    next_slot: float = 0.0
+    blocked_until: float = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Request pacer driven by GitHub rate limit headers.
+    Every resource (X-RateLimit-Resource) has its own budget: X-RateLimit-Remaining / X-RateLimit-Reset set its
+    rate to spend the remaining budget evenly until reset (capped by max_rate), and an exhausted budget pauses
+    only requests to that resource. Retry-After and secondary rate limit responses pause all requests;
+    a 403 without rate limit evidence doesn't.
+    Docs: https://docs.github.com/en/rest/using-the-rest-api/rate-limits-for-the-rest-api
+    """
+
+    def __init__(self, max_rate: float, secondary_backoff: float = 60.0, max_backoff: float = 900.0):
+        self._max_rate = float(max_rate)
+        self._secondary_backoff = secondary_backoff
+        self._max_backoff = max_backoff
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+        self._resources: dict[str, ResourceBudget] = {}
+
+    def budget(self, resource: str = DEFAULT_RESOURCE) -> ResourceBudget:
+        if resource not in self._resources:
+            self._resources[resource] = ResourceBudget(rate=self._max_rate)
+        return self._resources[resource]
+
+    @property
+    def rate(self) -> float:
+        """Current pace of core requests in requests per second."""
+        return self.budget().rate
+
+    @property
+    def remaining(self) -> int | None:
+        return self.budget().remaining
+
+    @property
+    def reset_at(self) -> float | None:
+        return self.budget().reset_at
+
+    @property
+    def blocked_for(self) -> float:
+        """Seconds left until core requests are allowed again after a backoff."""
+        return self.blocked_for_resource(DEFAULT_RESOURCE)
+
+    def blocked_for_resource(self, resource: str) -> float:
+        until = max(self._blocked_until, self.budget(resource).blocked_until)
+        return max(until - asyncio.get_running_loop().time(), 0.0)
+
+    async def acquire(self, resource: str = DEFAULT_RESOURCE) -> None:
+        budget = self.budget(resource)
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            start = max(budget.next_slot, budget.blocked_until, self._blocked_until)
+            if start <= now:
+                budget.next_slot = now + 1.0 / budget.rate
+                return
+            await asyncio.sleep(start - now)
+
+    def update(
+        self,
+        status: int,
+        headers: Mapping[str, str],
+        resource: str = DEFAULT_RESOURCE,
+        message: str = "",
+    ) -> None:
+        """
+        Adjust the pace from a response status, its headers and, for 403/429 responses, its body `message`.
+        X-RateLimit-Resource, when present, overrides the `resource` the request was made against.
+        """
+        now = asyncio.get_running_loop().time()
+        budget = self.budget(headers.get("X-RateLimit-Resource") or resource)
+
+        remaining = header_as_float(headers, "X-RateLimit-Remaining")
+        reset_at = header_as_float(headers, "X-RateLimit-Reset")
+        retry_after = header_as_float(headers, "Retry-After")
+
+        if remaining is not None and reset_at is not None:
+            budget.remaining = int(remaining)
+            budget.reset_at = reset_at
+            seconds_to_reset = max(reset_at - time.time(), 1.0)
+            if remaining <= 0:
+                budget.blocked_until = max(budget.blocked_until, now + seconds_to_reset)
+            else:
+                budget.rate = min(self._max_rate, remaining / seconds_to_reset)
+
+        if retry_after is not None:
+            self._block_until(now + retry_after)
+        elif is_secondary_rate_limit(status, message) and remaining != 0:
+            self._backoff = min(max(self._backoff * 2, self._secondary_backoff), self._max_backoff)
+            self._block_until(now + self._backoff)
+        elif status < HTTPStatus.BAD_REQUEST:
+            self._backoff = 0.0
+
+    def _block_until(self, until: float) -> None:
+        self._blocked_until = max(self._blocked_until, until)
@@ -0,0 +1,84 @@
+import asyncio
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Final
+
+from aiohttp import ClientConnectionError, ClientPayloadError, ClientResponseError
+
+from rate_limiter import header_as_float, is_secondary_rate_limit
+
+RETRYABLE_STATUSES: Final[frozenset[int]] = frozenset({
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+})
+RETRYABLE_EXCEPTIONS: Final[tuple[type[BaseException], ...]] = (
+    ClientConnectionError,
+    ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with jitter: attempt N waits backoff_base * 2 ** (N - 1) seconds (capped by backoff_max),
+    of which a `jitter` fraction is randomised. Retry-After wins over the computed backoff when present.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    jitter: float = 0.5
+    retryable_statuses: frozenset[int] = RETRYABLE_STATUSES
+    respect_retry_after: bool = True
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * (1 - self.jitter) + random.uniform(0, delay * self.jitter)
+
+    def retry_delay(self, error: BaseException, attempt: int) -> float | None:
+        """Seconds to wait before the next attempt, None if `error` must be raised."""
+        if attempt >= self.max_attempts:
+            return None
+
+        if isinstance(error, ClientResponseError):
+            headers = error.headers or {}
+            retry_after = header_as_float(headers, "Retry-After")
+            # Classified like AdaptiveRateLimiter.update: an exhausted budget, Retry-After or a secondary limit
+            # (recognised by the response body, carried in the error message).
+            rate_limited = error.status == HTTPStatus.FORBIDDEN and (
+                retry_after is not None
+                or headers.get("X-RateLimit-Remaining") == "0"
+                or is_secondary_rate_limit(error.status, error.message)
+            )
+            if error.status not in self.retryable_statuses and not rate_limited:
+                return None
+            if retry_after is not None and self.respect_retry_after:
+                return retry_after
+        elif not isinstance(error, RETRYABLE_EXCEPTIONS):
+            return None
+
+        return self.backoff(attempt)
+
+
+@dataclass
+class RetryStats:
+    retries: int = 0
+    recovered: int = 0
+    exhausted: int = 0
+    reasons: Counter[str] = field(default_factory=Counter)
+
+    def record_retry(self, error: BaseException) -> None:
+        self.retries += 1
+        self.reasons[retry_reason(error)] += 1
+
+
+def retry_reason(error: BaseException) -> str:
+    if isinstance(error, ClientResponseError):
+        return str(error.status)
+    return type(error).__name__
@@ -0,0 +1,61 @@
+import struct
+from collections.abc import Callable, Iterable, Sequence
+from datetime import date, datetime, timezone
+from typing import Any, Final
+
+_EPOCH: Final[date] = date(1970, 1, 1)
+_INT32: Final[struct.Struct] = struct.Struct("<i")
+_UINT16: Final[struct.Struct] = struct.Struct("<H")
+_UINT32: Final[struct.Struct] = struct.Struct("<I")
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _string(value: str) -> bytes:
+    data = value.encode()
+    return _varint(len(data)) + data
+
+
+def _string_array(values: list[str]) -> bytes:
+    return _varint(len(values)) + b"".join(map(_string, values))
+
+
+def _date(value: date) -> bytes:
+    return _UINT16.pack((value - _EPOCH).days)
+
+
+def _datetime(value: datetime) -> bytes:
+    """Naive datetimes are taken as UTC, as the VALUES path does under the storage's CLIENT_SETTINGS."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return _UINT32.pack(int(value.timestamp()))
+
+
+ENCODERS: Final[dict[str, Callable[[Any], bytes]]] = {
+    "String": _string,
+    "Array(String)": _string_array,
+    "Int32": _INT32.pack,
+    "UInt32": _UINT32.pack,
+    "Date": _date,
+    "DateTime": _datetime,
+}
+
+
+def encode_rows(rows: Iterable[tuple], column_types: Sequence[str]) -> bytes:
+    """
+    Encode rows in ClickHouse RowBinary format, values must follow the table column order.
+    LowCardinality(T) columns are encoded as T. Format: https://clickhouse.com/docs/en/interfaces/formats#rowbinary
+    """
+    encoders = [ENCODERS[column_type] for column_type in column_types]
+    buffer = bytearray()
+    for row in rows:
+        for encode, value in zip(encoders, row):
+            buffer += encode(value)
+    return bytes(buffer)
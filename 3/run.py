@@ -1,12 +1,15 @@
 import asyncio
 import logging
 
-from aiohttp import ClientSession
 from aiochclient import ChClient
 
+from cache import ResponseCache
 from config import Settings
+from connections import ConnectionManager
+from github_graphql import GithubGraphQLReposScrapper
+from retry import RetryPolicy
 from scraper import GithubReposScrapper
-from storage import ClickHouseStorage
+from storage import CLIENT_SETTINGS, ClickHouseStorage
 
 logging.basicConfig(
     level=logging.INFO,
@@ -16,37 +19,85 @@ logger = logging.getLogger(__name__)
 
 
 async def main():
-    ch_session = None
+    connections = None
     scrapper = None
+    cache = None
 
     try:
         settings = Settings()
 
-        scrapper = GithubReposScrapper(
-            access_token=settings.github_token,
-            max_concurrent_requests=settings.max_concurrent_requests,
-            requests_per_second=settings.requests_per_second,
-        )
+        if settings.response_cache_path:
+            cache = ResponseCache(settings.response_cache_path, max_entries=settings.response_cache_max_entries)
 
-        ch_session = ClientSession()
+        connections = ConnectionManager.from_settings(settings)
+        ch_session = connections.session(timeout=connections.clickhouse_timeout)
         client = ChClient(
             ch_session,
             url=settings.clickhouse_url,
             user=settings.clickhouse_user,
             password=settings.clickhouse_password,
             database=settings.clickhouse_db,
-            compress_response=True,
+            compress_response=settings.http_compression,
+            **CLIENT_SETTINGS,
         )
 
-        storage = ClickHouseStorage(client, batch_size=settings.batch_size)
-        await storage.initialize_database(settings.clickhouse_db)
+        storage = ClickHouseStorage(
+            client,
+            database=settings.clickhouse_db,
+            batch_size=settings.batch_size,
+            incremental=settings.incremental_commits,
+            max_concurrent_inserts=settings.max_concurrent_inserts,
+            insert_format=settings.insert_format,
+            session=ch_session,
+            insert_mode=settings.insert_mode,
+            wait_for_async_insert=settings.wait_for_async_insert,
+        )
+        await storage.initialize_database()
+        # Unset RETENTION_DAYS removes a TTL left by an earlier run.
+        await storage.set_retention(settings.retention_days)
 
-        logger.info(f"Fetching top {settings.top_repositories_limit} repositories...")
-        repositories = await scrapper.get_repositories(limit=settings.top_repositories_limit)
-        logger.info(f"Fetched {len(repositories)} repositories")
+        checkpoints = None
+        if settings.incremental_commits:
+            checkpoints = await storage.get_checkpoints()
+            logger.info(f"Loaded commit checkpoints for {len(checkpoints)} repositories")
 
-        logger.info("Inserting data into ClickHouse...")
-        await storage.insert_repositories_batch(repositories)
+        retry_policy = RetryPolicy(
+            max_attempts=settings.retry_max_attempts,
+            backoff_base=settings.retry_backoff_base,
+            backoff_max=settings.retry_backoff_max,
+            jitter=settings.retry_jitter,
+            retryable_statuses=frozenset(settings.retry_statuses),
+        )
+
+        if settings.commits_backend == "graphql":
+            scrapper = GithubGraphQLReposScrapper(
+                access_token=settings.github_token,
+                max_concurrent_requests=settings.max_concurrent_requests,
+                requests_per_second=settings.requests_per_second,
+                batch_size=settings.graphql_batch_size,
+                cache=cache,
+                retry_policy=retry_policy,
+                validate_commits=settings.validate_commits,
+                checkpoints=checkpoints,
+                session=connections.session(),
+            )
+        else:
+            scrapper = GithubReposScrapper(
+                access_token=settings.github_token,
+                max_concurrent_requests=settings.max_concurrent_requests,
+                requests_per_second=settings.requests_per_second,
+                cache=cache,
+                retry_policy=retry_policy,
+                validate_commits=settings.validate_commits,
+                checkpoints=checkpoints,
+                session=connections.session(),
+            )
+
+        logger.info(f"Streaming top {settings.top_repositories_limit} repositories into ClickHouse...")
+        inserted = await storage.insert_repositories_stream(
+            scrapper.iter_repositories(limit=settings.top_repositories_limit)
+        )
+        logger.info(f"Inserted {inserted} repositories")
         logger.info("ETL pipeline completed successfully")
 
     except Exception as e:
@@ -55,8 +106,16 @@ async def main():
     finally:
         if scrapper:
             await scrapper.close()
-        if ch_session:
-            await ch_session.close()
+            retry_stats = scrapper.retry_stats
+            logger.info(
+                f"Retries: {retry_stats.retries} ({dict(retry_stats.reasons)}), "
+                f"{retry_stats.recovered} recovered, {retry_stats.exhausted} exhausted"
+            )
+        if cache:
+            stats = cache.stats
+            logger.info(f"Response cache: {stats.hits} hits, {stats.misses} misses, {stats.evictions} evictions")
+        if connections:
+            await connections.close()
 
 
 if __name__ == "__main__":
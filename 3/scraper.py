@@ -1,18 +1,32 @@
 """Adapted from task2 for task 3"""
 
 import asyncio
+import logging
+import math
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
-from typing import Any, Final
+from datetime import date, datetime, timedelta, timezone
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Final
 from urllib.parse import parse_qs, urlparse
 
-from aiohttp import ClientSession
-from aiolimiter import AsyncLimiter
+from aiohttp import ClientResponseError, ClientSession
 from pydantic import BaseModel, Field
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from cache import ResponseCache
+from rate_limiter import RATE_LIMITED_STATUSES, AdaptiveRateLimiter, github_resource
+from retry import RetryPolicy, RetryStats
+
 GITHUB_API_BASE_URL: Final[str] = "https://api.github.com"
 MAX_REPOS_PER_REQUEST: Final[int] = 100
+SEARCH_RESULTS_LIMIT: Final[int] = 1000
+MIN_REPOSITORY_STARS: Final[int] = 2
+GITHUB_LAUNCH_DATE: Final[date] = date(2007, 10, 1)
 
 
 class GitHubOwner(BaseModel):
@@ -36,6 +50,7 @@ class GitHubCommitAuthor(BaseModel):
 
 class GitHubCommitDetails(BaseModel):
     author: GitHubCommitAuthor | None = None
+    committer: GitHubCommitAuthor | None = None
 
 
 class GitHubCommit(BaseModel):
@@ -47,6 +62,23 @@ class GitHubCommit(BaseModel):
 class RepositoryAuthorCommitsNum:
     author: str
     commits_num: int
+    commit_date: date | None = None
+
+
+@dataclass
+class CommitCheckpoint:
+    """
+    Newest commit seen for a repository, used as the high-water mark for incremental runs.
+    GitHub's `since` is inclusive, so `boundary_shas` keeps every commit made at `committed_at`
+    and the next run skips all of them, not just the newest.
+    """
+
+    committed_at: datetime
+    sha: str
+    boundary_shas: frozenset[str] = frozenset()
+
+    def covers(self, sha: str) -> bool:
+        return sha == self.sha or sha in self.boundary_shas
 
 
 @dataclass
@@ -59,6 +91,35 @@ class Repository:
     forks: int
     language: str
     authors_commits_num_today: list[RepositoryAuthorCommitsNum]
+    checkpoint: CommitCheckpoint | None = None
+    # Checkpoint time the counts start from, None when they cover the last 24h.
+    counted_since: datetime | None = None
+
+
+# Commit counts per (commit date, author), the date is None outside incremental runs.
+AuthorsCommits = tuple[dict[tuple[date | None, str], int], CommitCheckpoint | None]
+CommitInfo = tuple[str, str | None, str | None]
+
+
+def parse_commit(commit: dict[str, Any]) -> CommitInfo:
+    """Read sha, author name and commit date from a raw commit without building GitHubCommit models."""
+    details = commit.get("commit") or {}
+    author = details.get("author") or {}
+    signature = details.get("committer") or author
+    return commit.get("sha", ""), author.get("name"), signature.get("date")
+
+
+def newer_checkpoint(checkpoint: CommitCheckpoint | None, committed_at: str, sha: str) -> CommitCheckpoint | None:
+    """Return whichever of `checkpoint` and the given commit is newer, unparsable dates are ignored."""
+    try:
+        commit_time = datetime.fromisoformat(committed_at)
+    except ValueError:
+        return checkpoint
+    if checkpoint is None or commit_time > checkpoint.committed_at:
+        return CommitCheckpoint(committed_at=commit_time, sha=sha, boundary_shas=frozenset({sha}))
+    if commit_time == checkpoint.committed_at and not checkpoint.covers(sha):
+        return CommitCheckpoint(checkpoint.committed_at, checkpoint.sha, checkpoint.boundary_shas | {sha})
+    return checkpoint
 
 
 class GithubReposScrapper:
@@ -67,22 +128,114 @@ class GithubReposScrapper:
         access_token: str,
         max_concurrent_requests: int = 10,
         requests_per_second: int = 5,
+        cache: ResponseCache | None = None,
+        retry_policy: RetryPolicy | None = None,
+        checkpoints: dict[str, CommitCheckpoint] | None = None,
+        validate_commits: bool = False,
+        session: ClientSession | None = None,
+        repository_workers: int | None = None,
     ):
-        self._session = ClientSession(
-            headers={
-                "Accept": "application/vnd.github.v3+json",
-                "Authorization": f"Bearer {access_token}",
-            }
-        )
+        """
+        With `checkpoints` (possibly empty) the scrapper runs incrementally: only commits newer than
+        a repository's checkpoint are counted, repositories without one fall back to the last 24h.
+        Commits are read straight from the decoded JSON unless `validate_commits` is set,
+        which builds GitHubCommit models for every commit (slower, fails on malformed payloads).
+        A `session` (e.g. one from ConnectionManager) is used as is and left open on close().
+        `repository_workers` bounds the repositories iter_repositories processes at once
+        (defaults to `max_concurrent_requests`).
+        """
+        self._headers = {
+            "Accept": "application/vnd.github.v3+json",
+            "Authorization": f"Bearer {access_token}",
+        }
+        self._owns_session = session is None
+        self._session = session or ClientSession()
         self._semaphore = asyncio.Semaphore(max_concurrent_requests)
-        self._rate_limiter = AsyncLimiter(max_rate=requests_per_second, time_period=1.0)
+        self._repository_workers = repository_workers or max_concurrent_requests
+        self._rate_limiter = AdaptiveRateLimiter(max_rate=requests_per_second)
+        self._cache = cache
+        self._retry_policy = retry_policy or RetryPolicy()
+        self.retry_stats = RetryStats()
+        self._checkpoints = checkpoints
+        self._validate_commits = validate_commits
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> tuple[Any, dict[str, str]]:
+        """Send a request, retrying transient failures according to the retry policy."""
+        attempt = 1
+        while True:
+            try:
+                result = await self._send_request(endpoint, method, params, json)
+            except Exception as e:
+                delay = self._retry_policy.retry_delay(e, attempt)
+                if delay is None:
+                    if attempt > 1:
+                        self.retry_stats.exhausted += 1
+                    raise
+
+                self.retry_stats.record_retry(e)
+                logging.warning(f"Retrying {method} {endpoint} in {delay:.1f}s (attempt {attempt}): {e!r}")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
 
-    async def _make_request(self, endpoint: str, method: str = "GET", params: dict[str, Any] | None = None) -> tuple[Any, dict[str, str]]:
+            if attempt > 1:
+                self.retry_stats.recovered += 1
+            return result
+
+    async def _send_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: dict[str, Any] | None = None,
+        json: dict[str, Any] | None = None,
+    ) -> tuple[Any, dict[str, str]]:
+        cached = None
+        request_headers = dict(self._headers)
+        if self._cache is not None and method == "GET":
+            cached = self._cache.get(endpoint, params)
+            if cached is not None:
+                request_headers.update(cached.conditional_headers())
+
+        resource = github_resource(endpoint)
         async with self._semaphore:
-            await self._rate_limiter.acquire()
-            async with self._session.request(method, f"{GITHUB_API_BASE_URL}/{endpoint}", params=params) as response:
+            await self._rate_limiter.acquire(resource)
+            async with self._session.request(
+                method, f"{GITHUB_API_BASE_URL}/{endpoint}", params=params, json=json, headers=request_headers
+            ) as response:
+                message = await response.text() if response.status in RATE_LIMITED_STATUSES else ""
+                self._rate_limiter.update(response.status, response.headers, resource, message)
+
+                if cached is not None and response.status == HTTPStatus.NOT_MODIFIED:
+                    self._cache.record_hit()
+                    return cached.data, {**cached.headers, **dict(response.headers)}
+
+                if response.status in RATE_LIMITED_STATUSES:
+                    # The body tells a secondary rate limit from a permission error, the retry policy needs it.
+                    raise ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=message,
+                        headers=response.headers,
+                    )
                 response.raise_for_status()
-                return await response.json(), dict(response.headers)
+                data, headers = json_loads(await response.read()), dict(response.headers)
+
+        if self._cache is not None and method == "GET":
+            self._cache.record_miss()
+            self._cache.put(endpoint, params, data, headers)
+        return data, headers
+
+    @property
+    def current_rate(self) -> float:
+        """Requests per second the rate limiter currently allows."""
+        return self._rate_limiter.rate
 
     def _parse_link_header(self, link_header: str) -> dict[str, str]:
         """
@@ -119,23 +272,18 @@ class GithubReposScrapper:
             return data
         return []
 
-    async def _fetch_paginated(self, endpoint: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+    async def _fetch_paginated(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> list[dict[str, Any]]:
         current_params = params or {}
 
         data, headers = await self._make_request(endpoint, params=current_params)
         all_items = self._extract_items(data)
 
-        link_header = headers.get("Link", "")
-        links = self._parse_link_header(link_header)
-
-        last_url = links.get("last")
-        if not last_url:
-            return all_items
-
-        parsed = urlparse(last_url)
-        query_params = parse_qs(parsed.query)
-        last_page = int(query_params.get("page", ["1"])[0])
-
+        last_page = self._get_last_page(headers, max_pages)
         if last_page > 1:
             tasks = []
             for page_num in range(2, last_page + 1):
@@ -149,69 +297,298 @@ class GithubReposScrapper:
 
         return all_items
 
+    async def _iter_pages(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """
+        Streaming variant of _fetch_paginated: yields each page as soon as it arrives (completion order).
+        Pages are not retained after being yielded, so callers can fold them without holding the whole result.
+        """
+        current_params = params or {}
+
+        data, headers = await self._make_request(endpoint, params=current_params)
+        yield self._extract_items(data)
+
+        pending: set[asyncio.Task[tuple[Any, dict[str, str]]]] = set()
+        for page_num in range(2, self._get_last_page(headers, max_pages) + 1):
+            task = asyncio.create_task(self._make_request(endpoint, params={**current_params, "page": page_num}))
+            task.add_done_callback(pending.discard)
+            pending.add(task)
+
+        try:
+            for next_page in asyncio.as_completed(pending):
+                data, _ = await next_page
+                yield self._extract_items(data)
+        finally:
+            unfinished = list(pending)
+            for task in unfinished:
+                task.cancel()
+            # Wait for the cancellations so no task outlives the generator and failures are retrieved.
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+    def _get_last_page(self, headers: dict[str, str], max_pages: int | None = None) -> int:
+        links = self._parse_link_header(headers.get("Link", ""))
+
+        last_url = links.get("last")
+        if not last_url:
+            return 1
+
+        parsed = urlparse(last_url)
+        query_params = parse_qs(parsed.query)
+        last_page = int(query_params.get("page", ["1"])[0])
+        if max_pages is not None:
+            last_page = min(last_page, max_pages)
+        return last_page
+
     async def _get_top_repositories(self, limit: int = 100) -> list[GitHubRepository]:
         """
         GitHub REST API: https://docs.github.com/en/rest/search/search?apiVersion=2022-11-28#search-repositories
+        Search returns at most 1000 results per query, larger limits are split into star ranges.
         """
+        if limit > SEARCH_RESULTS_LIMIT:
+            return await self._get_top_repositories_partitioned(limit)
+
+        repos = await self._search_repositories("stars:>1", limit)
+        return [GitHubRepository(**repo) for repo in repos]
+
+    async def _search_repositories(self, query: str, limit: int = SEARCH_RESULTS_LIMIT) -> list[dict[str, Any]]:
         per_page = min(limit, MAX_REPOS_PER_REQUEST)
+        repos = await self._fetch_paginated(
+            endpoint="search/repositories",
+            params={"q": query, "sort": "stars", "order": "desc", "per_page": per_page},
+            max_pages=math.ceil(min(limit, SEARCH_RESULTS_LIMIT) / per_page),
+        )
+        return repos[:limit]
+
+    async def _probe_repositories(self, query: str) -> tuple[int, list[dict[str, Any]]]:
+        """Return total_count for a search query together with its top repository."""
         data, _ = await self._make_request(
             endpoint="search/repositories",
-            params={"q": "stars:>1", "sort": "stars", "order": "desc", "per_page": per_page},
+            params={"q": query, "sort": "stars", "order": "desc", "per_page": 1},
         )
-        repos = data.get("items", [])
-        return [GitHubRepository(**repo) for repo in repos]
+        return data.get("total_count", 0), data.get("items", [])
 
-    async def _get_repository_commits(self, owner: str, repo: str) -> list[GitHubCommit]:
+    async def _split_star_range(self, low: int, high: int) -> list[str]:
+        """
+        Split `stars:low..high` into search queries matching at most 1000 repositories each, highest stars first.
+        Ranges are halved geometrically since stars are heavy-tailed, both halves are explored concurrently.
+        A single star count matching more than 1000 repositories is split further by creation date.
+        """
+        query = f"stars:{low}..{high}"
+        count, _ = await self._probe_repositories(query)
+        if count == 0:
+            return []
+        if count <= SEARCH_RESULTS_LIMIT:
+            return [query]
+        if low == high:
+            return await self._split_created_range(query, GITHUB_LAUNCH_DATE, datetime.now(timezone.utc).date())
+
+        mid = min(max(math.isqrt(low * high), low), high - 1)
+        upper, lower = await asyncio.gather(
+            self._split_star_range(mid + 1, high),
+            self._split_star_range(low, mid),
+        )
+        return upper + lower
+
+    async def _split_created_range(self, stars_query: str, start: date, end: date) -> list[str]:
+        """Split `stars_query` by `created:start..end` into queries matching at most 1000 repositories each."""
+        query = f"{stars_query} created:{start.isoformat()}..{end.isoformat()}"
+        count, _ = await self._probe_repositories(query)
+        if count == 0:
+            return []
+        if count <= SEARCH_RESULTS_LIMIT:
+            return [query]
+        if start == end:
+            logging.warning(f"{count} repositories match {query!r}, only the first {SEARCH_RESULTS_LIMIT} are fetched")
+            return [query]
+
+        mid = start + (end - start) // 2
+        newer, older = await asyncio.gather(
+            self._split_created_range(stars_query, mid + timedelta(days=1), end),
+            self._split_created_range(stars_query, start, mid),
+        )
+        return newer + older
+
+    async def _find_min_stars(self, limit: int, max_stars: int) -> int:
+        """Find the highest star threshold that still matches at least `limit` repositories."""
+        thresholds = []
+        threshold = max_stars
+        while threshold > MIN_REPOSITORY_STARS:
+            threshold = max(threshold // 2, MIN_REPOSITORY_STARS)
+            thresholds.append(threshold)
+
+        counts = await asyncio.gather(*(self._probe_repositories(f"stars:>={t}") for t in thresholds))
+        for threshold, (count, _) in zip(thresholds, counts):
+            if count >= limit:
+                return threshold
+        return MIN_REPOSITORY_STARS
+
+    async def _get_top_repositories_partitioned(self, limit: int) -> list[GitHubRepository]:
+        _, top = await self._probe_repositories(f"stars:>={MIN_REPOSITORY_STARS}")
+        if not top:
+            return []
+
+        max_stars = top[0].get("stargazers_count", MIN_REPOSITORY_STARS)
+        min_stars = await self._find_min_stars(limit, max_stars)
+        queries = await self._split_star_range(min_stars, max_stars)
+
+        slices = await asyncio.gather(*(self._search_repositories(query) for query in queries))
+        repos = [repo for slice_repos in slices for repo in slice_repos]
+        return [GitHubRepository(**repo) for repo in repos[:limit]]
+
+    def _get_checkpoint(self, repo_data: GitHubRepository) -> CommitCheckpoint | None:
+        if self._checkpoints is None:
+            return None
+        return self._checkpoints.get(f"{repo_data.owner.login}/{repo_data.name}")
+
+    def _commit_day(self, committed_at: str | None) -> date | None:
+        """UTC date incremental runs file a commit's count under, None (the run date) otherwise."""
+        if self._checkpoints is None or not committed_at:
+            return None
+        try:
+            return datetime.fromisoformat(committed_at).astimezone(timezone.utc).date()
+        except ValueError:
+            return None
+
+    def _commits_since(self, checkpoint: CommitCheckpoint | None = None) -> datetime:
+        if checkpoint is not None:
+            return checkpoint.committed_at
+        return datetime.now(timezone.utc) - timedelta(days=1)
+
+    def _commits_request(
+        self,
+        owner: str,
+        repo: str,
+        checkpoint: CommitCheckpoint | None = None,
+    ) -> tuple[str, dict[str, Any]]:
         """
         GitHub REST API: https://docs.github.com/en/rest/commits/commits?apiVersion=2022-11-28#list-commits
         """
-        since = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
-        all_commits = await self._fetch_paginated(
-            endpoint=f"repos/{owner}/{repo}/commits",
-            params={"since": since, "per_page": 100},
+        since = self._commits_since(checkpoint).isoformat()
+        return f"repos/{owner}/{repo}/commits", {"since": since, "per_page": 100}
+
+    def _parse_commit(self, commit: dict[str, Any]) -> CommitInfo:
+        if not self._validate_commits:
+            return parse_commit(commit)
+
+        model = GitHubCommit(**commit)
+        signature = model.commit.committer or model.commit.author
+        return (
+            model.sha,
+            model.commit.author.name if model.commit.author else None,
+            signature.date if signature else None,
         )
-        return [GitHubCommit(**commit) for commit in all_commits]
 
-    async def get_repositories(self, limit: int = 100) -> list[Repository]:
-        top_repos = await self._get_top_repositories(limit)
+    async def _get_authors_commits(self, repo_data: GitHubRepository) -> AuthorsCommits | None:
+        """Commits per (day, author) not covered by the checkpoint and the new checkpoint, None if fetching failed."""
+        checkpoint = self._get_checkpoint(repo_data)
+        endpoint, params = self._commits_request(repo_data.owner.login, repo_data.name, checkpoint)
 
-        async def process_repository(repo_data: GitHubRepository, position: int) -> Repository:
-            owner = repo_data.owner.login
-            repo_name = repo_data.name
+        author_commits: defaultdict[tuple[date | None, str], int] = defaultdict(int)
+        newest = checkpoint
+        try:
+            async for page in self._iter_pages(endpoint, params):
+                for sha, author_name, committed_at in map(self._parse_commit, page):
+                    if checkpoint is not None and checkpoint.covers(sha):
+                        continue
 
-            try:
-                commits = await self._get_repository_commits(owner, repo_name)
-            except Exception:
-                commits = []
-
-            author_commits: defaultdict[str, int] = defaultdict(int)
-            for commit in commits:
-                if commit.commit.author and commit.commit.author.name:
-                    author_name = commit.commit.author.name
-                    author_commits[author_name] += 1
-
-            authors_commits_num_today = [
-                RepositoryAuthorCommitsNum(author=author, commits_num=count)
-                for author, count in author_commits.items()
-            ]
-
-            return Repository(
-                name=repo_name,
-                owner=owner,
-                position=position,
-                stars=repo_data.stargazers_count,
-                watchers=repo_data.watchers_count,
-                forks=repo_data.forks_count,
-                language=repo_data.language or "Unknown",
-                authors_commits_num_today=authors_commits_num_today,
-            )
+                    if author_name:
+                        author_commits[self._commit_day(committed_at), author_name] += 1
+
+                    if committed_at and self._checkpoints is not None:
+                        newest = newer_checkpoint(newest, committed_at, sha)
+        except Exception as e:
+            # Empty counts would overwrite the stored ones, the repository is skipped instead.
+            logging.error(f"Failed to fetch commits for {repo_data.owner.login}/{repo_data.name}: {e!r}")
+            return None
+
+        return author_commits, newest
+
+    def _build_repository(
+        self,
+        repo_data: GitHubRepository,
+        position: int,
+        author_commits: dict[tuple[date | None, str], int],
+        checkpoint: CommitCheckpoint | None = None,
+    ) -> Repository:
+        authors_commits_num_today = [
+            RepositoryAuthorCommitsNum(author=author, commits_num=count, commit_date=commit_date)
+            for (commit_date, author), count in author_commits.items()
+        ]
+        counted_from = self._get_checkpoint(repo_data)
+
+        return Repository(
+            name=repo_data.name,
+            owner=repo_data.owner.login,
+            position=position,
+            stars=repo_data.stargazers_count,
+            watchers=repo_data.watchers_count,
+            forks=repo_data.forks_count,
+            language=repo_data.language or "Unknown",
+            authors_commits_num_today=authors_commits_num_today,
+            checkpoint=checkpoint,
+            counted_since=counted_from.committed_at if counted_from is not None else None,
+        )
+
+    async def _process_repository(self, repo_data: GitHubRepository, position: int) -> Repository | None:
+        """The repository with its commits, None if they couldn't be fetched."""
+        commits = await self._get_authors_commits(repo_data)
+        if commits is None:
+            return None
+        author_commits, checkpoint = commits
+        return self._build_repository(repo_data, position, author_commits, checkpoint)
+
+    async def get_repositories(self, limit: int = 100) -> list[Repository]:
+        top_repos = await self._get_top_repositories(limit)
 
         tasks = [
-            process_repository(repo, position + 1)
+            self._process_repository(repo, position + 1)
             for position, repo in enumerate(top_repos)
         ]
         repositories = await asyncio.gather(*tasks)
-        return list(repositories)
+        return [repository for repository in repositories if repository is not None]
+
+    async def iter_repositories(self, limit: int = 100) -> AsyncIterator[Repository]:
+        """
+        Yield repositories as soon as their commits are processed (completion order, not position order).
+        A fixed pool of workers takes repositories from an input queue and hands results over a bounded queue,
+        so a slow consumer stops the workers: at most `repository_workers` repositories are being fetched
+        and as many wait to be consumed, whatever the `limit`.
+        """
+        top_repos = await self._get_top_repositories(limit)
+
+        inputs: asyncio.Queue[tuple[int, GitHubRepository]] = asyncio.Queue()
+        for position, repo in enumerate(top_repos, start=1):
+            inputs.put_nowait((position, repo))
+        results: asyncio.Queue[Repository | BaseException | None] = asyncio.Queue(maxsize=self._repository_workers)
+
+        async def work() -> None:
+            while not inputs.empty():
+                position, repo = inputs.get_nowait()
+                try:
+                    result: Repository | BaseException | None = await self._process_repository(repo, position)
+                except Exception as e:
+                    result = e
+                await results.put(result)
+
+        workers = [asyncio.create_task(work()) for _ in range(min(self._repository_workers, len(top_repos)))]
+        try:
+            for _ in top_repos:
+                result = await results.get()
+                if isinstance(result, BaseException):
+                    raise result
+                if result is not None:
+                    yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
     async def close(self):
-        await self._session.close()
+        if self._cache is not None:
+            self._cache.save()
+        if self._owns_session:
+            await self._session.close()
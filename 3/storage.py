@@ -1,105 +1,456 @@
+import asyncio
+import gzip
 import logging
+from dataclasses import dataclass
 from datetime import date, datetime, timezone
-from pathlib import Path
-from typing import Any
+from http import HTTPStatus
+from typing import Any, AsyncGenerator, AsyncIterator, Final, Literal
 
-from aiochclient import ChClient
+from aiochclient import ChClient, ChClientError
+from aiohttp import ClientSession
+
+from migrator import MigrationRunner
+from rowbinary import encode_rows
+from scraper import CommitCheckpoint, RepositoryAuthorCommitsNum
 
 logger = logging.getLogger(__name__)
 
+_AUTHORS_COMMITS_TABLE: Final[str] = "repositories_authors_commits"
+_AUTHORS_COMMITS_DELTAS_TABLE: Final[str] = "repositories_authors_commits_deltas"
+_CHECKPOINTS_TABLE: Final[str] = "repositories_commits_checkpoints"
+# `since` of deltas counted without a checkpoint.
+_NO_CHECKPOINT: Final[datetime] = datetime(1970, 1, 1)
+_STREAM_END: Final[object] = object()
+# Column types in table order, must follow the migrations.
+_COLUMN_TYPES: Final[dict[str, tuple[str, ...]]] = {
+    "repositories": ("String", "String", "Int32", "Int32", "Int32", "String", "DateTime"),
+    "repositories_positions": ("Date", "String", "UInt32"),
+    "repositories_authors_commits": ("Date", "String", "String", "Int32"),
+    "repositories_authors_commits_deltas": ("Date", "String", "String", "DateTime", "DateTime", "Int32"),
+    "repositories_commits_checkpoints": ("String", "DateTime", "String", "DateTime", "Array(String)"),
+}
+_GZIP_LEVEL: Final[int] = 1
+# Tables partitioned by month of `date`, the ones retention applies to.
+_DATED_TABLES: Final[tuple[str, ...]] = (
+    "repositories_authors_commits",
+    "repositories_authors_commits_deltas",
+    "repositories_positions",
+    "repositories_daily_commits",
+)
+
+# Settings for every client the storage is used with. Naive datetimes are UTC throughout: RowBinary sends
+# them as UTC timestamps, and session_timezone makes the server parse VALUES strings and render results in UTC.
+CLIENT_SETTINGS: Final[dict[str, str]] = {"session_timezone": "UTC"}
+
+InsertFormat = Literal["values", "rowbinary"]
+InsertMode = Literal["sync", "async", "buffer"]
+
+
+@dataclass
+class RepositoryDailyCommits:
+    date: date
+    repo: str
+    commits_num: int
+    authors_num: int
+
 
 class ClickHouseStorage:
-    def __init__(self, client: ChClient, batch_size: int = 100):
+    def __init__(
+        self,
+        client: ChClient,
+        database: str = "test",
+        batch_size: int = 100,
+        incremental: bool = False,
+        max_concurrent_inserts: int = 4,
+        insert_format: InsertFormat = "values",
+        session: ClientSession | None = None,
+        insert_mode: InsertMode = "sync",
+        wait_for_async_insert: bool = True,
+    ):
+        """
+        In `incremental` mode author commit counts are deltas of newly seen commits, dated by commit date.
+        They go to repositories_authors_commits_deltas keyed by the checkpoint they were counted from,
+        reads sum them, and a checkpoint is only written once the deltas it covers are stored.
+        Checkpoints are only written in incremental mode, other runs don't read them back.
+        At most `max_concurrent_inserts` INSERT queries are in flight at once, across all tables.
+        With `insert_format="rowbinary"` batches are encoded as one gzipped RowBinary body
+        and posted through `session` instead of being rendered as SQL VALUES by the client.
+        `insert_mode="async"` lets the server batch inserts (async_insert=1), `"buffer"` writes
+        into the *_buffer tables, both keep small writers from creating many tiny parts.
+        Incremental mode needs every insert committed when it returns, since a checkpoint must not be stored
+        before its deltas nor read back before it is visible: it can't be combined with `"buffer"`
+        or with `"async"` without waiting for the async insert.
+        """
+        if insert_format == "rowbinary" and session is None:
+            raise ValueError("RowBinary inserts need an HTTP session")
+        if incremental and (insert_mode == "buffer" or (insert_mode == "async" and not wait_for_async_insert)):
+            raise ValueError("Incremental mode needs sync inserts or async inserts with wait_for_async_insert")
+
         self._client = client
+        self._database = database
         self._batch_size = batch_size
+        self._incremental = incremental
+        self._authors_table = _AUTHORS_COMMITS_DELTAS_TABLE if incremental else _AUTHORS_COMMITS_TABLE
+        self._tables = ("repositories", "repositories_positions", self._authors_table)
+        if incremental:
+            self._tables += (_CHECKPOINTS_TABLE,)
+        self._max_concurrent_inserts = max_concurrent_inserts
+        self._insert_semaphore = asyncio.Semaphore(max_concurrent_inserts)
+        self._insert_format = insert_format
+        self._session = session
+        self._insert_mode = insert_mode
+        self._wait_for_async_insert = wait_for_async_insert
+
+    async def initialize_database(self) -> None:
+        """Bring the database schema up to date, a no-op apart from one query when nothing is pending."""
+        await MigrationRunner(self._client, self._database).migrate()
 
-    async def initialize_database(self, database: str) -> None:
-        await self._client.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    async def insert_repositories_batch(self, repositories: list[Any]) -> None:
+        current_timestamp = datetime.now(timezone.utc)
+        current_date = date.today()
 
-        sql_file = Path(__file__).parent / "tables.sql"
-        sql_content = sql_file.read_text()
+        await asyncio.gather(
+            self._insert_repositories_metadata(repositories, current_timestamp),
+            self._insert_repositories_positions(repositories, current_date),
+            self._insert_authors_commits(repositories, current_date),
+        )
+        if self._incremental:
+            await self._insert_checkpoints(repositories, current_timestamp)
 
-        statements = []
-        current_statement = []
+    async def set_retention(self, days: int | None) -> None:
+        """
+        Expire rows of the dated tables `days` after their date through a table TTL, None removes the TTL.
+        Tables set ttl_only_drop_parts, so whole monthly partitions are dropped once all their days expire.
+        Tables already carrying the requested TTL are left alone.
+        """
+        rows = await self._client.fetch(
+            "SELECT name, engine_full FROM system.tables WHERE database = {database} AND name IN {tables}",
+            params={"database": self._database, "tables": _DATED_TABLES},
+        )
+        for row in rows:
+            table, engine = row["name"], row["engine_full"]
+            if days is None:
+                if " TTL " in engine:
+                    await self._client.execute(f"ALTER TABLE {self._database}.{table} REMOVE TTL")
+            elif f"TTL date + toIntervalDay({days})" not in engine:
+                await self._client.execute(
+                    f"ALTER TABLE {self._database}.{table} MODIFY TTL date + INTERVAL {days} DAY"
+                )
+                logger.info(f"Retention of {table} set to {days} days")
 
-        for line in sql_content.split("\n"):
-            line = line.strip()
-            if not line or line.startswith("--"):
-                continue
+    async def get_checkpoints(self) -> dict[str, CommitCheckpoint]:
+        rows = await self._client.fetch(
+            f"SELECT repo, committed_at, sha, boundary_shas FROM {self._database}.{_CHECKPOINTS_TABLE} FINAL"
+        )
+        return {
+            row["repo"]: CommitCheckpoint(
+                committed_at=row["committed_at"].replace(tzinfo=timezone.utc),
+                sha=row["sha"],
+                boundary_shas=frozenset(row["boundary_shas"]),
+            )
+            for row in rows
+        }
 
-            current_statement.append(line)
+    async def get_daily_commits(
+        self,
+        start: date,
+        end: date,
+        repos: list[str] | None = None,
+    ) -> list[RepositoryDailyCommits]:
+        """
+        Commits and distinct authors per repository per day from the repositories_daily_commits aggregate.
+        In incremental mode they are summed from the deltas through the FINAL totals view instead: the aggregate
+        is fed by repositories_authors_commits only, and a retried run replaces its delta rather than adding one,
+        which a sum kept on insert can't undo.
+        """
+        if self._incremental:
+            query = (
+                "SELECT date, repo, sum(commits_num) AS commits_num, count() AS authors_num "
+                f"FROM {self._database}.repositories_authors_commits_totals "
+                f"WHERE {self._daily_commits_filter(repos)} "
+                "GROUP BY date, repo ORDER BY date, repo"
+            )
+        else:
+            query = (
+                "SELECT date, repo, arraySum(value -> value.2, mapValues(authors_commits)) AS commits_num, "
+                "length(authors_commits) AS authors_num "
+                f"FROM ({self._daily_commits_query(repos)}) "
+                "ORDER BY date, repo"
+            )
+        rows = await self._client.fetch(query, params={"start": start, "end": end, "repos": tuple(repos or ())})
+        return [
+            RepositoryDailyCommits(
+                date=row["date"],
+                repo=row["repo"],
+                commits_num=row["commits_num"],
+                authors_num=row["authors_num"],
+            )
+            for row in rows
+        ]
 
-            if line.endswith(";"):
-                statement = " ".join(current_statement).strip().rstrip(";")
-                if statement.upper().startswith("CREATE"):
-                    statements.append(statement)
-                current_statement = []
+    async def get_top_authors(
+        self,
+        start: date,
+        end: date,
+        limit: int = 10,
+        repos: list[str] | None = None,
+    ) -> list[RepositoryAuthorCommitsNum]:
+        """
+        Authors with the most commits between `start` and `end`, optionally limited to `repos`.
+        Read from the same aggregate as get_daily_commits, or from the deltas in incremental mode.
+        """
+        if self._incremental:
+            query = (
+                "SELECT author, sum(commits_num) AS commits_num "
+                f"FROM {self._database}.repositories_authors_commits_totals "
+                f"WHERE {self._daily_commits_filter(repos)} "
+                "GROUP BY author ORDER BY commits_num DESC, author LIMIT {limit}"
+            )
+        else:
+            query = (
+                "SELECT author, sum(value.2) AS commits_num "
+                f"FROM ({self._daily_commits_query(repos)}) "
+                "ARRAY JOIN mapKeys(authors_commits) AS author, mapValues(authors_commits) AS value "
+                "GROUP BY author ORDER BY commits_num DESC, author LIMIT {limit}"
+            )
+        rows = await self._client.fetch(
+            query,
+            params={"start": start, "end": end, "repos": tuple(repos or ()), "limit": limit},
+        )
+        return [RepositoryAuthorCommitsNum(author=row["author"], commits_num=row["commits_num"]) for row in rows]
 
-        for statement in statements:
-            await self._client.execute(statement)
+    def _daily_commits_query(self, repos: list[str] | None) -> str:
+        """Map of author -> (insert time, latest count) per date and repo from repositories_daily_commits."""
+        return (
+            "SELECT date, repo, maxMapMerge(authors_commits) AS authors_commits "
+            f"FROM {self._database}.repositories_daily_commits "
+            f"WHERE {self._daily_commits_filter(repos)} "
+            "GROUP BY date, repo"
+        )
 
-        logger.info(f"Database '{database}' initialized")
+    def _daily_commits_filter(self, repos: list[str] | None) -> str:
+        condition = "date >= {start} AND date <= {end}"
+        if repos:
+            condition += " AND repo IN {repos}"
+        return condition
 
-    async def insert_repositories_batch(self, repositories: list[Any]) -> None:
+    async def insert_repositories_stream(
+        self,
+        repositories: AsyncIterator[Any],
+        queue_size: int | None = None,
+    ) -> int:
+        """
+        Consume repositories from an async iterator while it is still producing.
+        Repositories go through a bounded queue, rows are buffered per table and
+        flushed as soon as a table buffer reaches batch_size. Flushes of different tables run concurrently
+        (at most twice max_concurrent_inserts pending), a checkpoint batch waits for the author commit
+        inserts started before it. Returns the number of repositories inserted.
+        """
         current_timestamp = datetime.now(timezone.utc)
         current_date = date.today()
 
-        await self._insert_repositories_metadata(repositories, current_timestamp)
-        await self._insert_repositories_positions(repositories, current_date)
-        await self._insert_authors_commits(repositories, current_date)
+        queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size or self._batch_size)
+
+        async def produce() -> None:
+            try:
+                async for repo in repositories:
+                    await queue.put(repo)
+            except Exception:
+                await queue.put(_STREAM_END)
+                raise
+            finally:
+                # Stop the source's workers when cancelled while blocked on a full queue.
+                if isinstance(repositories, AsyncGenerator):
+                    await repositories.aclose()
+            await queue.put(_STREAM_END)
+
+        buffers: dict[str, list[tuple]] = {table: [] for table in self._tables}
+        inserts: set[asyncio.Task[None]] = set()
+        authors_inserts: list[asyncio.Task[None]] = []
+
+        async def insert_checkpoints(rows: list[tuple], covered: list[asyncio.Task[None]]) -> None:
+            # Checkpoints may only land once the commit counts they cover are stored.
+            await asyncio.gather(*covered)
+            await self._insert_rows(_CHECKPOINTS_TABLE, rows)
+
+        def flush(table: str, force: bool = False) -> None:
+            rows = buffers[table]
+            covered: list[asyncio.Task[None]] = []
+            if table == _CHECKPOINTS_TABLE and (len(rows) >= self._batch_size or (force and rows)):
+                flush(self._authors_table, force=True)
+                covered = authors_inserts.copy()
+                authors_inserts.clear()
+            while len(rows) >= self._batch_size or (force and rows):
+                batch, rows = rows[: self._batch_size], rows[self._batch_size :]
+                if table == _CHECKPOINTS_TABLE:
+                    inserts.add(asyncio.create_task(insert_checkpoints(batch, covered)))
+                    continue
+                task = asyncio.create_task(self._insert_rows(table, batch))
+                inserts.add(task)
+                if table == self._authors_table:
+                    authors_inserts.append(task)
+            buffers[table] = rows
+
+        async def drain(limit: int) -> None:
+            """Wait until at most `limit` inserts are pending, raising the first failed one."""
+            while True:
+                for task in [task for task in inserts if task.done()]:
+                    inserts.discard(task)
+                    task.result()
+                if len(inserts) <= limit:
+                    return
+                await asyncio.wait(inserts, return_when=asyncio.FIRST_COMPLETED)
+
+        producer = asyncio.create_task(produce())
+        inserted = 0
+        try:
+            while (repo := await queue.get()) is not _STREAM_END:
+                buffers["repositories"].extend(self._metadata_rows([repo], current_timestamp))
+                buffers["repositories_positions"].extend(self._positions_rows([repo], current_date))
+                buffers[self._authors_table].extend(self._authors_commits_rows([repo], current_date))
+                if self._incremental:
+                    buffers[_CHECKPOINTS_TABLE].extend(self._checkpoints_rows([repo], current_timestamp))
+                inserted += 1
+
+                for table in self._tables:
+                    flush(table)
+                await drain(2 * self._max_concurrent_inserts)
+
+            for table in self._tables:
+                flush(table, force=True)
+            await drain(0)
+        finally:
+            for task in inserts:
+                task.cancel()
+            await asyncio.gather(*inserts, return_exceptions=True)
+            if not producer.done():
+                producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
+
+        logger.info(f"Streamed {inserted} repositories into ClickHouse")
+        return inserted
+
+    async def _insert_rows(self, table: str, rows: list[tuple]) -> None:
+        async with self._insert_semaphore:
+            if self._insert_format == "rowbinary":
+                await self._insert_rowbinary(table, rows)
+            else:
+                await self._client.execute(f"{self._insert_query(table)} VALUES", *rows)
+
+    def _insert_query(self, table: str) -> str:
+        if self._insert_mode == "buffer":
+            return f"INSERT INTO {self._database}.{table}_buffer"
+        if self._insert_mode == "async":
+            wait = int(self._wait_for_async_insert)
+            return f"INSERT INTO {self._database}.{table} SETTINGS async_insert=1, wait_for_async_insert={wait}"
+        return f"INSERT INTO {self._database}.{table}"
+
+    async def _insert_rowbinary(self, table: str, rows: list[tuple]) -> None:
+        body = gzip.compress(encode_rows(rows, _COLUMN_TYPES[table]), compresslevel=_GZIP_LEVEL)
+        params = {**self._client.params, "query": f"{self._insert_query(table)} FORMAT RowBinary"}
+        headers = {**self._client.headers, "Content-Encoding": "gzip"}
+        async with self._session.post(self._client.url, params=params, headers=headers, data=body) as response:
+            if response.status != HTTPStatus.OK:
+                raise ChClientError((await response.read()).decode(errors="replace"))
+
+    async def _insert_batches(self, table: str, rows: list[tuple]) -> None:
+        """Split rows into batch_size chunks and insert them concurrently."""
+        await asyncio.gather(
+            *(
+                self._insert_rows(table, rows[i : i + self._batch_size])
+                for i in range(0, len(rows), self._batch_size)
+            )
+        )
+
+    def _metadata_rows(self, repositories: list[Any], updated_timestamp: datetime) -> list[tuple]:
+        return [
+            (
+                repo.name,
+                repo.owner,
+                repo.stars,
+                repo.watchers,
+                repo.forks,
+                repo.language if repo.language else "Unknown",
+                updated_timestamp.replace(tzinfo=None, microsecond=0),
+            )
+            for repo in repositories
+        ]
+
+    def _positions_rows(self, repositories: list[Any], current_date: date) -> list[tuple]:
+        return [
+            (current_date, f"{repo.owner}/{repo.name}", repo.position)
+            for repo in repositories
+        ]
+
+    def _authors_commits_rows(self, repositories: list[Any], current_date: date) -> list[tuple]:
+        rows = []
+        for repo in repositories:
+            repo_name = f"{repo.owner}/{repo.name}"
+            if self._incremental:
+                since = _utc_seconds(repo.counted_since) if repo.counted_since is not None else _NO_CHECKPOINT
+                until = _utc_seconds(repo.checkpoint.committed_at) if repo.checkpoint is not None else since
+            for author_commit in repo.authors_commits_num_today:
+                commit_date = author_commit.commit_date or current_date
+                if self._incremental:
+                    rows.append(
+                        (commit_date, repo_name, author_commit.author, since, until, author_commit.commits_num)
+                    )
+                else:
+                    rows.append(
+                        (commit_date, repo_name, author_commit.author, author_commit.commits_num)
+                    )
+        return rows
+
+    def _checkpoints_rows(self, repositories: list[Any], updated_timestamp: datetime) -> list[tuple]:
+        return [
+            (
+                f"{repo.owner}/{repo.name}",
+                _utc_seconds(repo.checkpoint.committed_at),
+                repo.checkpoint.sha,
+                updated_timestamp.replace(tzinfo=None, microsecond=0),
+                sorted(repo.checkpoint.boundary_shas or {repo.checkpoint.sha}),
+            )
+            for repo in repositories
+            if getattr(repo, "checkpoint", None) is not None
+        ]
 
     async def _insert_repositories_metadata(
         self,
         repositories: list[Any],
         updated_timestamp: datetime,
     ) -> None:
-        for i in range(0, len(repositories), self._batch_size):
-            batch = repositories[i : i + self._batch_size]
-
-            rows = [
-                (
-                    repo.name,
-                    repo.owner,
-                    repo.stars,
-                    repo.watchers,
-                    repo.forks,
-                    repo.language if repo.language else "Unknown",
-                    updated_timestamp.replace(tzinfo=None, microsecond=0),
-                )
-                for repo in batch
-            ]
-
-            await self._client.execute("INSERT INTO test.repositories VALUES", *rows)
+        rows = self._metadata_rows(repositories, updated_timestamp)
+        await self._insert_batches("repositories", rows)
 
     async def _insert_repositories_positions(
         self,
         repositories: list[Any],
         current_date: date,
     ) -> None:
-        """Insert repository positions into test.repositories_positions table in batches."""
-        for i in range(0, len(repositories), self._batch_size):
-            batch = repositories[i : i + self._batch_size]
-
-            rows = [
-                (current_date, f"{repo.owner}/{repo.name}", repo.position)
-                for repo in batch
-            ]
-
-            await self._client.execute("INSERT INTO test.repositories_positions VALUES", *rows)
+        """Insert repository positions into the repositories_positions table in batches."""
+        rows = self._positions_rows(repositories, current_date)
+        await self._insert_batches("repositories_positions", rows)
 
     async def _insert_authors_commits(
         self,
         repositories: list[Any],
         current_date: date,
     ) -> None:
-        all_commits = []
-        for repo in repositories:
-            repo_name = f"{repo.owner}/{repo.name}"
-            for author_commit in repo.authors_commits_num_today:
-                all_commits.append(
-                    (current_date, repo_name, author_commit.author, author_commit.commits_num)
-                )
+        all_commits = self._authors_commits_rows(repositories, current_date)
+        await self._insert_batches(self._authors_table, all_commits)
+
+    async def _insert_checkpoints(
+        self,
+        repositories: list[Any],
+        updated_timestamp: datetime,
+    ) -> None:
+        rows = self._checkpoints_rows(repositories, updated_timestamp)
+        await self._insert_batches(_CHECKPOINTS_TABLE, rows)
+
 
-        for i in range(0, len(all_commits), self._batch_size):
-            batch = all_commits[i : i + self._batch_size]
-            await self._client.execute("INSERT INTO test.repositories_authors_commits VALUES", *batch)
+def _utc_seconds(value: datetime) -> datetime:
+    """Naive UTC datetime truncated to seconds, as stored in DateTime columns."""
+    return value.astimezone(timezone.utc).replace(tzinfo=None, microsecond=0)
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import pytest
+from aiochclient import ChClientError
+
+
+def _literal(value: Any) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if isinstance(value, (date, datetime)):
+        return f"'{value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()}'"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(map(_literal, value)) + "]"
+    return str(value)
+
+
+def _parse(value: Any, type_: str) -> Any:
+    """Dates and datetimes as the Python objects aiochclient returns, other values as JSON decodes them."""
+    if value is None:
+        return None
+    if type_.startswith("Date"):
+        return date.fromisoformat(value) if type_ in ("Date", "Date32") else datetime.fromisoformat(value)
+    return value
+
+
+class ChdbClient:
+    """The subset of aiochclient.ChClient the storage and migrator use, backed by an embedded chdb session."""
+
+    def __init__(self, session: Any):
+        self._session = session
+
+    async def _query(self, query: str, params: dict[str, Any] | None, fmt: str = "CSV") -> Any:
+        # Yield like a network round trip would, so concurrent callers interleave.
+        await asyncio.sleep(0)
+        if params:
+            query = query.format(**{name: _literal(value) for name, value in params.items()})
+        try:
+            return self._session.query(query, fmt)
+        except Exception as e:
+            raise ChClientError(str(e)) from e
+
+    async def execute(self, query: str, *args: Any, params: dict[str, Any] | None = None) -> None:
+        if args:
+            query += " " + ", ".join("(" + ", ".join(map(_literal, row)) + ")" for row in args)
+        await self._query(query, params)
+
+    async def fetch(self, query: str, *args: Any, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        result = await self._query(query, params, "JSONCompactEachRowWithNamesAndTypes")
+        names, types, *rows = map(json.loads, result.bytes().decode().splitlines())
+        return [
+            {name: _parse(value, type_) for name, type_, value in zip(names, types, row)}
+            for row in rows
+        ]
+
+    async def fetchval(self, query: str, *args: Any, params: dict[str, Any] | None = None) -> Any:
+        rows = await self.fetch(query, params=params)
+        return next(iter(rows[0].values())) if rows else None
+
+
+@pytest.fixture
+def chdb_client(tmp_path: Path) -> Iterator[ChdbClient]:
+    session_module = pytest.importorskip("chdb.session")
+    session = session_module.Session(str(tmp_path / "chdb"))
+    try:
+        yield ChdbClient(session)
+    finally:
+        session.close()
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any
+
+import pytest
+from aiochclient import ChClientError
+
+from migrator import MigrationRunner, load_migrations
+from tests.conftest import ChdbClient
+
+
+class FailingClient:
+    def __init__(self, message: str):
+        self.message = message
+
+    async def fetch(self, query: str, *args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        raise ChClientError(self.message)
+
+
+class TestMigrationRunner:
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Code: 60. DB::Exception: Table test.schema_migrations does not exist. (UNKNOWN_TABLE)",
+            "Code: 81. DB::Exception: Database test does not exist. (UNKNOWN_DATABASE)",
+        ],
+    )
+    async def test_missing_migrations_table(self, message: str) -> None:
+        """Test that a missing table or database means no migration has been applied yet."""
+        runner = MigrationRunner(FailingClient(message), "test", migrations=[])
+
+        assert await runner.applied_versions() is None
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "Code: 516. DB::Exception: default: Authentication failed. (AUTHENTICATION_FAILED)",
+            "Code: 159. DB::Exception: Timeout exceeded: elapsed 5 seconds. (TIMEOUT_EXCEEDED)",
+            "502 Bad Gateway",
+        ],
+    )
+    async def test_other_errors_raised(self, message: str) -> None:
+        """Test that errors other than a missing table are raised instead of triggering migrations."""
+        runner = MigrationRunner(FailingClient(message), "test", migrations=[])
+
+        with pytest.raises(ChClientError):
+            await runner.applied_versions()
+
+    async def test_migrate_applies_every_migration_once(self, chdb_client: ChdbClient) -> None:
+        """Test that a fresh database is migrated and a second run has nothing to do."""
+        # Arrange
+        runner = MigrationRunner(chdb_client, "test")
+
+        # Act
+        applied = await runner.migrate()
+        reapplied = await runner.migrate()
+
+        # Assert
+        assert [migration.version for migration in applied] == [m.version for m in load_migrations()]
+        assert reapplied == []
+        assert await chdb_client.fetchval(
+            "SELECT partition_key FROM system.tables WHERE database = 'test' AND name = 'repositories_positions'"
+        ) == "toYYYYMM(date)"
+
+    async def test_interrupted_rebuild_resumes(self, chdb_client: ChdbClient) -> None:
+        """Test that a table rebuild interrupted after its EXCHANGE is completed without copying again."""
+        # Arrange
+        migrations = load_migrations()
+        await MigrationRunner(chdb_client, "test", migrations=migrations[:2]).migrate()
+        await chdb_client.execute(
+            "INSERT INTO test.repositories_positions VALUES", ("2025-01-01", "a/b", 1), ("2025-01-02", "a/b", 2)
+        )
+        rebuild = [statement.sql for statement in migrations[2].statements("test")]
+        # Crash right after the positions table was swapped, before its old copy was dropped.
+        exchange = next(
+            i for i, sql in enumerate(rebuild) if sql.startswith("EXCHANGE TABLES test.repositories_positions")
+        )
+        for sql in rebuild[: exchange + 1]:
+            await chdb_client.execute(sql)
+
+        # Act
+        await MigrationRunner(chdb_client, "test", migrations=migrations[:3]).migrate()
+
+        # Assert
+        assert await chdb_client.fetchval("SELECT count() FROM test.repositories_positions") == 2
+        assert not await chdb_client.fetchval(
+            "SELECT count() FROM system.tables WHERE database = 'test' AND name = 'repositories_positions_partitioned'"
+        )
+
+    async def test_concurrent_runners_apply_once(self, chdb_client: ChdbClient) -> None:
+        """Test that runners started together take turns and each migration is applied by one of them."""
+        # Arrange
+        runners = [MigrationRunner(chdb_client, "test", poll_interval=0.01) for _ in range(3)]
+
+        # Act
+        results = await asyncio.gather(*(runner.migrate() for runner in runners))
+
+        # Assert
+        assert sorted(len(applied) for applied in results) == [0, 0, len(load_migrations())]
+        assert await chdb_client.fetchval("SELECT count() FROM test.schema_migrations") == len(load_migrations())
@@ -0,0 +1,64 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from rowbinary import encode_rows
+from storage import CLIENT_SETTINGS
+
+COLUMNS = (
+    ("name", "String"),
+    ("day", "Date"),
+    ("at", "DateTime"),
+    ("delta", "Int32"),
+    ("position", "UInt32"),
+    ("shas", "Array(String)"),
+)
+ROWS = [
+    ("octocat/hello-world", date(2024, 2, 29), datetime(2024, 2, 29, 23, 59, 59), -5, 1, ["a1", "b2"]),
+    ("", date(1970, 1, 1), datetime(1970, 1, 1, 0, 0, 1), 2**31 - 1, 2**32 - 1, []),
+    ("юникод ✓", date(2149, 6, 6), datetime(2106, 2, 7, 6, 28, 15), -(2**31), 0, [""]),
+]
+
+
+class TestEncodeRows:
+    def test_naive_datetime_encoded_as_utc(self) -> None:
+        """Test that a naive datetime is encoded like the same wall time in UTC, not the local timezone."""
+        # Arrange
+        naive = datetime(2025, 6, 1, 12, 30)
+        aware = naive.replace(tzinfo=timezone.utc)
+        shifted = aware.astimezone(timezone(timedelta(hours=5)))
+
+        # Act & Assert
+        assert encode_rows([(naive,)], ["DateTime"]) == encode_rows([(aware,)], ["DateTime"])
+        assert encode_rows([(naive,)], ["DateTime"]) == encode_rows([(shifted,)], ["DateTime"])
+
+    def test_round_trip_through_clickhouse(self, tmp_path: Path) -> None:
+        """Test that ClickHouse reads back every column as written, with DateTime in UTC like VALUES inserts."""
+        # Arrange
+        chdb = pytest.importorskip("chdb")
+        path = tmp_path / "rows.bin"
+        path.write_bytes(encode_rows(ROWS, [column_type for _, column_type in COLUMNS]))
+        structure = ", ".join(f"{name} {column_type}" for name, column_type in COLUMNS)
+        settings = ", ".join(f"{name} = '{value}'" for name, value in CLIENT_SETTINGS.items())
+
+        # Act
+        result = chdb.query(
+            f"SELECT * FROM file('{path}', RowBinary, '{structure}') SETTINGS {settings}",
+            "JSONEachRow",
+        )
+        decoded = [json.loads(line) for line in result.bytes().decode().splitlines()]
+
+        # Assert
+        assert decoded == [
+            {
+                "name": name,
+                "day": day.isoformat(),
+                "at": at.strftime("%Y-%m-%d %H:%M:%S"),
+                "delta": delta,
+                "position": position,
+                "shas": shas,
+            }
+            for name, day, at, delta, position, shas in ROWS
+        ]
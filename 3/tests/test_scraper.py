@@ -0,0 +1,139 @@
+from collections.abc import AsyncIterator
+from datetime import date
+from typing import Any
+
+import pytest
+
+from scraper import CommitCheckpoint, GitHubOwner, GitHubRepository, GithubReposScrapper
+from storage import ClickHouseStorage
+from tests.conftest import ChdbClient
+
+DAY = date(2025, 1, 1)
+
+
+def make_commit(sha: str, committed_at: str = "2025-01-01T10:00:00Z") -> dict[str, Any]:
+    return {"sha": sha, "commit": {"author": {"name": "alice"}, "committer": {"date": committed_at}}}
+
+
+def make_scrapper(
+    commits: dict[str, list[dict[str, Any]] | None],
+    checkpoints: dict[str, CommitCheckpoint] | None = None,
+) -> GithubReposScrapper:
+    """Scrapper over one page of `commits` per repository name, None makes fetching that repository fail."""
+    scrapper = GithubReposScrapper(access_token="token", checkpoints=checkpoints)
+    repos = [GitHubRepository(name=name, owner=GitHubOwner(login="owner")) for name in commits]
+
+    async def get_top_repositories(limit: int = 100) -> list[GitHubRepository]:
+        return repos[:limit]
+
+    async def iter_pages(endpoint: str, params: dict[str, Any]) -> AsyncIterator[list[dict[str, Any]]]:
+        page = commits[endpoint.split("/")[2]]
+        if page is None:
+            raise RuntimeError("retries exhausted")
+        yield page
+
+    scrapper._get_top_repositories = get_top_repositories  # type: ignore[method-assign]
+    scrapper._iter_pages = iter_pages  # type: ignore[method-assign]
+    return scrapper
+
+
+@pytest.fixture
+async def scrapper() -> AsyncIterator[GithubReposScrapper]:
+    scrapper = make_scrapper({"ok": [make_commit("abc")], "broken": None})
+    yield scrapper
+    await scrapper.close()
+
+
+class TestGithubReposScrapper:
+    async def test_failed_repository_skipped(self, scrapper: GithubReposScrapper, caplog: Any) -> None:
+        """Test that a repository whose commits can't be fetched is logged and skipped, not stored with no commits."""
+        # Act
+        repositories = await scrapper.get_repositories()
+
+        # Assert
+        assert [repository.name for repository in repositories] == ["ok"]
+        assert repositories[0].authors_commits_num_today[0].commits_num == 1
+        assert "owner/broken" in caplog.text
+
+    async def test_failed_repository_not_yielded(self, scrapper: GithubReposScrapper) -> None:
+        """Test that the streaming variant skips a failed repository and still yields the others."""
+        # Act
+        repositories = [repository async for repository in scrapper.iter_repositories()]
+
+        # Assert
+        assert [repository.name for repository in repositories] == ["ok"]
+
+    async def test_no_checkpoint_outside_incremental_mode(self, scrapper: GithubReposScrapper) -> None:
+        """Test that runs without checkpoints don't compute new ones."""
+        # Act
+        repositories = await scrapper.get_repositories()
+
+        # Assert
+        assert repositories[0].checkpoint is None
+
+
+class TestIncrementalRuns:
+    async def run(self, storage: ClickHouseStorage, commits: list[dict[str, Any]]) -> None:
+        scrapper = make_scrapper({"repo": commits}, checkpoints=await storage.get_checkpoints())
+        try:
+            await storage.insert_repositories_batch(await scrapper.get_repositories())
+        finally:
+            await scrapper.close()
+
+    async def commits_num(self, storage: ClickHouseStorage) -> int:
+        return sum(row.commits_num for row in await storage.get_daily_commits(DAY, DAY))
+
+    async def test_checkpoint_keeps_boundary_shas(self) -> None:
+        """Test that the checkpoint covers every commit made at its second, not just the newest one."""
+        # Arrange
+        scrapper = make_scrapper({"repo": [make_commit("a"), make_commit("b")]}, checkpoints={})
+
+        # Act
+        repositories = await scrapper.get_repositories()
+        await scrapper.close()
+
+        # Assert
+        checkpoint = repositories[0].checkpoint
+        assert checkpoint is not None
+        assert checkpoint.covers("a") and checkpoint.covers("b")
+        assert not checkpoint.covers("c")
+
+    async def test_rerun_over_same_commits_adds_nothing(self, chdb_client: ChdbClient) -> None:
+        """Test that a second run seeing the same commits, as GitHub's inclusive `since` returns them, adds none."""
+        # Arrange
+        storage = ClickHouseStorage(client=chdb_client, incremental=True)
+        await storage.initialize_database()
+        commits = [make_commit("a"), make_commit("b")]
+        await self.run(storage, commits)
+
+        # Act
+        await self.run(storage, commits)
+
+        # Assert
+        assert await self.commits_num(storage) == 2
+
+    async def test_new_commit_adds_one(self, chdb_client: ChdbClient) -> None:
+        """Test that a commit made at the checkpoint's second after the last run is counted exactly once."""
+        # Arrange
+        storage = ClickHouseStorage(client=chdb_client, incremental=True)
+        await storage.initialize_database()
+        await self.run(storage, [make_commit("a"), make_commit("b")])
+
+        # Act
+        await self.run(storage, [make_commit("c"), make_commit("a"), make_commit("b")])
+        await self.run(storage, [make_commit("c"), make_commit("a"), make_commit("b")])
+
+        # Assert
+        assert await self.commits_num(storage) == 3
+
+    async def test_no_checkpoints_outside_incremental_mode(self, chdb_client: ChdbClient) -> None:
+        """Test that non incremental runs leave the checkpoints table alone."""
+        # Arrange
+        storage = ClickHouseStorage(client=chdb_client)
+        await storage.initialize_database()
+
+        # Act
+        await self.run(storage, [make_commit("a")])
+
+        # Assert
+        assert await storage.get_checkpoints() == {}
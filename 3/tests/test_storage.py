@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timezone
+from typing import Any
+
+import pytest
+from aiochclient import ChClientError
+
+from migrator import MigrationRunner, load_migrations
+from scraper import CommitCheckpoint, Repository, RepositoryAuthorCommitsNum
+from storage import ClickHouseStorage
+from tests.conftest import ChdbClient
+
+DAY = date(2025, 1, 1)
+
+
+class InstrumentedClient(ChdbClient):
+    """ChdbClient whose inserts take a while, can be made to fail per table, and are counted while in flight."""
+
+    def __init__(self, client: ChdbClient, failing_table: str | None = None, delay: float = 0.01):
+        super().__init__(client._session)
+        self.failing_table = failing_table
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = asyncio.Event()
+
+    async def execute(self, query: str, *args: Any, params: dict[str, Any] | None = None) -> None:
+        if not query.startswith("INSERT"):
+            return await super().execute(query, *args, params=params)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.started.set()
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failing_table is not None and f".{self.failing_table} " in query:
+                raise ChClientError(f"insert into {self.failing_table} failed")
+            await super().execute(query, *args, params=params)
+        finally:
+            self.in_flight -= 1
+
+
+def make_repository(i: int) -> Repository:
+    committed_at = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+    return Repository(
+        name=f"repo{i}",
+        owner="owner",
+        position=i,
+        stars=i,
+        watchers=i,
+        forks=i,
+        language="Python",
+        authors_commits_num_today=[RepositoryAuthorCommitsNum(author="alice", commits_num=1, commit_date=DAY)],
+        checkpoint=CommitCheckpoint(committed_at=committed_at, sha=f"sha{i}", boundary_shas=frozenset({f"sha{i}"})),
+    )
+
+
+async def stream(count: int, stop: asyncio.Event | None = None) -> AsyncIterator[Repository]:
+    for i in range(count):
+        yield make_repository(i)
+    if stop is not None:
+        await stop.wait()
+
+
+async def count_rows(client: ChdbClient, table: str) -> int:
+    return int(await client.fetchval(f"SELECT count() FROM test.{table}"))
+
+
+class TestClickHouseStorage:
+    @pytest.mark.parametrize(
+        "options",
+        [{"insert_mode": "buffer"}, {"insert_mode": "async", "wait_for_async_insert": False}],
+    )
+    def test_incremental_rejects_deferred_inserts(self, options: dict[str, Any]) -> None:
+        """Test that incremental mode refuses insert modes that return before rows are visible."""
+        with pytest.raises(ValueError):
+            ClickHouseStorage(client=None, incremental=True, **options)
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"insert_mode": "sync"}, {"insert_mode": "async", "wait_for_async_insert": True}],
+    )
+    def test_incremental_accepts_committed_inserts(self, options: dict[str, Any]) -> None:
+        """Test that incremental mode works with inserts that are committed when they return."""
+        ClickHouseStorage(client=None, incremental=True, **options)
+
+    async def test_daily_commits_keep_latest_count(self, chdb_client: ChdbClient) -> None:
+        """Test that the daily aggregate keeps the last inserted count per author, not the highest one."""
+        # Arrange
+        await MigrationRunner(chdb_client, "test").migrate()
+        storage = ClickHouseStorage(client=chdb_client)
+        await chdb_client.execute(
+            "INSERT INTO test.repositories_authors_commits VALUES", (DAY, "a/b", "alice", 5), (DAY, "a/b", "bob", 1)
+        )
+        # A rerun after a force push counts fewer commits for alice.
+        await chdb_client.execute("INSERT INTO test.repositories_authors_commits VALUES", (DAY, "a/b", "alice", 2))
+
+        # Act
+        daily = await storage.get_daily_commits(DAY, DAY)
+        top = await storage.get_top_authors(DAY, DAY)
+
+        # Assert
+        assert [(row.commits_num, row.authors_num) for row in daily] == [(3, 2)]
+        assert [(row.author, row.commits_num) for row in top] == [("alice", 2), ("bob", 1)]
+
+    async def test_daily_commits_backfilled(self, chdb_client: ChdbClient) -> None:
+        """Test that rows stored before the daily aggregate existed are backfilled into it."""
+        # Arrange
+        migrations = load_migrations()
+        await MigrationRunner(chdb_client, "test", migrations=migrations[:3]).migrate()
+        await chdb_client.execute(
+            "INSERT INTO test.repositories_authors_commits VALUES", (DAY, "a/b", "alice", 5), (DAY, "a/b", "bob", 1)
+        )
+        storage = ClickHouseStorage(client=chdb_client)
+
+        # Act
+        await MigrationRunner(chdb_client, "test", migrations=migrations).migrate()
+        await chdb_client.execute("INSERT INTO test.repositories_authors_commits VALUES", (DAY, "a/b", "alice", 2))
+
+        # Assert
+        daily = await storage.get_daily_commits(DAY, DAY)
+        assert [(row.commits_num, row.authors_num) for row in daily] == [(3, 2)]
+
+
+class TestInsertRepositoriesStream:
+    async def test_failed_deltas_flush_stores_no_checkpoint(self, chdb_client: ChdbClient) -> None:
+        """Test that checkpoints are not stored when the deltas they cover failed to insert."""
+        # Arrange
+        await MigrationRunner(chdb_client, "test").migrate()
+        client = InstrumentedClient(chdb_client, failing_table="repositories_authors_commits_deltas")
+        storage = ClickHouseStorage(client=client, batch_size=2, incremental=True)
+
+        # Act
+        with pytest.raises(ChClientError):
+            await storage.insert_repositories_stream(stream(5))
+
+        # Assert
+        assert await count_rows(chdb_client, "repositories_commits_checkpoints") == 0
+        assert await storage.get_checkpoints() == {}
+
+    async def test_cancelled_stream_leaves_no_inserts_behind(self, chdb_client: ChdbClient) -> None:
+        """Test that cancelling a stream cancels its pending inserts instead of letting them land later."""
+        # Arrange
+        await MigrationRunner(chdb_client, "test").migrate()
+        client = InstrumentedClient(chdb_client, delay=0.05)
+        storage = ClickHouseStorage(client=client, batch_size=2, incremental=True)
+        task = asyncio.create_task(storage.insert_repositories_stream(stream(3, stop=asyncio.Event())))
+        await client.started.wait()
+
+        # Act
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.1)
+
+        # Assert
+        assert client.in_flight == 0
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+        for table in ("repositories", "repositories_authors_commits_deltas", "repositories_commits_checkpoints"):
+            assert await count_rows(chdb_client, table) == 0
+
+    async def test_in_flight_inserts_bounded(self, chdb_client: ChdbClient) -> None:
+        """Test that no more than max_concurrent_inserts INSERT queries run at once, whatever the backlog."""
+        # Arrange
+        await MigrationRunner(chdb_client, "test").migrate()
+        client = InstrumentedClient(chdb_client)
+        storage = ClickHouseStorage(client=client, batch_size=1, incremental=True, max_concurrent_inserts=2)
+
+        # Act
+        inserted = await storage.insert_repositories_stream(stream(20))
+
+        # Assert
+        assert inserted == 20
+        assert client.max_in_flight == 2
+        assert await count_rows(chdb_client, "repositories_commits_checkpoints") == 20
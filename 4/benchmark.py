@@ -0,0 +1,127 @@
+"""
+Benchmark of the phrases_views report queries at a configurable scale (campaigns x phrases x days).
+
+Synthetic snapshots are loaded into a separate database with the bulk loader, then every query runs
+--repeat times. Client latency percentiles are combined with duration, rows/bytes read and peak memory
+from system.query_log (runs are tagged with log_comment) into a JSON report meant to be diffed
+across schema or query changes.
+
+Usage (from the task 4 directory, with ClickHouse running):
+    python benchmark.py --campaigns 100 --phrases 200 --days 7 --repeat 20 --output bench.json
+    python benchmark.py --skip-load --repeat 50 --output after.json   # reuse the loaded data
+"""
+
+import argparse
+import json
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout
+
+import harness
+from clickhouse import execute, stream_query
+from config import Settings
+from harness import QUERY_LOG_COLUMNS, Report, benchmark_database, benchmark_query, new_report
+from loader import FIRST_CAMPAIGN_ID, BulkLoader, LoadStats, generate_snapshots, initialize
+from report import build_report_query, query_parameters
+
+
+@dataclass
+class BenchmarkQuery:
+    name: str
+    sql: str
+    params: dict[str, str]
+
+
+def benchmark_queries(campaigns: int, start: date, days: int) -> list[BenchmarkQuery]:
+    first_campaign = [FIRST_CAMPAIGN_ID]
+    all_campaigns = [FIRST_CAMPAIGN_ID + i for i in range(campaigns)]
+    end = start + timedelta(days=days - 1)
+    queries = []
+    for source in ("hourly", "raw"):
+        queries += [
+            BenchmarkQuery(
+                f"report_{source}_one_campaign_one_day",
+                build_report_query(source),
+                query_parameters(first_campaign, end, end),
+            ),
+            BenchmarkQuery(
+                f"report_{source}_all_campaigns_all_days",
+                build_report_query(source),
+                query_parameters(all_campaigns, start, end),
+            ),
+        ]
+    return queries
+
+
+async def fetch_json_rows(session: ClientSession, settings: Settings, query: str, **params: Any) -> list[dict]:
+    body = b"".join([chunk async for chunk in stream_query(session, settings, query, **params)])
+    return [json.loads(line) for line in body.splitlines() if line]
+
+
+async def run_query(session: ClientSession, settings: Settings, query: BenchmarkQuery, tag: str) -> None:
+    async for _ in stream_query(session, settings, query.sql, log_comment=tag, **query.params):
+        pass
+
+
+async def query_log_rows(session: ClientSession, settings: Settings, tag: str) -> list[dict[str, Any]]:
+    await execute(session, settings, "SYSTEM FLUSH LOGS")
+    return await fetch_json_rows(
+        session,
+        settings,
+        f"SELECT {QUERY_LOG_COLUMNS} FROM system.query_log "
+        "WHERE type = 'QueryFinish' AND log_comment = {tag:String} FORMAT JSONEachRow",
+        param_tag=tag,
+    )
+
+
+async def run(args: argparse.Namespace) -> Report:
+    settings = Settings()
+    if args.database == settings.clickhouse_db:
+        raise SystemExit(f"--database {args.database} is the configured CLICKHOUSE_DB, pick a separate one")
+    settings = settings.model_copy(update={"clickhouse_db": args.database})
+    scale = {
+        "campaigns": args.campaigns,
+        "phrases": args.phrases,
+        "days": args.days,
+        "snapshots": args.campaigns * args.phrases * args.days * 144,
+    }
+    report = new_report(scale, args.repeat)
+
+    async with ClientSession(timeout=ClientTimeout(total=None, sock_read=600)) as session:
+        if not args.skip_load:
+            await execute(session, settings, f"DROP DATABASE IF EXISTS {args.database}", database="default")
+            await initialize(session, settings)
+            loader = BulkLoader(session, settings, concurrency=args.concurrency)
+            stats: LoadStats = await loader.load(
+                generate_snapshots(args.campaigns, args.phrases, args.days, args.start, args.seed)
+            )
+            await execute(session, settings, "OPTIMIZE TABLE phrases_views_hourly FINAL")
+            report["load"] = {**asdict(stats), "rows_per_second": stats.rows_per_second}
+
+        for query in benchmark_queries(args.campaigns, args.start, args.days):
+            await benchmark_query(
+                report,
+                query.name,
+                lambda tag, query=query: run_query(session, settings, query, tag),
+                lambda tag: query_log_rows(session, settings, tag),
+            )
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", type=benchmark_database, default="bench_phrases")
+    parser.add_argument("--campaigns", type=int, default=20)
+    parser.add_argument("--phrases", type=int, default=100)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=4, help="inserts in flight while loading")
+    harness.main(parser, run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession
+
+from config import Settings
+
+
+class ClickHouseError(Exception):
+    pass
+
+
+def request_params(settings: Settings, database: str | None = None, **params: Any) -> dict[str, str]:
+    """Query string for the HTTP interface: target database plus `params` (query, param_*, settings)."""
+    return {"database": database or settings.clickhouse_db, **{key: str(value) for key, value in params.items()}}
+
+
+def request_headers(settings: Settings, **headers: str) -> dict[str, str]:
+    return {
+        "X-ClickHouse-User": settings.clickhouse_user,
+        "X-ClickHouse-Key": settings.clickhouse_password,
+        **headers,
+    }
+
+
+async def check_response(response: ClientResponse) -> None:
+    if response.status != HTTPStatus.OK:
+        raise ClickHouseError(f"ClickHouse error {response.status}: {(await response.text()).strip()}")
+
+
+async def execute(session: ClientSession, settings: Settings, query: str, database: str | None = None) -> None:
+    async with session.post(
+        settings.clickhouse_url,
+        params=request_params(settings, database),
+        headers=request_headers(settings),
+        data=query.encode(),
+    ) as response:
+        await check_response(response)
+
+
+async def fetch_value(session: ClientSession, settings: Settings, query: str, database: str | None = None) -> str:
+    """Single value returned by `query`, as the text of the TabSeparated response."""
+    async with session.post(
+        settings.clickhouse_url,
+        params=request_params(settings, database),
+        headers=request_headers(settings),
+        data=query.encode(),
+    ) as response:
+        await check_response(response)
+        return (await response.text()).strip()
+
+
+async def stream_query(
+    session: ClientSession,
+    settings: Settings,
+    query: str,
+    chunk_size: int = 64 * 1024,
+    **params: Any,
+) -> AsyncIterator[bytes]:
+    """Yield the response body of `query` in chunks as ClickHouse produces it (gzip on the wire)."""
+    async with session.post(
+        settings.clickhouse_url,
+        params=request_params(settings, enable_http_compression=1, **params),
+        headers=request_headers(settings, **{"Accept-Encoding": "gzip"}),
+        data=query.encode(),
+    ) as response:
+        await check_response(response)
+        async for chunk in response.content.iter_chunked(chunk_size):
+            yield chunk
+
+
+def split_statements(sql: str) -> list[str]:
+    """Split a SQL script on `;` at line ends, dropping comment-only lines."""
+    statements = []
+    current_statement = []
+    for line in sql.split("\n"):
+        if not line.strip() or line.strip().startswith("--"):
+            continue
+        current_statement.append(line)
+        if line.rstrip().endswith(";"):
+            statements.append("\n".join(current_statement).rstrip().rstrip(";"))
+            current_statement = []
+    return statements
@@ -0,0 +1,15 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+    clickhouse_url: str = Field(default="http://localhost:8123")
+    clickhouse_user: str = Field(default="default")
+    clickhouse_password: str = Field(default="")
+    clickhouse_db: str = Field(default="test")
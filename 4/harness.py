@@ -0,0 +1,100 @@
+"""
+Common part of the query benchmarks: repeated timed runs tagged with log_comment, their stats from
+system.query_log and the JSON report. The harness doesn't talk to ClickHouse itself, callers pass
+how to run a tagged query and how to read the query_log rows of a tag.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Final
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PREFIX: Final[str] = "bench_"
+QUERY_LOG_COLUMNS: Final[str] = "query_duration_ms, read_rows, read_bytes, memory_usage"
+
+Report = dict[str, Any]
+
+
+def benchmark_database(name: str) -> str:
+    """argparse type of database options: benchmarks drop and refill their database, it must be a dedicated one."""
+    if not name.startswith(DATABASE_PREFIX):
+        raise argparse.ArgumentTypeError(f"benchmark databases must start with {DATABASE_PREFIX!r}, got {name!r}")
+    return name
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"min": value, "p50": value, "p90": value, "p99": value, "max": value, "mean": value}
+    quantiles = statistics.quantiles(values, n=100, method="inclusive")
+    return {
+        "min": min(values),
+        "p50": quantiles[49],
+        "p90": quantiles[89],
+        "p99": quantiles[98],
+        "max": max(values),
+        "mean": statistics.fmean(values),
+    }
+
+
+def query_log_stats(rows: list[Any]) -> dict[str, Any]:
+    """Server side stats of the QUERY_LOG_COLUMNS rows of one tag (integers may come as JSON strings)."""
+    if not rows:
+        return {}
+    return {
+        "server_duration_ms": percentiles([float(row["query_duration_ms"]) for row in rows]),
+        "read_rows": statistics.median(int(row["read_rows"]) for row in rows),
+        "read_bytes": statistics.median(int(row["read_bytes"]) for row in rows),
+        "memory_usage_max": max(int(row["memory_usage"]) for row in rows),
+    }
+
+
+def new_report(scale: dict[str, int], repeat: int) -> Report:
+    return {
+        "run_id": uuid.uuid4().hex[:12],
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "scale": scale,
+        "repeat": repeat,
+        "queries": {},
+    }
+
+
+async def benchmark_query(
+    report: Report,
+    name: str,
+    run_query: Callable[[str], Awaitable[Any]],
+    query_log_rows: Callable[[str], Awaitable[list[Any]]],
+) -> None:
+    """Run `run_query(tag)` report["repeat"] times and add its latencies and query_log stats to the report."""
+    tag = f"benchmark:{report['run_id']}:{name}"
+    latencies = []
+    for _ in range(report["repeat"]):
+        started = time.perf_counter()
+        await run_query(tag)
+        latencies.append((time.perf_counter() - started) * 1000)
+    report["queries"][name] = {"latency_ms": percentiles(latencies), **query_log_stats(await query_log_rows(tag))}
+    logger.info(f"{name}: p50 {report['queries'][name]['latency_ms']['p50']:.1f} ms")
+
+
+def main(parser: argparse.ArgumentParser, run: Callable[[argparse.Namespace], Awaitable[Report]]) -> None:
+    """Add the common options to `parser`, run the benchmark and write its report."""
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--skip-load", action="store_true", help="benchmark the data already in --database")
+    parser.add_argument("--output", help="JSON report path, defaults to stdout")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    report = json.dumps(asyncio.run(run(args)), indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+    else:
+        print(report)
@@ -0,0 +1,269 @@
+"""
+Bulk loader for phrases_views.
+
+Snapshots are generated or read from CSV/Parquet files, encoded as TabSeparated into size-bounded
+chunks, gzipped and inserted through the HTTP interface by several concurrent uploaders.
+
+Usage (from the task 4 directory):
+    python loader.py --init                                    # schema, hourly aggregate and sample rows
+    python loader.py --generate --campaigns 100 --phrases 1000 --days 7
+    python loader.py --file snapshots.csv --file snapshots.parquet --chunk-mb 32 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import logging
+import random
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Final
+
+from aiohttp import ClientSession, ClientTimeout
+
+from clickhouse import check_response, execute, fetch_value, request_headers, request_params, split_statements
+from config import Settings
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS: Final[tuple[str, ...]] = ("dt", "campaign_id", "phrase", "views")
+INSERT_QUERY: Final[str] = f"INSERT INTO phrases_views ({', '.join(COLUMNS)}) FORMAT TabSeparated"
+FIRST_CAMPAIGN_ID: Final[int] = 1_000_000
+SNAPSHOT_INTERVAL: Final[timedelta] = timedelta(minutes=10)
+PARQUET_BATCH_ROWS: Final[int] = 65536
+_TSV_ESCAPES: Final[dict[int, str]] = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n"})
+
+Snapshot = tuple[Any, Any, str, Any]
+
+
+@dataclass
+class LoadStats:
+    rows: int = 0
+    chunks: int = 0
+    raw_bytes: int = 0
+    compressed_bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def generate_snapshots(
+    campaigns: int,
+    phrases: int,
+    days: int,
+    start: date,
+    seed: int = 0,
+) -> Iterator[Snapshot]:
+    """Cumulative 10-minute view snapshots for campaigns x phrases, in (dt, campaign_id, phrase) order."""
+    rng = random.Random(seed)
+    phrase_names = [f"phrase {i}" for i in range(phrases)]
+    views = [0] * (campaigns * phrases)
+    dt = datetime.combine(start, datetime.min.time())
+    for _ in range(days * int(timedelta(days=1) / SNAPSHOT_INTERVAL)):
+        for campaign in range(campaigns):
+            campaign_id = FIRST_CAMPAIGN_ID + campaign
+            for phrase in range(phrases):
+                key = campaign * phrases + phrase
+                if rng.random() < 0.3:
+                    views[key] += rng.randint(1, 5)
+                yield dt, campaign_id, phrase_names[phrase], views[key]
+        dt += SNAPSHOT_INTERVAL
+
+
+def read_csv(path: Path) -> Iterator[Snapshot]:
+    """Rows of a CSV file with a dt,campaign_id,phrase,views header."""
+    with path.open(newline="") as file:
+        for row in csv.DictReader(file):
+            yield row["dt"], row["campaign_id"], row["phrase"], row["views"]
+
+
+def read_parquet(path: Path) -> Iterator[Snapshot]:
+    if pq is None:
+        raise RuntimeError("Reading Parquet files requires pyarrow")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=PARQUET_BATCH_ROWS, columns=list(COLUMNS)):
+        columns = [batch.column(name).to_pylist() for name in COLUMNS]
+        yield from zip(*columns)
+
+
+def read_file(path: Path) -> Iterator[Snapshot]:
+    if path.suffix == ".parquet":
+        return read_parquet(path)
+    return read_csv(path)
+
+
+def encode_chunks(rows: Iterable[Snapshot], chunk_bytes: int) -> Iterator[tuple[bytes, int]]:
+    """TabSeparated chunks of about `chunk_bytes` each (UTF-8 encoded size), with their row counts."""
+    lines: list[bytes] = []
+    size = 0
+    for dt, campaign_id, phrase, views in rows:
+        line = f"{dt}\t{campaign_id}\t{phrase.translate(_TSV_ESCAPES)}\t{views}\n".encode()
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(lines), len(lines)
+            lines, size = [], 0
+    if lines:
+        yield b"".join(lines), len(lines)
+
+
+class BulkLoader:
+    """Inserts TabSeparated chunks concurrently, at most `concurrency` in flight while the next one is encoded."""
+
+    def __init__(
+        self,
+        session: ClientSession,
+        settings: Settings,
+        concurrency: int = 4,
+        chunk_bytes: int = 16 * 1024 * 1024,
+        compression_level: int = 1,
+    ):
+        self._session = session
+        self._settings = settings
+        self._concurrency = concurrency
+        self._chunk_bytes = chunk_bytes
+        self._compression_level = compression_level
+        self.stats = LoadStats()
+
+    async def load(self, rows: Iterable[Snapshot]) -> LoadStats:
+        started = time.perf_counter() - self.stats.elapsed
+        chunks = encode_chunks(rows, self._chunk_bytes)
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while chunk := await asyncio.to_thread(self._next_chunk, chunks):
+                compressed, raw_size, row_count = chunk
+                self.stats.raw_bytes += raw_size
+                if len(pending) >= self._concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(self._insert_chunk(compressed, row_count, started)))
+            await asyncio.gather(*pending)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.stats.elapsed = time.perf_counter() - started
+        return self.stats
+
+    def _next_chunk(self, chunks: Iterator[tuple[bytes, int]]) -> tuple[bytes, int, int] | None:
+        """
+        Gzipped next chunk with its raw size and row count, None when the rows are exhausted.
+        Runs in a worker thread: reading the source, encoding and compressing all stay off the event loop.
+        """
+        chunk = next(chunks, None)
+        if chunk is None:
+            return None
+        body, row_count = chunk
+        return gzip.compress(body, self._compression_level), len(body), row_count
+
+    async def _insert_chunk(self, body: bytes, row_count: int, started: float) -> None:
+        async with self._session.post(
+            self._settings.clickhouse_url,
+            params=request_params(self._settings, query=INSERT_QUERY),
+            headers=request_headers(self._settings, **{"Content-Encoding": "gzip"}),
+            data=body,
+        ) as response:
+            await check_response(response)
+        self.stats.rows += row_count
+        self.stats.chunks += 1
+        self.stats.compressed_bytes += len(body)
+        self.stats.elapsed = time.perf_counter() - started
+        logger.info(
+            f"{self.stats.rows:,} rows in {self.stats.elapsed:.1f}s ({self.stats.rows_per_second:,.0f} rows/s)"
+        )
+
+
+def split_inserts(sql: str) -> tuple[list[str], list[str]]:
+    """Statements of a SQL script split into the schema ones and the INSERTs."""
+    statements = split_statements(sql)
+    inserts = [statement for statement in statements if statement.lstrip().upper().startswith("INSERT")]
+    return [statement for statement in statements if statement not in inserts], inserts
+
+
+async def table_exists(session: ClientSession, settings: Settings, table: str) -> bool:
+    return await fetch_value(session, settings, f"EXISTS TABLE {table}") == "1"
+
+
+async def initialize(session: ClientSession, settings: Settings) -> None:
+    """
+    Create the table and the hourly aggregate. The sample rows of table.sql and the backfill of views.sql
+    are only inserted along with the table they belong to, so running --init again doesn't repeat them.
+    """
+    root = Path(__file__).parent
+    table_schema, sample = split_inserts((root / "table.sql").read_text())
+    views_schema, backfill = split_inserts((root / "views.sql").read_text())
+
+    await execute(session, settings, f"CREATE DATABASE IF NOT EXISTS {settings.clickhouse_db}", database="default")
+    new_table = not await table_exists(session, settings, "phrases_views")
+    new_views = not await table_exists(session, settings, "phrases_views_hourly")
+    for statement in table_schema + views_schema:
+        await execute(session, settings, statement)
+    # A new table is empty until its sample goes in through the view, only an existing one needs the backfill.
+    for statement in (backfill if new_views and not new_table else []) + (sample if new_table else []):
+        await execute(session, settings, statement)
+    logger.info(f"Database '{settings.clickhouse_db}' initialized")
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings = Settings()
+    async with ClientSession(timeout=ClientTimeout(total=None, sock_read=600)) as session:
+        if args.init:
+            await initialize(session, settings)
+
+        sources: list[Iterable[Snapshot]] = [read_file(Path(path)) for path in args.file or []]
+        if args.generate:
+            sources.append(generate_snapshots(args.campaigns, args.phrases, args.days, args.start, args.seed))
+        if not sources:
+            return
+
+        loader = BulkLoader(
+            session,
+            settings,
+            concurrency=args.concurrency,
+            chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+            compression_level=args.compression_level,
+        )
+        for rows in sources:
+            await loader.load(rows)
+
+    stats = loader.stats
+    logger.info(
+        f"Loaded {stats.rows:,} rows in {stats.chunks} chunks, {stats.raw_bytes / 2**20:.1f} MiB "
+        f"({stats.compressed_bytes / 2**20:.1f} MiB gzipped) in {stats.elapsed:.1f}s: "
+        f"{stats.rows_per_second:,.0f} rows/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--init", action="store_true", help="create the schema and load the sample of table.sql")
+    parser.add_argument("--file", action="append", help="CSV (dt,campaign_id,phrase,views header) or .parquet file")
+    parser.add_argument("--generate", action="store_true", help="generate synthetic snapshots")
+    parser.add_argument("--campaigns", type=int, default=10)
+    parser.add_argument("--phrases", type=int, default=100)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-mb", type=float, default=16, help="uncompressed size of one insert")
+    parser.add_argument("--concurrency", type=int, default=4, help="inserts in flight")
+    parser.add_argument("--compression-level", type=int, default=1, choices=range(1, 10))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+    )
+    main()
@@ -0,0 +1,168 @@
+"""
+Hourly phrase views report for many campaigns and days in one query.
+
+Campaign ids and the date range are bound as ClickHouse query parameters, the time filter is a plain
+`dt` range so the primary key is used, and the result is streamed to the output as it arrives.
+
+Usage (from the task 4 directory):
+    python report.py --campaigns 1111111 2222222 --start 2025-01-01 --end 2025-01-31 --format TSV
+    python report.py --campaigns-file campaigns.txt --start 2025-01-01 --source raw > report.jsonl
+"""
+
+import argparse
+import asyncio
+import sys
+from collections.abc import AsyncIterator
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO, Final, Literal
+
+from aiohttp import ClientSession, ClientTimeout
+
+from clickhouse import stream_query
+from config import Settings
+
+ReportFormat = Literal["JSONEachRow", "TSV"]
+ReportSource = Literal["hourly", "raw"]
+
+CHUNK_SIZE: Final[int] = 64 * 1024
+
+# Hourly maxima of the cumulative views, from the phrases_views_hourly aggregate (views.sql)
+# or straight from the raw 10-minute snapshots. Both read the hour before {start} as the baseline
+# of the first increment and filter on the time column itself, never on a function of it.
+HOURLY_MAX: Final[dict[ReportSource, str]] = {
+    "hourly": """
+    SELECT campaign_id, phrase, dt_hour, maxMerge(max_views) AS max_views_in_hour
+    FROM phrases_views_hourly
+    WHERE campaign_id IN {campaign_ids:Array(Int32)}
+      AND dt_hour >= {start:DateTime} - INTERVAL 1 HOUR
+      AND dt_hour < {end:DateTime}
+    GROUP BY campaign_id, phrase, dt_hour
+""",
+    "raw": """
+    SELECT campaign_id, phrase, toStartOfHour(dt) AS dt_hour, max(views) AS max_views_in_hour
+    FROM phrases_views
+    WHERE dt >= {start:DateTime} - INTERVAL 1 HOUR
+      AND dt < {end:DateTime}
+      AND campaign_id IN {campaign_ids:Array(Int32)}
+    GROUP BY campaign_id, phrase, dt_hour
+""",
+}
+
+REPORT_QUERY: Final[str] = """
+WITH hourly_max AS ({hourly_max}),
+hourly_incremental AS (
+    SELECT
+        campaign_id,
+        phrase,
+        dt_hour,
+        max_views_in_hour - coalesce(
+            lagInFrame(max_views_in_hour, 1) OVER (
+                PARTITION BY campaign_id, phrase
+                ORDER BY dt_hour ASC
+                ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+            ),
+            0
+        ) AS hourly_views
+    FROM hourly_max
+)
+SELECT
+    campaign_id,
+    phrase,
+    groupArray((dt_hour, hourly_views)) AS views_by_hour
+FROM (
+    SELECT campaign_id, phrase, dt_hour, hourly_views
+    FROM hourly_incremental
+    WHERE hourly_views > 0 AND dt_hour >= {{start:DateTime}}
+    ORDER BY campaign_id ASC, phrase ASC, dt_hour DESC
+)
+GROUP BY campaign_id, phrase
+ORDER BY campaign_id ASC, phrase ASC
+FORMAT {format}
+"""
+
+
+def build_report_query(source: ReportSource = "hourly", report_format: ReportFormat = "JSONEachRow") -> str:
+    return REPORT_QUERY.format(hourly_max=HOURLY_MAX[source], format=report_format)
+
+
+def query_parameters(campaign_ids: list[int], start: date, end: date) -> dict[str, str]:
+    """ClickHouse param_* values for the report, `end` is inclusive."""
+    return {
+        "param_campaign_ids": f"[{','.join(str(campaign_id) for campaign_id in campaign_ids)}]",
+        "param_start": datetime.combine(start, time()).isoformat(sep=" "),
+        "param_end": datetime.combine(end + timedelta(days=1), time()).isoformat(sep=" "),
+    }
+
+
+async def stream_report(
+    session: ClientSession,
+    settings: Settings,
+    campaign_ids: list[int],
+    start: date,
+    end: date,
+    report_format: ReportFormat = "JSONEachRow",
+    source: ReportSource = "hourly",
+) -> AsyncIterator[bytes]:
+    """Yield the report body in chunks as ClickHouse produces it."""
+    async for chunk in stream_query(
+        session,
+        settings,
+        build_report_query(source, report_format),
+        chunk_size=CHUNK_SIZE,
+        **query_parameters(campaign_ids, start, end),
+    ):
+        yield chunk
+
+
+async def write_report(output: BinaryIO, settings: Settings, **report: Any) -> int:
+    """Stream the report into `output`, returns the number of bytes written."""
+    written = 0
+    async with ClientSession(timeout=ClientTimeout(total=None, sock_read=300)) as session:
+        async for chunk in stream_report(session, settings, **report):
+            output.write(chunk)
+            written += len(chunk)
+    output.flush()
+    return written
+
+
+def read_campaign_ids(args: argparse.Namespace) -> list[int]:
+    campaign_ids = list(args.campaigns or [])
+    if args.campaigns_file:
+        text = Path(args.campaigns_file).read_text()
+        campaign_ids.extend(int(value) for value in text.replace(",", " ").split())
+    return campaign_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--campaigns", type=int, nargs="*", help="campaign ids")
+    parser.add_argument("--campaigns-file", help="file with campaign ids separated by whitespace or commas")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first day, YYYY-MM-DD")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day (inclusive), defaults to --start")
+    parser.add_argument("--format", dest="report_format", choices=["JSONEachRow", "TSV"], default="JSONEachRow")
+    parser.add_argument("--source", choices=["hourly", "raw"], default="hourly")
+    parser.add_argument("--output", help="output file, defaults to stdout")
+    args = parser.parse_args()
+
+    campaign_ids = read_campaign_ids(args)
+    if not campaign_ids:
+        parser.error("pass --campaigns or --campaigns-file")
+
+    settings = Settings()
+    report = dict(
+        campaign_ids=campaign_ids,
+        start=args.start,
+        end=args.end or args.start,
+        report_format=args.report_format,
+        source=args.source,
+    )
+    if args.output:
+        with open(args.output, "wb") as output:
+            asyncio.run(write_report(output, settings, **report))
+    else:
+        asyncio.run(write_report(sys.stdout.buffer, settings, **report))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,6 @@
 #!/bin/bash
 set -e
 
-source .env 2>/dev/null || true
-
-CLICKHOUSE_URL="${CLICKHOUSE_URL:-http://localhost:8123}"
-CLICKHOUSE_USER="${CLICKHOUSE_USER:-admin}"
-CLICKHOUSE_PASSWORD="${CLICKHOUSE_PASSWORD:-password}"
-CLICKHOUSE_DB="${CLICKHOUSE_DB:-test}"
-
-echo "Executing query..."
-echo ""
-
-curl -s "${CLICKHOUSE_URL}/?database=${CLICKHOUSE_DB}" \
-    --user "${CLICKHOUSE_USER}:${CLICKHOUSE_PASSWORD}" \
-    --data-binary @query.sql \
-    -H "Content-Type: text/plain" | \
-    awk -F'\t' '{printf "%-20s | %s\n", $1, $2}'
+# Hourly views report for the sample campaign, extra arguments are passed to report.py
+# (e.g. --campaigns 1 2 3 --start 2025-01-01 --end 2025-01-31 --format JSONEachRow).
+python report.py --campaigns 1111111 --start 2025-01-01 --format TSV "$@"
@@ -1,4 +1,4 @@
-CREATE TABLE phrases_views
+CREATE TABLE IF NOT EXISTS phrases_views
 (
     dt          DateTime,
     campaign_id Int32 comment 'Идентификатор рекламной кампании',
@@ -6,7 +6,7 @@ CREATE TABLE phrases_views
     views       Int32 comment 'Кумулятивное (суммарное) количество просмотров по поисковому запросу за всё время'
 ) engine = ReplacingMergeTree ORDER BY (dt, campaign_id, phrase);
 
-INSERT INTO test.phrases_views (dt, campaign_id, phrase, views)
+INSERT INTO phrases_views (dt, campaign_id, phrase, views)
 VALUES ('2025-01-01 11:50:00', 1111111, 'платье', 0),
        ('2025-01-01 12:00:00', 1111111, 'платье', 1),
        ('2025-01-01 12:10:00', 1111111, 'платье', 1),
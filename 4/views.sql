@@ -0,0 +1,28 @@
+-- Hourly maximum of the cumulative views per (campaign_id, phrase), maintained on insert into phrases_views.
+-- max is idempotent, so replaced or re-sent snapshots don't skew the aggregate.
+CREATE TABLE IF NOT EXISTS phrases_views_hourly
+(
+    dt_hour     DateTime comment 'Начало часа',
+    campaign_id Int32,
+    phrase      String,
+    max_views   AggregateFunction(max, Int32) comment 'Максимум кумулятивных просмотров за час'
+) engine = AggregatingMergeTree ORDER BY (campaign_id, phrase, dt_hour);
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS phrases_views_hourly_mv TO phrases_views_hourly AS
+SELECT
+    toStartOfHour(dt) AS dt_hour,
+    campaign_id,
+    phrase,
+    maxState(views) AS max_views
+FROM phrases_views
+GROUP BY dt_hour, campaign_id, phrase;
+
+-- Backfill rows loaded before the view existed.
+INSERT INTO phrases_views_hourly
+SELECT
+    toStartOfHour(dt) AS dt_hour,
+    campaign_id,
+    phrase,
+    maxState(views) AS max_views
+FROM phrases_views
+GROUP BY dt_hour, campaign_id, phrase;